@@ -141,20 +141,17 @@ with st.sidebar:
         from backend import session_manager
 
         # 利用可能なセッション一覧
-        sessions = session_manager.get_saved_sessions()
+        sessions = session_manager.get_latest_sessions()
         if sessions:
-            # 書籍名を抽出
-            book_names = set()
-            for session_path in sessions:
-                filename = session_path.name
-                if 'latest' in filename:
-                    book_name = filename.replace('session_', '').replace('_latest.json', '')
-                    book_names.add(book_name)
+            # 書籍ごとの最新セッション
+            latest_by_book = {s['book_name']: s for s in sessions}
+            book_names = list(latest_by_book)
 
             if book_names:
                 selected_book = st.selectbox(
                     "書籍を選択",
-                    sorted(book_names),
+                    book_names,
+                    format_func=lambda name: f"{name}（{latest_by_book[name]['created_at'][:16].replace('T', ' ')}・{latest_by_book[name]['status']}）",
                     key="restore_book_select"
                 )
 
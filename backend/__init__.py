@@ -3,25 +3,55 @@ Backend modules for book promotion video generation
 """
 
 from . import utils
+from . import telemetry
+from . import cancellation
+from . import background_task
+from . import gemini_client
 from . import epub_parser
 from . import book_analyzer
 from . import summary_generator
 from . import scenario_generator_v2
 from . import sora2_engine
+from . import prompt_templates
+from . import prompt_preflight
 from . import prompt_engineer
 from . import video_composer
 from . import session_manager
 from . import scene_splitter_sora2
+from . import speech_timing
+from . import text_segmenter
+from . import text_normalizer
+from . import epub_structure
+from . import analysis_cache
+from . import analysis_checkpoint
+from . import chunk_dedup
+from . import chunk_sampler
+from . import text_store
 
 __all__ = [
     'utils',
+    'telemetry',
+    'cancellation',
+    'background_task',
+    'gemini_client',
     'epub_parser',
     'book_analyzer',
     'summary_generator',
     'scenario_generator_v2',
     'sora2_engine',
+    'prompt_templates',
+    'prompt_preflight',
     'prompt_engineer',
     'video_composer',
     'session_manager',
     'scene_splitter_sora2',
+    'speech_timing',
+    'text_segmenter',
+    'text_normalizer',
+    'epub_structure',
+    'analysis_cache',
+    'analysis_checkpoint',
+    'chunk_dedup',
+    'chunk_sampler',
+    'text_store',
 ]
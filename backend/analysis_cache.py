@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+書籍分析の差分キャッシュ
+
+書籍ごとに、文書・チャンクの内容ハッシュとチャンクまとめ・全体概要を
+data/internal/analysis_cache/<書籍名>.json に保存する
+（バッチ処理では同名の別の書籍と衝突しないよう、書籍名の代わりに analyze_book の book_id を使う）
+
+訂正版のEPUBを再アップロードした場合、analyze_book は
+- 内容が変わっていないチャンクのまとめを再利用し、変わったチャンクだけGeminiに送る
+- チャンクまとめ・章見出しがすべて前回と同じなら、全体概要も再利用する
+  （長文コンテキスト分析では、本文・目次が前回と同じなら再利用する）
+ため、誤字修正程度の改訂なら数回のAPI呼び出しで済む
+"""
+
+import hashlib
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .utils import get_project_root, load_json, save_json
+
+# キャッシュ形式・プロンプトを変えた場合に上げる（古いキャッシュは使わない）
+# 2: 近似重複のチャンクに代表のまとめをコピーして保存していたキャッシュ（v1）を使わない
+CACHE_VERSION = 2
+
+
+def content_hash(text: str) -> str:
+    """テキストの内容ハッシュ（sha256）"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def get_cache_dir() -> Path:
+    """差分キャッシュの保存先"""
+    return get_project_root() / "data" / "internal" / "analysis_cache"
+
+
+def cache_path(book_name: str) -> Path:
+    """書籍のキャッシュファイル"""
+    return get_cache_dir() / f"{book_name}.json"
+
+
+def load_index(book_name: str) -> Dict[str, Any]:
+    """
+    書籍のキャッシュを読み込む（ない場合・形式が古い場合は空のキャッシュ）
+
+    Returns:
+        {'version', 'book_name', 'updated_at', 'documents': {ファイル名: ハッシュ},
+         'chunks': {チャンクのハッシュ: まとめ}, 'final': {'key', 'result'} | None}
+    """
+    path = cache_path(book_name)
+    if path.exists():
+        try:
+            index = load_json(path)
+            if index.get('version') == CACHE_VERSION:
+                return index
+        except (OSError, ValueError) as e:
+            print(f"  ⚠️ 分析キャッシュを読み込めませんでした: {e}")
+
+    return {
+        'version': CACHE_VERSION,
+        'book_name': book_name,
+        'updated_at': None,
+        'documents': {},
+        'chunks': {},
+        'final': None,
+    }
+
+
+def save_index(book_name: str, index: Dict[str, Any]) -> Path:
+    """書籍のキャッシュを保存"""
+    index['updated_at'] = datetime.now().isoformat(timespec='seconds')
+    path = cache_path(book_name)
+    save_json(path, index)
+    return path
+
+
+def changed_documents(index: Dict[str, Any], document_hashes: Dict[str, str]) -> List[str]:
+    """前回から内容が変わった（または追加された）文書のファイル名"""
+    previous = index.get('documents', {})
+    return [name for name, digest in document_hashes.items() if previous.get(name) != digest]
+
+
+def final_key(chunk_summaries: List[str], chunk_labels: List[Optional[str]], toc: str) -> str:
+    """全体概要の入力（チャンクまとめ・章見出し・目次）のハッシュ"""
+    payload = json.dumps([chunk_summaries, chunk_labels, toc], ensure_ascii=False)
+    return content_hash(payload)
+
+
+def long_context_key(full_text: str, toc: str) -> str:
+    """長文コンテキスト分析（本文全体を1回で送る）の入力のハッシュ"""
+    payload = json.dumps(['long_context', full_text, toc], ensure_ascii=False)
+    return content_hash(payload)
+
+
+def clear(book_name: Optional[str] = None) -> int:
+    """
+    キャッシュを削除
+
+    Args:
+        book_name: 書籍名（Noneの場合はすべて）
+
+    Returns:
+        削除したファイル数
+    """
+    if book_name is not None:
+        paths = [cache_path(book_name)]
+    else:
+        paths = list(get_cache_dir().glob("*.json"))
+
+    removed = 0
+    for path in paths:
+        if path.exists():
+            path.unlink()
+            removed += 1
+    return removed
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+書籍分析のチェックポイント（中断からの再開）
+
+analyze_book はチャンクまとめを1件生成するたびに
+data/internal/analysis_checkpoints/<書籍のハッシュ>.jsonl へ1行追記する（書き込みごとに fsync）
+プロセスが落ちたり Streamlit が再起動したりしても、同じ内容のEPUBを再分析すれば
+記録済みのチャンクはAPIを呼ばずに再開できる。分析が最後まで終わったらファイルを削除する
+
+書籍のハッシュは文書の内容ハッシュから作るため、ファイル名を変えても再開でき、
+内容が変わった書籍のチェックポイントは使われない（チャンク自体も内容ハッシュで照合する）
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+from .utils import get_project_root
+from .analysis_cache import content_hash
+
+
+def book_key(document_hashes: Dict[str, str]) -> str:
+    """文書の内容ハッシュ（epub_structure.document_hashes）から書籍のハッシュを作る"""
+    return content_hash(json.dumps(document_hashes, sort_keys=True))
+
+
+def get_checkpoint_dir() -> Path:
+    """チェックポイントの保存先"""
+    return get_project_root() / "data" / "internal" / "analysis_checkpoints"
+
+
+def checkpoint_path(key: str) -> Path:
+    """書籍のチェックポイントファイル"""
+    return get_checkpoint_dir() / f"{key}.jsonl"
+
+
+def _repair(path: Path) -> None:
+    """書き込み途中で落ちた最後の行を切り詰める（次の追記が壊れた行につながらないように）"""
+    with open(path, 'rb+') as f:
+        data = f.read()
+        if data and not data.endswith(b'\n'):
+            f.truncate(data.rfind(b'\n') + 1)
+
+
+class ChunkCheckpoint:
+    """
+    チャンクまとめの追記専用ログ
+
+    使い方:
+        with ChunkCheckpoint(book_key(document_hashes)) as checkpoint:
+            done = checkpoint.completed          # {チャンクのハッシュ: まとめ}
+            checkpoint.record(chunk_hash, summary)
+        checkpoint.remove()                      # 分析が最後まで終わった場合
+
+    resume=False の場合は既存の記録を捨てて最初から記録する（キャッシュを使わない再分析）
+    """
+
+    def __init__(self, key: str, resume: bool = True):
+        self.path = checkpoint_path(key)
+        self.completed: Dict[str, str] = {}
+        self._file = None
+
+        if not resume:
+            self.path.unlink(missing_ok=True)
+        elif self.path.exists():
+            _repair(self.path)
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        self.completed[entry['hash']] = entry['summary']
+                    except (ValueError, KeyError, TypeError):
+                        continue
+
+    def record(self, chunk_hash: str, summary: str) -> None:
+        """まとめを1件追記し、ディスクに書き出す"""
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, 'a', encoding='utf-8')
+        self._file.write(json.dumps({'hash': chunk_hash, 'summary': summary}, ensure_ascii=False) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.completed[chunk_hash] = summary
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def remove(self) -> None:
+        """チェックポイントを削除（分析完了後）"""
+        self.close()
+        if self.path.exists():
+            self.path.unlink()
+
+    def __enter__(self) -> 'ChunkCheckpoint':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.close()
+        return False
+
+
+def clear(key: Optional[str] = None) -> int:
+    """
+    チェックポイントを削除
+
+    Args:
+        key: 書籍のハッシュ（Noneの場合はすべて）
+
+    Returns:
+        削除したファイル数
+    """
+    if key is not None:
+        paths = [checkpoint_path(key)]
+    else:
+        paths = list(get_checkpoint_dir().glob("*.jsonl"))
+
+    removed = 0
+    for path in paths:
+        if path.exists():
+            path.unlink()
+            removed += 1
+    return removed
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+バックグラウンド実行（Streamlitのページからキャンセルできる長時間処理）
+
+Streamlitはスクリプトの実行中にボタンのコールバックを処理しないため、
+書籍分析やSora2生成をページのスクリプト内で直接呼ぶと、キャンセルボタンは処理が終わるまで効かない
+このモジュールは処理を別スレッドで実行し、キャンセル用トークンと最新の進捗を持つハンドルを返す
+ページはハンドルを st.session_state に保持し、st.fragment(run_every=...) で進捗を表示しながら完了を待つ
+
+※ 処理（別スレッド）からは st.* を呼ばない（進捗は report() で渡し、表示はページ側で行う）
+
+使い方:
+    from backend import background_task
+
+    task = background_task.start(
+        lambda task: book_analyzer.analyze_book(epub_path, output_dir,
+                                                progress_callback=task.report, cancel_token=task.token)
+    )
+    st.session_state.analysis_task = task
+
+    # 以降の再実行で
+    task.progress, task.finished, task.cancel()
+    result = task.result()     # キャンセル済みなら OperationCancelled、失敗した場合は処理の例外
+"""
+
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from .cancellation import CancellationToken, OperationCancelled
+
+
+class BackgroundTask:
+    """別スレッドで実行中の処理へのハンドル"""
+
+    def __init__(self, target: Callable[['BackgroundTask'], Any], name: Optional[str] = None):
+        self.token = CancellationToken()
+        self.progress: Optional[Dict[str, Any]] = None
+        self._target = target
+        self._result: Any = None
+        self._error: Optional[BaseException] = None
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    def _run(self) -> None:
+        try:
+            self._result = self._target(self)
+        except BaseException as e:
+            self._error = e
+        finally:
+            self._done.set()
+
+    def start(self) -> 'BackgroundTask':
+        self._thread.start()
+        return self
+
+    def report(self, event: Dict[str, Any]) -> None:
+        """最新の進捗を記録（処理の progress_callback として渡す）"""
+        self.progress = event
+
+    @property
+    def finished(self) -> bool:
+        return self._done.is_set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.token.cancelled
+
+    def cancel(self) -> None:
+        """
+        キャンセルを要求（ボタンの on_click に渡す）
+
+        処理は次の区切りで中断する。ページは完了を待たずにキャンセル済みとして扱ってよい
+        """
+        self.token.cancel()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """最大timeout秒、処理の完了を待つ。完了した場合はTrueを返す"""
+        return self._done.wait(timeout)
+
+    def result(self) -> Any:
+        """
+        処理の戻り値
+
+        Raises:
+            OperationCancelled: キャンセル済みの場合（処理がまだ終わっていなくても送出する）
+            RuntimeError: 処理が終わっていない場合
+            処理が送出した例外
+        """
+        if self.token.cancelled:
+            raise OperationCancelled("処理がキャンセルされました")
+        if not self._done.is_set():
+            raise RuntimeError("処理がまだ終わっていません")
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+
+def start(target: Callable[[BackgroundTask], Any], name: Optional[str] = None) -> BackgroundTask:
+    """
+    処理を別スレッドで開始
+
+    Args:
+        target: タスク（token・report を使う）を受け取って処理を行う関数
+        name: スレッド名
+
+    Returns:
+        実行中のタスク
+    """
+    return BackgroundTask(target, name=name).start()
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+複数書籍のバッチ処理CLI（Streamlitを使わないヘッドレス実行）
+
+EPUB → 書籍分析 → シナリオ生成・選択 → シーン分割 → Sora2生成 → 結合 を書籍ごとに実行し、
+結果をマニフェスト（results.json）に書き出す
+
+使い方:
+  python -m backend.batch_pipeline data/raw/
+  python -m backend.batch_pipeline books.json --render-workers 6 --out data/output/batch/nightly
+
+マニフェスト（JSON）の形式:
+  [
+    "data/raw/本A.epub",
+    {"epub": "data/raw/本B.epub", "pattern_id": 2, "aspect_ratio": "9:16", "visual_style": "Anime"}
+  ]
+
+各ステージの同時実行数は --analyze-workers / --scenario-workers / --render-workers /
+--concat-workers で指定する（書籍ごとのスレッドがステージ単位のセマフォを取得して実行）
+"""
+
+import argparse
+import contextlib
+import hashlib
+import json
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from . import (
+    book_analyzer,
+    scenario_generator_v2,
+    scene_splitter_sora2,
+    prompt_engineer,
+    sora2_engine,
+    video_composer,
+    telemetry,
+)
+from . import cancellation
+from .cancellation import CancellationToken
+from .utils import get_project_root, save_json
+
+
+def load_book_entries(source: Path, defaults: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    ディレクトリまたはマニフェストから処理対象の書籍一覧を作成
+
+    Args:
+        source: EPUBを含むディレクトリ、またはJSONマニフェスト
+        defaults: エントリで省略された設定の既定値
+
+    Returns:
+        書籍エントリのリスト（epub, pattern_id, aspect_ratio, visual_style, num_scenes）
+    """
+    if source.is_dir():
+        raw_entries = [str(p) for p in sorted(source.glob("*.epub"))]
+    else:
+        with open(source, 'r', encoding='utf-8') as f:
+            raw_entries = json.load(f)
+
+    entries = []
+    for raw in raw_entries:
+        entry = {"epub": raw} if isinstance(raw, str) else dict(raw)
+        for key, value in defaults.items():
+            entry.setdefault(key, value)
+        entry["epub"] = Path(entry["epub"])
+        entries.append(entry)
+
+    return entries
+
+
+def book_id_for(epub_path: Path) -> str:
+    """
+    書籍ごとの出力・キャッシュのキー（ファイル名 + 絶対パスのハッシュ）
+
+    別のディレクトリにある同名のEPUB（a/novel.epub と b/novel.epub）が
+    出力ディレクトリ・分析キャッシュ・テキストストアを共有しないようにする
+    """
+    digest = hashlib.sha256(str(Path(epub_path).resolve()).encode('utf-8')).hexdigest()
+    return f"{Path(epub_path).stem}-{digest[:8]}"
+
+
+class BatchPipeline:
+    """ステージごとの同時実行数を制限しながら、書籍単位でパイプラインを実行する"""
+
+    def __init__(
+        self,
+        output_dir: Path,
+        analyze_workers: int = 2,
+        scenario_workers: int = 2,
+        render_workers: int = 4,
+        concat_workers: int = 2,
+        model: str = "sora-2",
+        cancel_token: Optional[CancellationToken] = None
+    ):
+        self.output_dir = output_dir
+        self.model = model
+        self.cancel_token = cancel_token or CancellationToken()
+        self.workers = {
+            "analyze": analyze_workers,
+            "scenario": scenario_workers,
+            "render": render_workers,
+            "concat": concat_workers,
+        }
+        self.limits = {stage: threading.BoundedSemaphore(n) for stage, n in self.workers.items()}
+        self.results: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def _run_stage(self, stage: str, record: Dict[str, Any], token: CancellationToken, func, *args, **kwargs):
+        """ステージのセマフォを取得して実行し、所要時間を記録"""
+        cancellation.check(token)
+        record["stage"] = stage
+        with self.limits.get(stage) or contextlib.nullcontext():
+            cancellation.check(token)
+            started = time.time()
+            with telemetry.span(f"batch.{stage}"):
+                value = func(*args, **kwargs)
+        record["timings"][stage] = round(time.time() - started, 2)
+        return value
+
+    def _render_scene(self, entry: Dict[str, Any], book_name: str, scene: Dict[str, Any],
+                      total_scenes: int, book_dir: Path, token: CancellationToken) -> Dict[str, Any]:
+        prompt = prompt_engineer.create_scene_prompt_for_sora2(
+            book_name=book_name,
+            scene_narration=scene["narration"],
+            visual_style=entry["visual_style"],
+            aspect_ratio=entry["aspect_ratio"],
+            duration=scene["duration_seconds"],
+            scene_number=scene["scene_number"],
+            total_scenes=total_scenes
+        )
+        with self.limits["render"]:
+            cancellation.check(token)
+            result = sora2_engine.generate_video(
+                prompt=prompt,
+                book_name=f"{book_name}_scene{scene['scene_number']}",
+                aspect_ratio=entry["aspect_ratio"],
+                duration=scene["duration_seconds"],
+                output_dir=book_dir / "scenes",
+                model=self.model,
+                cancel_token=token
+            )
+        if result["status"] == "cancelled":
+            raise cancellation.OperationCancelled(result["error"])
+        if result["status"] != "success":
+            raise RuntimeError(f"シーン{scene['scene_number']}の生成に失敗: {result.get('error')}")
+        return result
+
+    def process_book(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """1冊分のパイプラインを実行"""
+        epub_path = entry["epub"]
+        book_name = epub_path.stem
+        book_id = book_id_for(epub_path)
+        book_dir = self.output_dir / book_id
+        record: Dict[str, Any] = {
+            "book_name": book_name,
+            "book_id": book_id,
+            "epub": str(epub_path),
+            "status": "running",
+            "stage": None,
+            "timings": {},
+            "settings": {k: v for k, v in entry.items() if k != "epub"},
+        }
+
+        # 書籍ごとのトークン（全体のキャンセルを引き継ぎ、シーン生成の失敗時はこの書籍だけを止める）
+        token = CancellationToken()
+        unregister = self.cancel_token.register(token.cancel)
+
+        try:
+            # 1. 書籍分析
+            analysis = self._run_stage(
+                "analyze", record, token, book_analyzer.analyze_book,
+                epub_path, book_dir / "text", cancel_token=token,
+                book_id=book_id, analysis_file=book_dir / "analysis.json"
+            )
+            record["summary"] = analysis["summary"]
+
+            # 2. シナリオ生成・選択
+            patterns = self._run_stage(
+                "scenario", record, token, scenario_generator_v2.generate_scenarios_from_summary,
+                book_name, analysis["summary"],
+                target_audience=analysis.get("target_audience", ""),
+                book_type=analysis.get("book_type", ""),
+                cancel_token=token
+            )
+            selected = next((p for p in patterns if p["pattern_id"] == entry["pattern_id"]), patterns[0])
+            scenario = {
+                "book_name": book_name,
+                "selected_pattern": selected,
+                "aspect_ratio": entry["aspect_ratio"],
+                "visual_style": entry["visual_style"],
+                "num_scenes": entry["num_scenes"],
+            }
+            save_json(book_dir / "scenario.json", scenario)
+
+            # 3. シーン分割
+            scenes = self._run_stage(
+                "split", record, token, scene_splitter_sora2.split_into_scenes_for_sora2,
+                scenario, num_scenes=entry["num_scenes"]
+            )
+            record["scenes"] = scenes
+
+            # 4. 各シーン生成（シーン単位で render セマフォを取得）
+            # 1シーンでも失敗したら結合できないため、残りのシーンもキャンセルする（Sora2のジョブも削除）
+            record["stage"] = "render"
+            started = time.time()
+            with ThreadPoolExecutor(max_workers=max(1, min(len(scenes), self.workers["render"]))) as pool:
+                futures = [
+                    pool.submit(self._render_scene, entry, book_name, scene, len(scenes), book_dir, token)
+                    for scene in scenes
+                ]
+                for future in as_completed(futures):
+                    if future.exception() is not None:
+                        token.cancel()
+                        raise future.exception()
+                scene_results = [f.result() for f in futures]
+            record["timings"]["render"] = round(time.time() - started, 2)
+            record["scene_videos"] = [
+                {"scene_number": s["scene_number"], "video_file": str(r["video_file"]),
+                 "generation_id": r["generation_id"], "duration": r["duration"]}
+                for s, r in zip(scenes, scene_results)
+            ]
+
+            # 5. 結合
+            final_video = self._run_stage(
+                "concat", record, token, video_composer.concatenate_videos,
+                [r["video_file"] for r in scene_results],
+                output_file=book_dir / f"{book_name}_final.mp4"
+            )
+            record["final_video"] = str(final_video)
+            record["duration"] = sum(r["duration"] for r in scene_results)
+            record["status"] = "completed"
+            record["stage"] = None
+
+        except cancellation.OperationCancelled:
+            record["status"] = "cancelled"
+        except Exception as e:
+            record["status"] = "error"
+            record["error"] = str(e)
+            print(f"❌ {book_name}: {record['stage']}で失敗: {e}")
+        finally:
+            unregister()
+
+        return record
+
+    def run(self, entries: List[Dict[str, Any]], book_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        全書籍を処理し、完了するたびにマニフェストを更新
+
+        Args:
+            entries: load_book_entries() の戻り値
+            book_workers: 同時に処理する書籍数（Noneの場合はステージ上限の合計）
+
+        Returns:
+            書籍ごとの結果リスト
+        """
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        if book_workers is None:
+            book_workers = sum(self.workers.values())
+
+        with ThreadPoolExecutor(max_workers=max(1, book_workers)) as pool:
+            futures = {pool.submit(self.process_book, entry): entry for entry in entries}
+            for future in as_completed(futures):
+                record = future.result()
+                with self._lock:
+                    self.results.append(record)
+                    self.write_manifest()
+                print(f"  📚 {record['book_name']}: {record['status']} ({len(self.results)}/{len(entries)})")
+
+        return self.results
+
+    def write_manifest(self) -> Path:
+        """結果マニフェストを保存"""
+        manifest_file = self.output_dir / "results.json"
+        counts = {}
+        for record in self.results:
+            counts[record["status"]] = counts.get(record["status"], 0) + 1
+        save_json(manifest_file, {
+            "updated_at": datetime.now().isoformat(timespec="seconds"),
+            "counts": counts,
+            "books": sorted(self.results, key=lambda r: r["book_name"]),
+        })
+        return manifest_file
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="書籍プロモーション動画のバッチ生成")
+    ap.add_argument("source", help="EPUBを含むディレクトリ、またはJSONマニフェスト")
+    ap.add_argument("--out", help="出力ディレクトリ（未指定なら data/output/batch/<日時>/）")
+    ap.add_argument("--pattern", type=int, default=1, help="使用するシナリオパターンID（1-3）")
+    ap.add_argument("--aspect", default="16:9", help="例: 16:9, 9:16, 1:1")
+    ap.add_argument("--style", default="Photorealistic", help="ビジュアルスタイル")
+    ap.add_argument("--num-scenes", type=int, default=3, help="シーン数")
+    ap.add_argument("--model", default="sora-2", help="使用モデル（sora-2, sora-2-pro）")
+    ap.add_argument("--book-workers", type=int, help="同時に処理する書籍数")
+    ap.add_argument("--analyze-workers", type=int, default=2, help="書籍分析の同時実行数")
+    ap.add_argument("--scenario-workers", type=int, default=2, help="シナリオ生成の同時実行数")
+    ap.add_argument("--render-workers", type=int, default=4, help="Sora2生成の同時実行数（シーン単位）")
+    ap.add_argument("--concat-workers", type=int, default=2, help="動画結合の同時実行数")
+    args = ap.parse_args()
+
+    source = Path(args.source)
+    if not source.exists():
+        print(f"✗ 入力が見つかりません: {source}")
+        return 2
+
+    if args.out:
+        output_dir = Path(args.out)
+    else:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_dir = get_project_root() / "data" / "output" / "batch" / timestamp
+
+    entries = load_book_entries(source, {
+        "pattern_id": args.pattern,
+        "aspect_ratio": args.aspect,
+        "visual_style": args.style,
+        "num_scenes": args.num_scenes,
+    })
+    if not entries:
+        print(f"✗ EPUBが見つかりません: {source}")
+        return 2
+
+    # Ctrl+C で実行中のSora2ジョブも含めてキャンセル
+    cancel_token = CancellationToken()
+    signal.signal(signal.SIGINT, lambda signum, frame: cancel_token.cancel())
+
+    pipeline = BatchPipeline(
+        output_dir,
+        analyze_workers=args.analyze_workers,
+        scenario_workers=args.scenario_workers,
+        render_workers=args.render_workers,
+        concat_workers=args.concat_workers,
+        model=args.model,
+        cancel_token=cancel_token,
+    )
+
+    print(f"=== バッチ処理開始: {len(entries)}冊 ===")
+    print(f"出力先: {output_dir}")
+    results = pipeline.run(entries, book_workers=args.book_workers)
+    manifest_file = pipeline.write_manifest()
+    telemetry.flush()
+
+    completed = sum(1 for r in results if r["status"] == "completed")
+    print(f"\n✓ 完了: {completed}/{len(results)}冊")
+    print(f"📄 結果マニフェスト: {manifest_file}")
+    return 0 if completed == len(results) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -2,37 +2,156 @@
 """
 書籍分析モジュール（画面1用）
 
-EPUB → テキスト化 → チャンク化 → チャンクまとめ → 全体概要（論文形式800字）
+EPUB → テキスト化（目次で章分け） → 章単位のチャンク化 → チャンクまとめ → 全体概要（論文形式800字）
+本文全体がモデルの入力上限に収まる場合は、チャンク化せず1回のリクエストで全体概要を作る（mode="auto"）
 """
 
 from pathlib import Path
-from typing import Dict, Any, List
-import google.generativeai as genai
-import os
+from typing import Dict, Any, Iterable, List, Callable, Optional, Tuple
 import json
 import time
 from dotenv import load_dotenv
-import ebooklib
 from ebooklib import epub
-from bs4 import BeautifulSoup
+from . import telemetry
+from . import gemini_client
+from . import cancellation
+from . import text_segmenter
+from . import text_normalizer
+from . import epub_structure
+from . import analysis_cache
+from . import analysis_checkpoint
+from . import chunk_dedup
+from . import chunk_sampler
+from . import summary_generator
+from . import text_store
+from .cancellation import CancellationToken
 
 # .envファイルから環境変数を読み込む
 load_dotenv()
 
+# 進捗コールバック: 進捗イベント（辞書）を受け取る
+ProgressCallback = Callable[[Dict[str, Any]], None]
 
-def extract_text_from_epub(epub_path: Path) -> str:
-    """EPUBからテキストを抽出"""
+# analyze_book の処理ステージ
+ANALYSIS_STAGES = ["テキスト抽出", "チャンク化", "チャンクまとめ", "全体概要生成"]
+
+# 1チャンクあたりの推定トークン数の上限（章単位のチャンク化で使用）
+CHUNK_TOKEN_BUDGET = 2000
+
+# 分析モード: auto（入力上限に収まれば全文を1回で送り、収まらなければ full） /
+# full（全チャンクをまとめる） / sampled（代表的なチャンクだけをまとめる高速プレビュー）
+ANALYSIS_MODES = ("auto", "full", "sampled")
+
+
+def _response_tokens(response) -> int:
+    """レスポンスの使用トークン数（取得できない場合は0）"""
+    usage = getattr(response, 'usage_metadata', None)
+    return getattr(usage, 'total_token_count', 0) or 0
+
+
+class _ProgressReporter:
+    """
+    analyze_book の進捗イベントを組み立ててコールバックに渡す
+
+    イベントの形式:
+        {
+            'stage': str,             # 現在のステージ名
+            'stage_index': int,       # 1始まり
+            'total_stages': int,
+            'chunks_done': int,
+            'chunks_total': int,
+            'tokens_used': int,       # これまでの合計トークン数
+            'elapsed_seconds': float,
+            'eta_seconds': float | None,
+            'progress': float,        # 全体の進捗（0.0-1.0）
+            'done': bool
+        }
+    """
+
+    # 全体進捗に占める各ステージの重み（チャンクまとめが大半を占める）
+    STAGE_WEIGHTS = [0.05, 0.05, 0.8, 0.1]
+
+    def __init__(self, callback: Optional[ProgressCallback]):
+        self.callback = callback
+        self.started_at = time.time()
+        self.stage_index = 0
+        self.stage_started_at = self.started_at
+        self.chunks_done = 0
+        self.chunks_total = 0
+        self.tokens_used = 0
+        self.done = False
+
+    def start_stage(self, stage_index: int) -> None:
+        self.stage_index = stage_index
+        self.stage_started_at = time.time()
+        self.emit()
+
+    def on_chunk(self, info: Dict[str, Any]) -> None:
+        """summarize_chunks / generate_final_summary からの途中経過を受け取る"""
+        self.chunks_done = info.get('chunks_done', self.chunks_done)
+        self.chunks_total = info.get('chunks_total', self.chunks_total)
+        self.tokens_used += info.get('tokens_used', 0)
+        self.emit()
+
+    def finish(self) -> None:
+        self.done = True
+        self.emit()
+
+    def _eta_seconds(self) -> Optional[float]:
+        if self.done:
+            return 0.0
+        # チャンクまとめ中のみ、1チャンクあたりの実績から推定（全体概要の1回分も加算）
+        if self.stage_index == 3 and self.chunks_done > 0:
+            per_chunk = (time.time() - self.stage_started_at) / self.chunks_done
+            return per_chunk * (self.chunks_total - self.chunks_done + 1)
+        return None
+
+    def _progress(self) -> float:
+        if self.done:
+            return 1.0
+        completed = sum(self.STAGE_WEIGHTS[:max(self.stage_index - 1, 0)])
+        if self.stage_index == 3 and self.chunks_total:
+            completed += self.STAGE_WEIGHTS[2] * self.chunks_done / self.chunks_total
+        return min(completed, 1.0)
+
+    def emit(self) -> None:
+        if self.callback is None:
+            return
+        self.callback({
+            'stage': ANALYSIS_STAGES[self.stage_index - 1] if self.stage_index else '',
+            'stage_index': self.stage_index,
+            'total_stages': len(ANALYSIS_STAGES),
+            'chunks_done': self.chunks_done,
+            'chunks_total': self.chunks_total,
+            'tokens_used': self.tokens_used,
+            'elapsed_seconds': time.time() - self.started_at,
+            'eta_seconds': self._eta_seconds(),
+            'progress': self._progress(),
+            'done': self.done
+        })
+
+
+def extract_text_from_epub(
+    epub_path: Path,
+    stats: Optional[Dict[str, int]] = None,
+    excluded: Optional[List[Dict[str, str]]] = None
+) -> str:
+    """
+    EPUBから本文テキストを抽出（目次・奥付などは excluded に記録して除外。
+    ルビ除去・NFKC・空白圧縮済み。stats に正規化前後の文字数を集計）
+    """
     book = epub.read_epub(str(epub_path))
-    text_content = []
+    return epub_structure.extract_content_text(book, stats, excluded)
 
-    for item in book.get_items():
-        if item.get_type() == ebooklib.ITEM_DOCUMENT:
-            soup = BeautifulSoup(item.get_content(), 'html.parser')
-            text = soup.get_text(separator='\n', strip=True)
-            if text:
-                text_content.append(text)
 
-    return '\n\n'.join(text_content)
+def extract_chapters_from_epub(
+    epub_path: Path,
+    stats: Optional[Dict[str, int]] = None,
+    excluded: Optional[List[Dict[str, str]]] = None
+) -> List[Dict[str, Any]]:
+    """EPUBの本文を目次の項目ごとの章に分けて抽出（形式は epub_structure.extract_chapters を参照）"""
+    book = epub.read_epub(str(epub_path))
+    return epub_structure.extract_chapters(book, stats, excluded)
 
 
 def chunk_text(text: str, chunk_size: int = 40000) -> List[str]:
@@ -41,6 +160,12 @@ def chunk_text(text: str, chunk_size: int = 40000) -> List[str]:
     current_chunk = ""
     paragraphs = text.split('\n\n')
 
+    # チャンクサイズを超える段落は文の区切りで分ける
+    paragraphs = [
+        piece for para in paragraphs
+        for piece in text_segmenter.split_to_fit(para, chunk_size)
+    ]
+
     for para in paragraphs:
         if len(current_chunk) + len(para) <= chunk_size:
             current_chunk += para + "\n\n"
@@ -55,18 +180,95 @@ def chunk_text(text: str, chunk_size: int = 40000) -> List[str]:
     return chunks
 
 
-def summarize_chunks(chunks: List[str]) -> List[str]:
-    """各チャンクを1000-1500文字にまとめる"""
-    api_key = os.getenv("GOOGLE_API_KEY")
-    if not api_key:
-        raise ValueError("GOOGLE_API_KEY環境変数が設定されていません")
+def chunk_chapters(chapters: Iterable[Dict[str, Any]], token_budget: int = CHUNK_TOKEN_BUDGET) -> List[Dict[str, Any]]:
+    """
+    章をまたがないようにチャンク化
+
+    - 推定トークン数が予算内に収まる連続した章は、まとめて1チャンクにする
+    - 予算を超える章は chunk_text で段落ごとに分け、見出しに（i/n）を付ける
+    - 各章の本文の前に【見出し】を付け、分割後のチャンクでも章が分かるようにする
+
+    Args:
+        chapters: epub_structure.extract_chapters() の戻り値（1章ずつ読み出すイテレーターでもよい）
+        token_budget: 1チャンクあたりの推定トークン数の上限
+
+    Returns:
+        [{'text', 'label'（見出し。目次がない場合はNone）, 'chapters'（章のインデックス）}, ...]
+    """
+    chunks: List[Dict[str, Any]] = []
+    pending: List[Tuple[int, str, Optional[str]]] = []
+    pending_tokens = 0
+
+    def flush() -> None:
+        nonlocal pending, pending_tokens
+        if pending:
+            titles = [title for _, _, title in pending if title]
+            chunks.append({
+                'text': '\n\n'.join(text for _, text, _ in pending),
+                'label': ' / '.join(titles) or None,
+                'chapters': [index for index, _, _ in pending],
+            })
+        pending = []
+        pending_tokens = 0
+
+    for index, chapter in enumerate(chapters):
+        title = chapter.get('title')
+        text = f"【{title}】\n{chapter['text']}" if title else chapter['text']
+        tokens = text_normalizer.estimate_tokens(text)
+
+        if tokens <= token_budget:
+            if pending_tokens + tokens > token_budget:
+                flush()
+            pending.append((index, text, title))
+            pending_tokens += tokens
+            continue
+
+        # 予算を超える章は単独で分割（文字数に換算して chunk_text に渡す）
+        # 各部分の前に付ける見出し（分割数は分割後に決まるため、桁数は文字数で見積もる）の分を予算から除く
+        flush()
+        body_tokens = text_normalizer.estimate_tokens(chapter['text'])
+        max_pieces = len(chapter['text'])
+        label_tokens = text_normalizer.estimate_tokens(f"【{title}（{max_pieces}/{max_pieces}）】\n") if title else 0
+        chunk_size = max(1, (token_budget - label_tokens) * len(chapter['text']) // max(body_tokens, 1))
+        pieces = chunk_text(chapter['text'], chunk_size=chunk_size)
+        for i, piece in enumerate(pieces):
+            label = f"{title}（{i + 1}/{len(pieces)}）" if title else None
+            chunks.append({
+                'text': f"【{label}】\n{piece}" if label else piece,
+                'label': label,
+                'chapters': [index],
+            })
+
+    flush()
+    return chunks
+
+
+def summarize_chunks(
+    chunks: List[str],
+    progress_callback: Optional[ProgressCallback] = None,
+    cancel_token: Optional[CancellationToken] = None,
+    on_summary: Optional[Callable[[int, str], None]] = None
+) -> List[str]:
+    """
+    各チャンクを1000-1500文字にまとめる
 
-    genai.configure(api_key=api_key)
-    model = genai.GenerativeModel('gemini-2.5-flash-lite')
+    Args:
+        chunks: チャンクのリスト
+        progress_callback: チャンク完了ごとに
+            {'chunks_done', 'chunks_total', 'tokens_used'} を受け取るコールバック
+        cancel_token: キャンセル用トークン（チャンクごとに確認し、OperationCancelledを送出）
+        on_summary: チャンク完了ごとに (チャンクのインデックス, まとめ) を受け取るコールバック
+            （チェックポイントへの記録用）
+
+    Returns:
+        チャンクまとめのリスト
+    """
+    model = gemini_client.get_model()
 
     summaries = []
 
     for i, chunk in enumerate(chunks):
+        cancellation.check(cancel_token)
         print(f"  📝 チャンク{i+1}/{len(chunks)}をまとめ中...")
 
         prompt = f"""
@@ -83,35 +285,78 @@ def summarize_chunks(chunks: List[str]) -> List[str]:
 1000-1500文字の要約のみを出力してください。
 """
 
-        response = model.generate_content(
-            prompt,
-            generation_config={"temperature": 0.3}
-        )
+        with telemetry.span("gemini.generate_content", stage="summarize_chunk"):
+            response = model.generate_content(
+                prompt,
+                generation_config={"temperature": 0.3}
+            )
 
         summaries.append(response.text.strip())
+        if on_summary:
+            on_summary(i, summaries[-1])
+
+        tokens = _response_tokens(response)
+        telemetry.increment("gemini.tokens", tokens, stage="summarize_chunk")
+        if progress_callback:
+            progress_callback({
+                'chunks_done': i + 1,
+                'chunks_total': len(chunks),
+                'tokens_used': tokens
+            })
 
         # API制限回避のため、リクエスト間に遅延を追加
         if i < len(chunks) - 1:  # 最後のチャンク以外
-            time.sleep(2)  # 2秒待機
+            cancellation.sleep(2, cancel_token)  # 2秒待機
 
     return summaries
 
 
-def generate_final_summary(chunk_summaries: List[str], book_name: str) -> Dict[str, Any]:
-    """チャンクまとめから全体概要を生成（論文形式800字）"""
-    api_key = os.getenv("GOOGLE_API_KEY")
-    if not api_key:
-        raise ValueError("GOOGLE_API_KEY環境変数が設定されていません")
+def format_toc(chapters: List[Dict[str, Any]]) -> str:
+    """章の見出しを階層付きの目次テキストにする（見出しがない場合は空文字）"""
+    return '\n'.join(
+        f"{'  ' * (chapter['level'] - 1)}- {chapter['title']}"
+        for chapter in chapters if chapter.get('title')
+    )
+
+
+def generate_final_summary(
+    chunk_summaries: List[str],
+    book_name: str,
+    progress_callback: Optional[ProgressCallback] = None,
+    cancel_token: Optional[CancellationToken] = None,
+    chunk_labels: Optional[List[Optional[str]]] = None,
+    toc: str = ""
+) -> Dict[str, Any]:
+    """
+    チャンクまとめから全体概要を生成（論文形式800字）
 
-    genai.configure(api_key=api_key)
-    model = genai.GenerativeModel('gemini-2.5-flash-lite')
+    Args:
+        chunk_summaries: チャンクまとめのリスト
+        book_name: 書籍名
+        progress_callback: 生成完了時に {'tokens_used'} を受け取るコールバック
+        cancel_token: キャンセル用トークン
+        chunk_labels: 各チャンクの章見出し（chunk_chapters() の label）
+        toc: 目次テキスト（format_toc() の戻り値）。指定すると構成の説明に使う
 
-    all_summaries = '\n\n'.join([f"【部分{i+1}】\n{s}" for i, s in enumerate(chunk_summaries)])
+    Returns:
+        全体概要の辞書
+    """
+    model = gemini_client.get_model()
+
+    labels = chunk_labels or []
+    all_summaries = '\n\n'.join([
+        f"【部分{i+1}: {labels[i]}】\n{s}" if i < len(labels) and labels[i] else f"【部分{i+1}】\n{s}"
+        for i, s in enumerate(chunk_summaries)
+    ])
+    toc_section = f"""
+## 目次（書籍の構成）
+{toc}
+""" if toc else ""
 
     prompt = f"""
 あなたは学術論文の要旨を書く専門家です。
 以下は書籍「{book_name}」の各部分の要約です。これを読み、**論文の要旨（アブストラクト）形式**で全体概要を作成してください。
-
+{toc_section}
 ## 各部分の要約
 {all_summaries}
 
@@ -132,7 +377,7 @@ def generate_final_summary(chunk_summaries: List[str], book_name: str) -> Dict[s
    - 書籍の主題・テーマ
    - 扱っている内容の概要
    - 主要な論点
-   - 書籍の構成
+   - 書籍の構成{"（目次に沿って章立てを説明）" if toc else ""}
    - 対象読者層（客観的に）
 
 3. **避けるべき表現**
@@ -156,14 +401,23 @@ JSON形式で出力してください。
 }}
 """
 
+    cancellation.check(cancel_token)
     print(f"  🤖 全体概要を生成中...")
-    response = model.generate_content(
-        prompt,
-        generation_config={
-            "temperature": 0.3,
-            "response_mime_type": "application/json"
-        }
-    )
+    with telemetry.span("gemini.generate_content", stage="final_summary"):
+        response = model.generate_content(
+            prompt,
+            generation_config={
+                "temperature": 0.3,
+                "response_mime_type": "application/json"
+            }
+        )
+
+    tokens = _response_tokens(response)
+    telemetry.increment("gemini.tokens", tokens, stage="final_summary")
+    # 応答待ちの間にキャンセルされた場合は結果を使わない
+    cancellation.check(cancel_token)
+    if progress_callback:
+        progress_callback({'tokens_used': tokens})
 
     result = json.loads(response.text)
     print(f"  ✓ 全体概要生成完了（{result['character_count']}文字）")
@@ -171,67 +425,303 @@ JSON形式で出力してください。
     return result
 
 
-def analyze_book(epub_path: Path, output_dir: Path) -> Dict[str, Any]:
+def analyze_book(
+    epub_path: Path,
+    output_dir: Path,
+    progress_callback: Optional[ProgressCallback] = None,
+    cancel_token: Optional[CancellationToken] = None,
+    use_cache: bool = True,
+    dedup_threshold: Optional[float] = chunk_dedup.DEFAULT_THRESHOLD,
+    mode: str = "auto",
+    sample_size: int = chunk_sampler.SAMPLE_SIZE,
+    book_id: Optional[str] = None,
+    analysis_file: Optional[Path] = None
+) -> Dict[str, Any]:
     """
     書籍を分析（画面1の全処理）
 
-    1. EPUBからテキスト抽出
-    2. チャンク化
-    3. チャンクごとにまとめ
-    4. 全体概要生成（論文形式800字）
+    1. EPUBからテキスト抽出（目次で章分け）
+       auto で本文全体がモデルの入力上限に収まる場合は、2・3を省略して全文から4を1回で生成
+    2. 章単位でチャンク化
+    3. チャンクごとにまとめ（前回から変わっていないチャンクはキャッシュを、
+       近似重複のチャンクは代表チャンクのまとめを再利用。sampled では選んだチャンクのみ）
+       まとめは1件ごとに analysis_checkpoint に記録し、中断後の再実行では記録済みのチャンクから再開する
+    4. 全体概要生成（論文形式800字。入力が前回と同じならキャッシュを再利用）
+
+    Args:
+        epub_path: EPUBファイルのパス
+        output_dir: テキストファイルの出力先
+        progress_callback: 進捗イベントを受け取るコールバック（形式は _ProgressReporter を参照）
+        cancel_token: キャンセル用トークン（キャンセル時は OperationCancelled を送出）
+        use_cache: 同じ書籍名の前回の分析結果・中断した分析のチェックポイントを再利用するか（analysis_cache を参照）
+        dedup_threshold: 近似重複とみなす類似度（chunk_dedup を参照。Noneの場合は重複検出しない）
+        mode: "auto"（summary_generator.check_long_context で判定し、収まれば全文を1回で送る。
+            収まらなければ full） / "full"（全チャンク） / "sampled"（chunk_sampler で選んだ
+            sample_size 個のチャンクのみ。書籍の長さに関わらずAPI呼び出しは最大 sample_size + 1 回）
+        sample_size: sampled でまとめるチャンク数
+        book_id: 差分キャッシュ・テキストストアのキー（Noneの場合はファイル名。
+            別のディレクトリにある同名のEPUBを並行して分析する場合は、書籍ごとに異なる値を指定する）
+        analysis_file: 分析結果の保存先（Noneの場合は data/internal/book_analysis.json）
 
     Returns:
-        分析結果の辞書
+        分析結果の辞書（analysis_mode は実際に使ったモード。auto の場合は "long_context" か "full"）
+        本文・チャンク・チャンクまとめは text_store に書き出し、結果にはパス（text_file /
+        chunk_summary_store）だけを含める
     """
+    if mode not in ANALYSIS_MODES:
+        raise ValueError(f"未対応の分析モード: {mode}（{' / '.join(ANALYSIS_MODES)}）")
+
     print(f"\n{'='*80}")
     print(f"📚 書籍分析開始: {epub_path.name}")
     print(f"{'='*80}\n")
 
+    progress = _ProgressReporter(progress_callback)
+
     # 1. テキスト抽出
+    progress.start_stage(1)
     print("📖 Step 1/4: テキスト抽出中...")
-    full_text = extract_text_from_epub(epub_path)
-    print(f"  ✓ {len(full_text)}文字を抽出")
-
+    normalize_stats: Dict[str, int] = {}
+    excluded_documents: List[Dict[str, str]] = []
+    book = epub.read_epub(str(epub_path))
+    document_hashes = epub_structure.document_hashes(book)
     book_name = epub_path.stem
+    book_id = book_id or book_name
+
+    # 本文は1章ずつ抽出しながら章ごとの位置のインデックス付きでテキストファイルに書き出し、以降は必要な部分だけ読み出す
+    # （章の辞書には見出しなどだけを残す。ファイル名は <book_id>.<内容のハッシュ>.txt。同じ書籍を同時に分析しても互いに上書きしない）
+    chapters: List[Dict[str, Any]] = []
+    estimated_tokens = 0
+
+    def chapter_texts():
+        nonlocal estimated_tokens
+        for chapter in epub_structure.iter_chapters(book, normalize_stats, excluded_documents):
+            chapters.append({key: value for key, value in chapter.items() if key != 'text'})
+            estimated_tokens += text_normalizer.estimate_tokens(chapter['text'])
+            yield chapter['text']
+
+    book_text = text_store.write(output_dir, book_id, chapter_texts())
+    normalization = text_normalizer.reduction_report(normalize_stats)
+    toc = format_toc(chapters)
+    text_file = book_text.path
+    chunk_texts = None
+    summary_store = None
+    try:
+        print(f"  ✓ {book_text.char_count}文字を抽出（{sum(1 for c in chapters if c['title'])}章）")
+        if excluded_documents:
+            print(f"  ⏭️ 本文以外の文書を除外: {len(excluded_documents)}件"
+                  f"（{', '.join(sorted(set(d['reason'] for d in excluded_documents)))}）")
+            telemetry.increment("epub.documents_excluded", len(excluded_documents))
+        print(f"  🧹 ルビ・空白の正規化: -{normalization['chars_removed']}文字（{normalization['char_reduction']:.1%}）"
+              f" / 推定-{normalization['tokens_removed']}トークン（{normalization['token_reduction']:.1%}）")
+        telemetry.increment("epub.normalize.chars_removed", normalization['chars_removed'])
+        telemetry.increment("epub.normalize.tokens_removed", normalization['tokens_removed'])
+
+        # 前回の分析との差分
+        cache = analysis_cache.load_index(book_id) if use_cache else None
+        if cache and cache['documents']:
+            changed = analysis_cache.changed_documents(cache, document_hashes)
+            print(f"  🔁 前回の分析から変更された文書: {len(changed)}/{len(document_hashes)}件")
+
+        # 本文全体が入力上限に収まるなら、チャンク化せずに1回のリクエストで分析
+        context = None
+        full_text = None
+        checkpoint = None
+        resumed = 0
+        if mode == "auto":
+            # 章ごとの推定トークン数の合計で明らかに収まらない場合は、全文の文字列を作らずにチャンク分析にする
+            context = summary_generator.estimate_long_context(estimated_tokens)
+            if context is None:
+                full_text = book_text.read()
+                context = summary_generator.check_long_context(full_text)
+            mode = "long_context" if context['fits'] else "full"
+            if not context['fits']:
+                full_text = None  # チャンク分析では全文の文字列を保持しない
+            print(f"  📏 本文: {'推定' if context['estimated'] else ''}{context['tokens']:,}トークン"
+                  f"（1回で送れる上限: {context['budget']:,}）→ {'全文を1回で分析' if context['fits'] else 'チャンクに分けて分析'}")
+
+        if mode == "long_context":
+            chunks, targets, pending, chunk_summaries, chunk_labels = [], [], [], [], []
+            deduplicated = 0
+
+            # 4. 全体概要生成（本文・目次が前回と同じならキャッシュを再利用）
+            progress.start_stage(4)
+            print("\n✨ Step 4/4: 全文から全体概要を生成中（チャンク化・チャンクまとめは省略）...")
+            final_key = analysis_cache.long_context_key(full_text, toc)
+            if cache and cache['final'] and cache['final']['key'] == final_key:
+                print("  ♻️ 本文に変更がないため、前回の全体概要を再利用")
+                final_summary = cache['final']['result']
+            else:
+                final_summary = summary_generator.generate_book_summary(
+                    book_name, full_text, max_chars=None, toc=toc,
+                    progress_callback=progress.on_chunk, cancel_token=cancel_token
+                )
+                if cache is not None:
+                    cache['documents'] = document_hashes
+                    cache['final'] = {'key': final_key, 'result': final_summary}
+                    analysis_cache.save_index(book_id, cache)
+        else:
+            # 2. チャンク化
+            progress.start_stage(2)
+            print("\n🔍 Step 2/4: チャンク化中...")
+            chunks = chunk_chapters(
+                ({**chapter, 'text': book_text[index]} for index, chapter in enumerate(chapters)),
+                token_budget=CHUNK_TOKEN_BUDGET
+            )
+            # チャンクの本文もストアに移し、チャンクの辞書には見出しと章だけを残す
+            chunk_texts = text_store.write(
+                text_store.get_store_dir(), f"{book_id}.chunks", (chunk.pop('text') for chunk in chunks)
+            )
+            print(f"  ✓ {len(chunks)}個のチャンクに分割（章をまたがない）")
+            chunk_hashes = [analysis_cache.content_hash(text) for text in chunk_texts]
+            cached_summaries = dict(cache['chunks']) if cache else {}
+
+            # 中断した分析のチェックポイント（同じ内容の書籍なら、記録済みのまとめから再開。
+            # use_cache=False の場合は記録済みのまとめも使わず、最初から記録し直す）
+            checkpoint = analysis_checkpoint.ChunkCheckpoint(
+                analysis_checkpoint.book_key(document_hashes), resume=use_cache
+            )
+            resumed_hashes = set(checkpoint.completed) - set(cached_summaries)
+            cached_summaries.update(checkpoint.completed)
+
+            # サンプル分析では代表的なチャンクだけをまとめる
+            if mode == "sampled":
+                chapter_starts = [
+                    i == 0 or chunk['chapters'][0] != chunks[i - 1]['chapters'][-1]
+                    for i, chunk in enumerate(chunks)
+                ]
+                targets = chunk_sampler.select_chunks(chunk_texts, k=sample_size, chapter_starts=chapter_starts)
+                print(f"  🎯 サンプル分析: {len(targets)}/{len(chunks)}個のチャンクを選択")
+            else:
+                targets = list(range(len(chunks)))
+            pending = [i for i in targets if chunk_hashes[i] not in cached_summaries]
+            resumed = sum(1 for i in targets if chunk_hashes[i] in resumed_hashes)
+
+            # 近似重複のチャンクは代表チャンクだけをまとめる
+            if dedup_threshold is None:
+                representatives = list(range(len(chunks)))
+            else:
+                representatives = chunk_dedup.find_duplicates(chunk_texts, threshold=dedup_threshold)
+            to_summarize: List[int] = []
+            queued = set()
+            for i in pending:
+                digest = chunk_hashes[representatives[i]]
+                if digest not in cached_summaries and digest not in queued:
+                    queued.add(digest)
+                    to_summarize.append(representatives[i])
+            deduplicated = len(pending) - len(to_summarize)
+            progress.chunks_total = len(to_summarize)
+
+            # 3. チャンクまとめ（変更されたチャンクのみ）
+            progress.start_stage(3)
+            print("\n📝 Step 3/4: 各チャンクをまとめ中...")
+            if resumed:
+                print(f"  ⏯️ 中断した分析から再開: {resumed}個のまとめを記録済み")
+            if len(pending) < len(targets):
+                print(f"  ♻️ 前回のまとめを再利用: {len(targets) - len(pending)}個（再生成: {len(pending)}個）")
+            if deduplicated:
+                print(f"  🧬 近似重複のチャンク: {deduplicated}個（代表のまとめを使い回し、API呼び出しを{deduplicated}回削減）")
+            try:
+                new_summaries = summarize_chunks(
+                    chunk_texts.select(to_summarize), progress_callback=progress.on_chunk, cancel_token=cancel_token,
+                    on_summary=lambda j, summary: checkpoint.record(chunk_hashes[to_summarize[j]], summary)
+                )
+            finally:
+                checkpoint.close()
+            # summary_by_hash には実際に生成したまとめだけを持ち、近似重複のチャンクは毎回代表のまとめを引く
+            # （重複の判定結果をキャッシュに残さないため、閾値を変えたり重複検出を止めたりすれば次回から反映される）
+            summary_by_hash = dict(cached_summaries)
+            summary_by_hash.update((chunk_hashes[i], summary) for i, summary in zip(to_summarize, new_summaries))
+            chunk_summaries = [
+                summary_by_hash[chunk_hashes[i]] if chunk_hashes[i] in summary_by_hash
+                else summary_by_hash[chunk_hashes[representatives[i]]]
+                for i in targets
+            ]
+            summary_store = text_store.write(text_store.get_store_dir(), f"{book_id}.summaries", chunk_summaries)
+            print(f"  ✓ {len(chunk_summaries)}個のまとめを生成")
+            telemetry.increment("analysis.chunks_reused", len(targets) - len(pending))
+            telemetry.increment("analysis.chunks_resumed", resumed)
+            telemetry.increment("analysis.chunks_deduplicated", deduplicated)
+
+            if cache is not None:
+                # 今回のチャンクだけを残して保存（全体概要の生成に失敗しても、まとめは次回に再利用できる）
+                cache['documents'] = document_hashes
+                cache['chunks'] = {digest: summary_by_hash[digest] for digest in chunk_hashes if digest in summary_by_hash}
+                analysis_cache.save_index(book_id, cache)
+
+            # 4. 全体概要生成（入力が前回と同じなら再利用。キャッシュするのは full の結果のみ）
+            progress.start_stage(4)
+            print("\n✨ Step 4/4: 全体概要を生成中...")
+            chunk_labels = [chunks[i]['label'] for i in targets]
+            final_key = analysis_cache.final_key(chunk_summaries, chunk_labels, toc)
+            if mode == "full" and cache and cache['final'] and cache['final']['key'] == final_key:
+                print("  ♻️ チャンクまとめに変更がないため、前回の全体概要を再利用")
+                final_summary = cache['final']['result']
+            else:
+                final_summary = generate_final_summary(
+                    chunk_summaries, book_name, progress_callback=progress.on_chunk, cancel_token=cancel_token,
+                    chunk_labels=chunk_labels, toc=toc
+                )
+                if mode == "full" and cache is not None:
+                    cache['final'] = {'key': final_key, 'result': final_summary}
+                    analysis_cache.save_index(book_id, cache)
+
+        # 結果をまとめる
+        result = {
+            "book_name": book_name,
+            "book_id": book_id,
+            "text_file": str(text_file),
+            "character_count": book_text.char_count,
+            "num_chunks": len(chunks),
+            "chapters": [
+                {
+                    "title": chapter['title'],
+                    "level": chapter['level'],
+                    "characters": book_text.chars(index),
+                    "chunks": [i for i, chunk in enumerate(chunks) if index in chunk['chapters']],
+                }
+                for index, chapter in enumerate(chapters)
+            ],
+            "analysis_mode": mode,
+            "context_tokens": context['tokens'] if context else None,
+            "sampled_chunks": targets if mode == "sampled" else None,
+            "chunk_labels": chunk_labels,
+            "reused_chunks": len(targets) - len(pending),
+            "resumed_chunks": resumed,
+            "deduplicated_chunks": deduplicated,
+            "normalization": normalization,
+            "excluded_documents": excluded_documents,
+            "chunk_summary_store": str(summary_store.path) if summary_store else None,
+            "tokens_used": progress.tokens_used,
+            **final_summary
+        }
 
-    # テキストファイルとして保存
-    output_dir.mkdir(parents=True, exist_ok=True)
-    text_file = output_dir / f"{book_name}.txt"
-    with open(text_file, 'w', encoding='utf-8') as f:
-        f.write(full_text)
-
-    # 2. チャンク化
-    print("\n🔍 Step 2/4: チャンク化中...")
-    chunks = chunk_text(full_text, chunk_size=2000)
-    print(f"  ✓ {len(chunks)}個のチャンクに分割")
-
-    # 3. チャンクまとめ
-    print("\n📝 Step 3/4: 各チャンクをまとめ中...")
-    chunk_summaries = summarize_chunks(chunks)
-    print(f"  ✓ {len(chunk_summaries)}個のまとめを生成")
-
-    # 4. 全体概要生成
-    print("\n✨ Step 4/4: 全体概要を生成中...")
-    final_summary = generate_final_summary(chunk_summaries, book_name)
-
-    # 結果をまとめる
-    result = {
-        "book_name": book_name,
-        "text_file": str(text_file),
-        "character_count": len(full_text),
-        "num_chunks": len(chunks),
-        "chunk_summaries": chunk_summaries,
-        **final_summary
-    }
-
-    # data/internal/に保存
-    from .utils import get_project_root, save_json
-
-    internal_dir = get_project_root() / "data" / "internal"
-    internal_dir.mkdir(parents=True, exist_ok=True)
-
-    analysis_file = internal_dir / "book_analysis.json"
-    save_json(analysis_file, result)
+        # data/internal/に保存（analysis_file の指定がある場合はそこに保存）
+        from .utils import get_project_root, save_json
+
+        if analysis_file is None:
+            analysis_file = get_project_root() / "data" / "internal" / "book_analysis.json"
+        Path(analysis_file).parent.mkdir(parents=True, exist_ok=True)
+        save_json(analysis_file, result)
+
+        # 以前の実行で作られた同じ書籍のストアを削除（今回のストアと、最近作られたストアは残す）
+        removed = text_store.prune(output_dir, book_id, keep=[text_file])
+        for suffix, store in (("chunks", chunk_texts), ("summaries", summary_store)):
+            removed += text_store.prune(
+                text_store.get_store_dir(), f"{book_id}.{suffix}", keep=[store.path] if store is not None else []
+            )
+        if removed:
+            print(f"  🧹 古いテキストストアを削除: {removed}件")
+
+        # 最後まで終わったのでチェックポイントは不要
+        if checkpoint is not None:
+            checkpoint.remove()
+    finally:
+        # 途中で失敗・キャンセルした場合もmmapを閉じる
+        for store in (book_text, chunk_texts, summary_store):
+            if store is not None:
+                store.close()
+
+    progress.finish()
 
     print(f"\n{'='*80}")
     print(f"✅ 分析完了！")
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+キャンセル制御モジュール
+
+長時間処理（チャンクまとめ・シナリオ生成・Sora2生成）を協調的に中断するためのトークン
+処理側は区切りごとに check() を呼び、待機には sleep() を使う
+"""
+
+import threading
+import time
+from typing import Callable, List, Optional
+
+
+class OperationCancelled(Exception):
+    """処理がキャンセルされた"""
+
+
+class CancellationToken:
+    """
+    キャンセル要求を伝えるトークン
+
+    別スレッド（StreamlitのボタンコールバックやCLIのシグナルハンドラ）から cancel() を呼ぶと、
+    トークンを受け取った処理が次の区切りで OperationCancelled を送出する
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self) -> None:
+        """キャンセルを要求し、登録済みのコールバック（リモートジョブの削除など）を実行"""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks = list(self._callbacks)
+            self._callbacks.clear()
+
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"⚠️ キャンセル処理に失敗: {e}")
+
+    def register(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """
+        キャンセル時に呼ぶコールバックを登録（既にキャンセル済みなら即座に実行）
+
+        Returns:
+            登録を解除する関数
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+
+                def unregister():
+                    with self._lock:
+                        if callback in self._callbacks:
+                            self._callbacks.remove(callback)
+
+                return unregister
+
+        callback()
+        return lambda: None
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise OperationCancelled("処理がキャンセルされました")
+
+    def wait(self, timeout: float) -> bool:
+        """最大timeout秒待機。キャンセルされた場合はTrueを返す"""
+        return self._event.wait(timeout)
+
+
+def check(token: Optional[CancellationToken]) -> None:
+    """トークンがキャンセル済みなら OperationCancelled を送出（トークンなしの場合は何もしない）"""
+    if token is not None:
+        token.raise_if_cancelled()
+
+
+def sleep(seconds: float, token: Optional[CancellationToken] = None) -> None:
+    """キャンセル可能な待機。キャンセルされた時点で OperationCancelled を送出"""
+    if token is None:
+        time.sleep(seconds)
+        return
+
+    if token.wait(seconds):
+        raise OperationCancelled("処理がキャンセルされました")
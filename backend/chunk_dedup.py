@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+チャンクの近似重複検出（MinHash + LSH）
+
+アンソロジーや連載もの・教科書では、あらすじ・練習問題・定型の見出しなどがほぼ同じ内容で繰り返される
+chunk_dedup は各チャンクの文字n-gramから MinHash 署名を作り、LSH（バンド分割）で候補を絞ってから
+推定Jaccard類似度が閾値以上のチャンクを、先に現れた代表チャンクの重複とみなす
+代表チャンクだけをGeminiでまとめ、重複チャンクには代表のまとめを使い回す
+
+numpy があればベクトル化して計算する（ない場合は同じ結果を純Pythonで計算する）
+
+環境変数:
+    CHUNK_DEDUP_THRESHOLD: 重複とみなす類似度（0〜1、デフォルト: 0.85。1以上で無効）
+"""
+
+import os
+import random
+from typing import Dict, List, Optional, Sequence
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None
+    HAS_NUMPY = False
+
+# 重複とみなす推定Jaccard類似度
+DEFAULT_THRESHOLD = float(os.getenv('CHUNK_DEDUP_THRESHOLD', '0.85'))
+
+# MinHash の関数の数（署名の長さ）と、文字n-gramの長さ
+NUM_PERM = 128
+SHINGLE_SIZE = 5
+
+# ハッシュ関数 (a * x + b) mod P の法（メルセンヌ素数。a * x が64bitに収まる大きさ）
+_PRIME = (1 << 31) - 1
+# n-gram のローリングハッシュ（mod 2^64）
+_BASE = 1000003
+_MASK64 = (1 << 64) - 1
+# numpy で一度に計算するn-gram数（メモリ使用量を抑える）
+_BLOCK = 4096
+_SEED = 1
+
+
+def _permutations(num_perm: int):
+    """MinHash のハッシュ関数の係数（numpy の有無に関わらず同じ値）"""
+    rng = random.Random(_SEED)
+    a = [rng.randrange(1, _PRIME) for _ in range(num_perm)]
+    b = [rng.randrange(0, _PRIME) for _ in range(num_perm)]
+    return a, b
+
+
+def _codepoints(text: str) -> List[int]:
+    """空白を除いた文字コードの列（改行や字下げの違いを無視する）"""
+    return [ord(c) for c in text if not c.isspace()]
+
+
+def _shingles_py(codes: List[int], size: int) -> List[int]:
+    powers = [pow(_BASE, size - 1 - j, 1 << 64) for j in range(size)]
+    hashes = set()
+    for i in range(len(codes) - size + 1):
+        h = 0
+        for j in range(size):
+            h = (h + codes[i + j] * powers[j]) & _MASK64
+        hashes.add(h % _PRIME)
+    return sorted(hashes)
+
+
+def _shingles_np(codes: List[int], size: int):
+    powers = np.array([pow(_BASE, size - 1 - j, 1 << 64) for j in range(size)], dtype=np.uint64)
+    windows = np.lib.stride_tricks.sliding_window_view(np.array(codes, dtype=np.uint64), size)
+    # uint64 の積・和は 2^64 で折り返すため、純Python版の & _MASK64 と同じ値になる
+    hashes = (windows * powers).sum(axis=1, dtype=np.uint64)
+    return np.unique(hashes % np.uint64(_PRIME))
+
+
+def minhash(text: str, num_perm: int = NUM_PERM, shingle_size: int = SHINGLE_SIZE):
+    """
+    テキストの MinHash 署名
+
+    Returns:
+        長さ num_perm の署名（numpy があれば ndarray、なければ list）。空のテキストはNone
+    """
+    codes = _codepoints(text)
+    if not codes:
+        return None
+    size = min(shingle_size, len(codes))
+    a, b = _permutations(num_perm)
+
+    if HAS_NUMPY:
+        shingles = _shingles_np(codes, size)
+        a_col = np.array(a, dtype=np.uint64)[:, None]
+        b_col = np.array(b, dtype=np.uint64)[:, None]
+        signature = np.full(num_perm, _PRIME, dtype=np.uint64)
+        for start in range(0, len(shingles), _BLOCK):
+            block = shingles[None, start:start + _BLOCK]
+            signature = np.minimum(signature, ((a_col * block + b_col) % np.uint64(_PRIME)).min(axis=1))
+        return signature
+
+    shingles = _shingles_py(codes, size)
+    return [min((a_i * x + b_i) % _PRIME for x in shingles) for a_i, b_i in zip(a, b)]
+
+
+def estimate_similarity(sig_a, sig_b) -> float:
+    """2つの署名から Jaccard 類似度を推定（一致する要素の割合）"""
+    if HAS_NUMPY and isinstance(sig_a, np.ndarray):
+        return float(np.mean(sig_a == sig_b))
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+
+def choose_rows(num_perm: int, threshold: float) -> int:
+    """
+    LSH の1バンドあたりの行数を選ぶ
+
+    候補になりやすさが 0.5 になる類似度 (1/バンド数)^(1/行数) が閾値以下で最も近いものを使う
+    （取りこぼしを減らし、誤検出は署名の類似度で確認して除く）
+    """
+    best_rows = 1
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        if (1 / bands) ** (1 / rows) <= threshold:
+            best_rows = rows
+    return best_rows
+
+
+def _band_key(signature, band: int, rows: int):
+    part = signature[band * rows:(band + 1) * rows]
+    return part.tobytes() if HAS_NUMPY and isinstance(part, np.ndarray) else tuple(part)
+
+
+def find_duplicates(
+    texts: Sequence[str],
+    threshold: float = DEFAULT_THRESHOLD,
+    num_perm: int = NUM_PERM,
+    shingle_size: int = SHINGLE_SIZE
+) -> List[int]:
+    """
+    近似重複のチャンクを検出
+
+    先頭から順に、これまでの代表チャンクのうち類似度が閾値以上で最も近いものを代表とする
+    （重複チャンクは必ず代表チャンクと直接似ている）
+
+    Args:
+        texts: チャンクのテキスト
+        threshold: 重複とみなす推定Jaccard類似度（1より大きい値で無効）
+        num_perm: 署名の長さ
+        shingle_size: 文字n-gramの長さ
+
+    Returns:
+        各チャンクの代表チャンクのインデックス（重複でなければ自分自身）
+    """
+    if threshold > 1 or len(texts) < 2:
+        return list(range(len(texts)))
+
+    rows = choose_rows(num_perm, threshold)
+    bands = num_perm // rows
+    signatures = [minhash(text, num_perm, shingle_size) for text in texts]
+    buckets: Dict[tuple, List[int]] = {}
+    representatives: List[int] = []
+
+    for j, signature in enumerate(signatures):
+        if signature is None:
+            representatives.append(j)
+            continue
+
+        keys = [(band, _band_key(signature, band, rows)) for band in range(bands)]
+        candidates = sorted({i for key in keys for i in buckets.get(key, ())})
+
+        best: Optional[int] = None
+        best_similarity = threshold
+        for i in candidates:
+            similarity = estimate_similarity(signatures[i], signature)
+            if similarity > best_similarity or (best is None and similarity >= threshold):
+                best, best_similarity = i, similarity
+
+        if best is None:
+            representatives.append(j)
+            for key in keys:
+                buckets.setdefault(key, []).append(j)
+        else:
+            representatives.append(best)
+
+    return representatives
+
+
+def count_duplicates(representatives: Sequence[int]) -> int:
+    """find_duplicates() の結果のうち重複チャンクの数（＝削減できるAPI呼び出し数）"""
+    return sum(1 for i, rep in enumerate(representatives) if rep != i)
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+サンプル分析用のチャンク選択（抽出型）
+
+書籍全体をまとめずに、代表的なチャンクだけを選んでGeminiに送るためのスコアリング
+APIを呼ばずにローカルで計算するので、書籍の長さに関わらず数秒・一定のAPI呼び出し数で概要を作れる
+
+1. 各チャンクを文字bigramのTF-IDFベクトルにする（ハッシュで次元を固定）
+2. 全チャンクの重心とのコサイン類似度（中心性）を基本スコアにする
+3. 章の先頭・書籍の冒頭と結末付近のチャンクに位置の重みを掛ける
+4. 既に選んだチャンクと似たものを減点しながら（MMR）上位K個を選ぶ
+
+numpy がない場合は、書籍全体から均等な間隔でK個を選ぶ
+"""
+
+import math
+from typing import List, Optional, Sequence
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None
+    HAS_NUMPY = False
+
+# サンプル分析でまとめるチャンク数の既定値
+SAMPLE_SIZE = 8
+
+# bigram をハッシュする次元数
+FEATURE_DIM = 4096
+
+# 位置の重み（章の先頭 / 書籍の冒頭・結末付近）
+CHAPTER_START_WEIGHT = 0.3
+EDGE_WEIGHT = 0.3
+# 冒頭・結末とみなす範囲（全体に対する割合）
+EDGE_RATIO = 0.1
+
+# MMR で既に選んだチャンクとの類似度に掛ける係数（大きいほど多様なチャンクを選ぶ）
+DIVERSITY = 0.3
+
+
+def _tfidf_matrix(texts: Sequence[str]):
+    """文字bigramのTF-IDF行列（行ごとにL2正規化済み）"""
+    counts = np.zeros((len(texts), FEATURE_DIM), dtype=np.float32)
+    for row, text in enumerate(texts):
+        codes = np.array([ord(c) for c in text if not c.isspace()], dtype=np.int64)
+        if len(codes) < 2:
+            continue
+        features = (codes[:-1] * 1000003 + codes[1:]) % FEATURE_DIM
+        counts[row] = np.bincount(features, minlength=FEATURE_DIM)
+
+    df = (counts > 0).sum(axis=0)
+    idf = np.log((1 + len(texts)) / (1 + df)) + 1
+    matrix = np.log1p(counts) * idf
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+def _centrality(matrix):
+    """各行と全体の重心とのコサイン類似度"""
+    centroid = matrix.mean(axis=0)
+    norm = np.linalg.norm(centroid)
+    return matrix @ (centroid / norm) if norm else np.zeros(len(matrix))
+
+
+def position_weights(count: int, chapter_starts: Optional[Sequence[bool]] = None) -> List[float]:
+    """
+    位置の重み（1.0が基準）
+
+    Args:
+        count: チャンク数
+        chapter_starts: 各チャンクが章の先頭かどうか
+    """
+    weights = []
+    for i in range(count):
+        position = i / (count - 1) if count > 1 else 0.0
+        edge = max(0.0, 1 - min(position, 1 - position) / EDGE_RATIO)
+        weight = 1 + EDGE_WEIGHT * edge
+        if chapter_starts is not None and chapter_starts[i]:
+            weight += CHAPTER_START_WEIGHT
+        weights.append(weight)
+    return weights
+
+
+def score_chunks(texts: Sequence[str], chapter_starts: Optional[Sequence[bool]] = None) -> List[float]:
+    """
+    各チャンクの代表性スコア（中心性 × 位置の重み）
+
+    numpy がない場合は位置の重みのみ
+    """
+    weights = position_weights(len(texts), chapter_starts)
+    if not HAS_NUMPY or not texts:
+        return weights
+
+    centrality = _centrality(_tfidf_matrix(texts))
+    return [float(c) * w for c, w in zip(centrality, weights)]
+
+
+def select_chunks(
+    texts: Sequence[str],
+    k: int = SAMPLE_SIZE,
+    chapter_starts: Optional[Sequence[bool]] = None
+) -> List[int]:
+    """
+    代表的なチャンクをK個選ぶ
+
+    Args:
+        texts: チャンクのテキスト
+        k: 選ぶ数
+        chapter_starts: 各チャンクが章の先頭かどうか（位置の重みに使う）
+
+    Returns:
+        選んだチャンクのインデックス（書籍の順）
+    """
+    count = len(texts)
+    if k >= count:
+        return list(range(count))
+    if k <= 0:
+        return []
+
+    if not HAS_NUMPY:
+        # 均等な間隔で選ぶ（先頭と末尾を含む）
+        if k == 1:
+            return [0]
+        return sorted({round(i * (count - 1) / (k - 1)) for i in range(k)})
+
+    matrix = _tfidf_matrix(texts)
+    scores = _centrality(matrix) * np.array(position_weights(count, chapter_starts))
+    selected: List[int] = []
+    max_similarity = np.zeros(count)
+
+    for _ in range(k):
+        mmr = scores - DIVERSITY * max_similarity
+        mmr[selected] = -math.inf
+        best = int(np.argmax(mmr))
+        selected.append(best)
+        max_similarity = np.maximum(max_similarity, matrix @ matrix[best])
+
+    return sorted(selected)
+
+
+def text_similarity(text_a: str, text_b: str) -> Optional[float]:
+    """2つのテキストの文字bigram TF-IDFのコサイン類似度（numpy がない場合はNone）"""
+    if not HAS_NUMPY:
+        return None
+    matrix = _tfidf_matrix([text_a, text_b])
+    return float(matrix[0] @ matrix[1])
@@ -7,43 +7,37 @@ EPUBからテキストを抽出（v1非依存）
 
 import json
 from pathlib import Path
-from typing import Dict, Any
-import ebooklib
+from typing import Dict, Any, List, Optional
 from ebooklib import epub
-from bs4 import BeautifulSoup
 from .utils import save_json, get_project_root
+from . import text_normalizer
+from . import epub_structure
+from . import text_store
 
 
-def extract_text_from_epub(epub_path: Path) -> str:
+def extract_text_from_epub(
+    epub_path: Path,
+    stats: Optional[Dict[str, int]] = None,
+    excluded: Optional[List[Dict[str, str]]] = None
+) -> str:
     """
-    EPUBファイルからテキストを抽出
+    EPUBファイルから本文テキストを抽出
+
+    表紙・目次・奥付・広告などの本文以外の文書は除外する（判定は epub_structure を参照）
 
     Args:
         epub_path: EPUBファイルのパス
+        stats: 指定した場合、正規化前後の文字数・推定トークン数を集計する
+            （text_normalizer.reduction_report() で削減量に変換）
+        excluded: 指定した場合、除外した文書（file / reason）を追加する
 
     Returns:
-        抽出されたテキスト
+        抽出されたテキスト（ルビ除去・NFKC・空白圧縮済み）
     """
     book = epub.read_epub(str(epub_path))
 
-    text_content = []
-
-    # すべてのドキュメントアイテムを取得
-    for item in book.get_items():
-        if item.get_type() == ebooklib.ITEM_DOCUMENT:
-            # HTMLコンテンツをパース
-            soup = BeautifulSoup(item.get_content(), 'html.parser')
-
-            # テキストを抽出
-            text = soup.get_text(separator='\n', strip=True)
-
-            if text:
-                text_content.append(text)
-
-    # すべてのテキストを結合
-    full_text = '\n\n'.join(text_content)
-
-    return full_text
+    # spine の順に本文の文書だけを結合
+    return epub_structure.extract_content_text(book, stats, excluded)
 
 
 def parse_epub(epub_path: Path, output_dir: Path) -> Dict[str, Any]:
@@ -55,51 +49,54 @@ def parse_epub(epub_path: Path, output_dir: Path) -> Dict[str, Any]:
         output_dir: 出力先ディレクトリ（data/raw/）
 
     Returns:
-        基本情報の辞書
+        基本情報の辞書（本文は含めない。text_store.load(text_file) で章ごとに読み出す）
     """
     print(f"  📖 EPUBファイルを解析中: {epub_path.name}")
 
-    # EPUBからテキストを抽出
-    full_text = extract_text_from_epub(epub_path)
+    # EPUBから章ごとに本文を抽出
+    normalize_stats: Dict[str, int] = {}
+    excluded_documents: List[Dict[str, str]] = []
+    book = epub.read_epub(str(epub_path))
 
     # 書籍名（ファイル名から）
     book_name = epub_path.stem
 
-    # 出力ディレクトリを作成
-    output_dir.mkdir(parents=True, exist_ok=True)
-
-    # テキストファイルとして保存
-    text_file = output_dir / f"{book_name}.txt"
-    with open(text_file, 'w', encoding='utf-8') as f:
-        f.write(full_text)
-
-    print(f"  ✓ テキスト抽出完了: {len(full_text)}文字")
-
-    # EPUBファイルもコピー
-    epub_dest = output_dir / epub_path.name
-    if not epub_dest.exists():
-        import shutil
-        shutil.copy2(epub_path, epub_dest)
-
-    # 基本情報を作成
-    summary = {
-        "book_name": book_name,
-        "original_file": str(epub_dest),
-        "text_file": str(text_file),
-        "full_text": full_text,  # 後続処理で使用
-        "character_count": len(full_text),
-        "preview": full_text[:500] + "..." if len(full_text) > 500 else full_text,
-        "status": "parsed"
-    }
+    # 1章ずつ抽出しながらテキストファイルとして保存（章ごとの位置のインデックス付き。ファイル名は <書籍名>.<内容のハッシュ>.txt）
+    chapters = epub_structure.iter_chapters(book, normalize_stats, excluded_documents)
+    with text_store.write(output_dir, book_name, (chapter['text'] for chapter in chapters)) as book_text:
+        normalization = text_normalizer.reduction_report(normalize_stats)
+
+        print(f"  ✓ テキスト抽出完了: {book_text.char_count}文字"
+              f"（正規化で-{normalization['chars_removed']}文字 / {normalization['char_reduction']:.1%}）")
+
+        # EPUBファイルもコピー
+        epub_dest = output_dir / epub_path.name
+        if not epub_dest.exists():
+            import shutil
+            shutil.copy2(epub_path, epub_dest)
+
+        # 基本情報を作成
+        summary = {
+            "book_name": book_name,
+            "original_file": str(epub_dest),
+            "text_file": str(book_text.path),  # 後続処理では text_store.load() で開く
+            "character_count": book_text.char_count,
+            "normalization": normalization,
+            "excluded_documents": excluded_documents,
+            "preview": book_text.head(500) + "..." if book_text.char_count > 500 else book_text.head(500),
+            "status": "parsed"
+        }
 
     # data/internal/に基本情報を保存
     internal_dir = get_project_root() / "data" / "internal"
     internal_dir.mkdir(parents=True, exist_ok=True)
     basic_info_file = internal_dir / "basic_info.json"
 
-    save_data = {k: v for k, v in summary.items() if k != 'full_text'}  # full_textは除外
-    save_json(basic_info_file, save_data)
+    save_json(basic_info_file, summary)
 
     print(f"  💾 基本情報を保存: {basic_info_file}")
 
+    # 以前に抽出した同じ書籍の本文を削除（今回のストアと、最近作られたストアは残す）
+    text_store.prune(output_dir, book_name, keep=[summary['text_file']])
+
     return summary
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+EPUBの構造解析モジュール
+
+表紙・扉・目次・奥付・著作権表示・広告などの本文以外の文書を、チャンク化の前に除外する
+判定は安いものから順に行い、どれかに該当した時点で除外する
+
+1. ナビゲーション文書（nav）・spine の linear="no"
+2. OPFの guide / navの landmarks で指定された種別（cover, toc, colophon など）
+3. 文書の body / section に付いた epub:type
+4. 本文テキストの簡易判定（前後の短い文書のみ。目次見出し・奥付や広告の定型句・扉）
+
+文書は spine（読む順）で処理し、目次（NCX / nav）のリンク先で章に分ける
+すべて除外された場合は安全のため nav 以外の全文書を本文として扱う
+"""
+
+import hashlib
+import posixpath
+import re
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import unquote
+
+import ebooklib
+from ebooklib import epub
+
+from . import text_normalizer
+
+# 本文ではない文書の種別（EPUB 3 Structural Semantics / OPF2 guide の type）
+NON_CONTENT_TYPES = {
+    'cover', 'titlepage', 'title-page', 'halftitlepage', 'seriespage',
+    'toc', 'landmarks', 'loi', 'lot', 'index',
+    'copyright-page', 'colophon', 'imprint', 'imprimatur', 'errata',
+    'dedication', 'acknowledgments', 'acknowledgements', 'contributors', 'other-credits',
+}
+
+# テキスト判定の対象とする文書の長さ（これより長い文書は本文とみなす）
+SHORT_DOCUMENT_CHARS = 1500
+
+# 前付け・後付けとみなす spine 上の位置（先頭・末尾からの割合）
+FRONT_MATTER_RATIO = 0.2
+BACK_MATTER_RATIO = 0.2
+
+# 扉とみなす文字数（句点のない短い文書）
+TITLE_PAGE_CHARS = 200
+
+_TOC_HEADING = re.compile(r'^(目次|もくじ|目 次|contents|table of contents)$', re.IGNORECASE)
+_COLOPHON_TERMS = re.compile(
+    r'奥付|発行者|発行所|発行人|印刷所|製本所|初版|第\d+刷|ISBN|©|\(c\)|copyright|'
+    r'all rights reserved|無断(?:転載|複製|複写)|本書の(?:無断|全部または一部)',
+    re.IGNORECASE
+)
+_AD_TERMS = re.compile(r'好評発売中|既刊|近刊|新刊案内|刊行予定|お買い求め|ご購入|定価|税込|税別|本体価格|シリーズ続々')
+
+# body / section / div に付いた epub:type（最初に現れたもの）
+_EPUB_TYPE = re.compile(rb'<(?:body|section|div)\b[^>]*\bepub:type\s*=\s*["\']([^"\']+)["\']', re.IGNORECASE)
+_LANDMARKS_NAV = re.compile(rb'<nav\b[^>]*epub:type\s*=\s*["\']landmarks["\'][^>]*>(.*?)</nav>', re.IGNORECASE | re.DOTALL)
+_LANDMARK_LINK = re.compile(
+    rb'<a\b(?=[^>]*\bepub:type\s*=\s*["\']([^"\']+)["\'])(?=[^>]*\bhref\s*=\s*["\']([^"\']+)["\'])',
+    re.IGNORECASE
+)
+
+
+def _resolve_href(base_file: str, href: str) -> str:
+    """文書からの相対hrefを、OPF基準のファイル名に変換（#以降は除く）"""
+    path = unquote(href.split('#', 1)[0])
+    return posixpath.normpath(posixpath.join(posixpath.dirname(base_file), path))
+
+
+def load_landmarks(book: epub.EpubBook) -> Dict[str, str]:
+    """
+    guide（EPUB 2）と nav の landmarks（EPUB 3）から、ファイル名 → 種別 の対応を作成
+
+    Returns:
+        {ファイル名: 種別}（本文開始位置を示す "text" / "bodymatter" も含む）
+    """
+    landmarks: Dict[str, str] = {}
+
+    for ref in getattr(book, 'guide', None) or []:
+        if ref.get('href') and ref.get('type'):
+            landmarks[_resolve_href('', ref['href'])] = ref['type'].lower()
+
+    for item in book.get_items_of_type(ebooklib.ITEM_DOCUMENT):
+        if not isinstance(item, epub.EpubNav):
+            continue
+        section = _LANDMARKS_NAV.search(item.get_content() or b'')
+        if section is None:
+            continue
+        for types, href in _LANDMARK_LINK.findall(section.group(1)):
+            name = _resolve_href(item.file_name, href.decode('utf-8', 'replace'))
+            # "frontmatter toc" のように複数ある場合は最後（最も具体的なもの）を使う
+            landmarks[name] = types.decode('utf-8', 'replace').split()[-1].lower()
+
+    return landmarks
+
+
+def spine_documents(book: epub.EpubBook) -> List[Tuple[Any, bool]]:
+    """
+    spine（読む順）に並んだ文書と linear 属性の一覧
+
+    spine が空の場合は manifest の順で全文書を返す
+    """
+    documents = []
+    for entry in book.spine:
+        idref, linear = entry if isinstance(entry, tuple) else (entry, 'yes')
+        item = book.get_item_with_id(idref)
+        if item is not None and item.get_type() == ebooklib.ITEM_DOCUMENT:
+            documents.append((item, linear != 'no'))
+
+    if not documents:
+        documents = [(item, True) for item in book.get_items_of_type(ebooklib.ITEM_DOCUMENT)]
+    return documents
+
+
+def document_hashes(book: epub.EpubBook) -> Dict[str, str]:
+    """spine 上の文書ごとの内容ハッシュ（sha256）。改訂版との差分の検出に使う"""
+    return {
+        posixpath.normpath(item.file_name): hashlib.sha256(item.get_content() or b'').hexdigest()
+        for item, _ in spine_documents(book)
+    }
+
+
+def classify_structure(item, linear: bool, landmarks: Dict[str, str]) -> Optional[str]:
+    """
+    EPUBの構造情報から本文以外かどうかを判定
+
+    Returns:
+        除外理由（本文の場合はNone）
+    """
+    if isinstance(item, epub.EpubNav):
+        return 'nav'
+    if isinstance(item, epub.EpubCoverHtml):
+        return 'cover'
+    if not linear:
+        return 'linear=no'
+
+    landmark = landmarks.get(posixpath.normpath(item.file_name))
+    if landmark in NON_CONTENT_TYPES:
+        return f'landmark:{landmark}'
+
+    match = _EPUB_TYPE.search(item.get_content() or b'')
+    if match:
+        for epub_type in match.group(1).decode('utf-8', 'replace').lower().split():
+            if epub_type in NON_CONTENT_TYPES:
+                return f'epub:type:{epub_type}'
+
+    return None
+
+
+def classify_text(text: str, index: int, total: int, titled: bool = False) -> Optional[str]:
+    """
+    本文テキストの簡易判定（前付け・後付けの位置にある短い文書のみ）
+
+    Args:
+        text: 正規化済みの文書テキスト
+        index: 本文候補（構造情報で除外されなかった文書）の中での位置（0始まり）
+        total: 本文候補の文書数
+        titled: 目次から参照されている文書か（Trueの場合は扉の判定をしない）
+
+    Returns:
+        除外理由（本文の場合はNone）
+    """
+    if len(text) > SHORT_DOCUMENT_CHARS:
+        return None
+
+    front = index < max(1, total * FRONT_MATTER_RATIO)
+    back = index >= total - max(1, total * BACK_MATTER_RATIO)
+    if not (front or back):
+        return None
+
+    first_line = text.split('\n', 1)[0].strip()
+    if _TOC_HEADING.match(first_line):
+        return 'text:toc'
+    if len(set(m.lower() for m in _COLOPHON_TERMS.findall(text))) >= 2:
+        return 'text:colophon'
+    if back and len(set(_AD_TERMS.findall(text))) >= 2:
+        return 'text:advertisement'
+    if front and not titled and len(text) <= TITLE_PAGE_CHARS and '。' not in text:
+        return 'text:titlepage'
+
+    return None
+
+
+def toc_entries(book: epub.EpubBook) -> List[Dict[str, Any]]:
+    """
+    目次（NCX / nav）を読む順に平坦化
+
+    Returns:
+        [{'title', 'level'（1始まり）, 'file', 'anchor'（#以降。なければNone）}, ...]
+        （spine にない文書を指す項目と、同じ位置を指す2つ目以降の項目は除く）
+    """
+    spine_files = {posixpath.normpath(item.file_name) for item, _ in spine_documents(book)}
+    ncx = next(iter(book.get_items_of_type(ebooklib.ITEM_NAVIGATION)), None)
+    ncx_file = ncx.file_name if ncx is not None else ''
+
+    entries: List[Dict[str, Any]] = []
+    seen = set()
+
+    def visit(nodes, level: int) -> None:
+        for node in nodes:
+            children = []
+            if isinstance(node, tuple):
+                node, children = node
+            href = getattr(node, 'href', '') or ''
+            title = (getattr(node, 'title', '') or '').strip()
+            if href and title:
+                path, _, anchor = href.partition('#')
+                # nav 由来はOPF基準、NCX 由来はNCXファイル基準のパス
+                file = _resolve_href('', path)
+                if file not in spine_files:
+                    file = _resolve_href(ncx_file, path)
+                key = (file, anchor or None)
+                if file in spine_files and key not in seen:
+                    seen.add(key)
+                    entries.append({'title': title, 'level': level, 'file': file, 'anchor': anchor or None})
+            visit(children, level + 1)
+
+    visit(book.toc or [], 1)
+    return entries
+
+
+def _append_sections(
+    chapters: List[Dict[str, Any]],
+    file: str,
+    doc_entries: List[Dict[str, Any]],
+    sections: List[Tuple[Optional[str], str]]
+) -> None:
+    """文書の区切りを章に振り分ける（目次にない部分は直前の章に続ける）"""
+    by_anchor = {entry['anchor']: entry for entry in doc_entries}
+    for anchor, text in sections:
+        entry = by_anchor.get(anchor)
+        if entry is not None:
+            chapters.append({'title': entry['title'], 'level': entry['level'], 'file': file, 'text': text})
+        elif not text:
+            continue
+        elif chapters:
+            chapters[-1]['text'] = (chapters[-1]['text'] + '\n\n' + text).strip()
+        else:
+            chapters.append({'title': None, 'level': 0, 'file': file, 'text': text})
+
+
+def extract_chapters(
+    book: epub.EpubBook,
+    stats: Optional[Dict[str, int]] = None,
+    excluded: Optional[List[Dict[str, str]]] = None
+) -> List[Dict[str, Any]]:
+    """
+    本文の文書だけを spine の順に正規化し、目次の項目ごとの章に分ける
+
+    目次のリンク先（文書の先頭、または文書内のid）で区切り、目次にない文書は直前の章に続ける
+    目次がない場合は本文全体が1つの章（title=None）になる
+
+    Args:
+        book: 読み込み済みのEPUB
+        stats: text_normalizer の集計用の辞書（本文の文書のみ集計）
+        excluded: 指定した場合、除外した文書（file / reason）を追加する
+
+    Returns:
+        [{'title'（目次の見出し。目次より前の部分はNone）, 'level', 'file', 'text'}, ...]
+    """
+    return list(iter_chapters(book, stats, excluded))
+
+
+def iter_chapters(
+    book: epub.EpubBook,
+    stats: Optional[Dict[str, int]] = None,
+    excluded: Optional[List[Dict[str, str]]] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    extract_chapters() と同じ章を1章ずつ返す（引数・章の形式は extract_chapters() と同じ）
+
+    章は次の章が始まった時点で確定して返すため、書籍全体の本文をメモリに持たずに
+    text_store などへ書き出せる（stats・excluded は最後まで読み出した時点で揃う）
+    """
+    documents = spine_documents(book)
+    landmarks = load_landmarks(book)
+    entries_by_file: Dict[str, List[Dict[str, Any]]] = {}
+    for entry in toc_entries(book):
+        entries_by_file.setdefault(entry['file'], []).append(entry)
+
+    # 前付け・後付けの位置は、nav や landmarks で除外した文書を除いた本文候補の中で数える
+    # （nav の直後にある扉も前付けの位置になるように）
+    classified = [(item, classify_structure(item, linear, landmarks)) for item, linear in documents]
+    total = sum(1 for _, reason in classified if reason is None)
+    index = 0
+
+    # 目次にない文書は直前の章に続けるため、最後の章だけは次の章が始まるまで保留する
+    chapters: List[Dict[str, Any]] = []
+    skipped: List[Dict[str, Any]] = []
+    found = False
+
+    for item, reason in classified:
+        file = posixpath.normpath(item.file_name)
+        if reason is None:
+            position = index
+            index += 1
+            doc_entries = entries_by_file.get(file, [])
+            anchors = [entry['anchor'] for entry in doc_entries if entry['anchor']]
+            doc_stats: Dict[str, int] = {}
+            sections = text_normalizer.html_to_sections(item.get_content(), anchors, doc_stats)
+            text = '\n'.join(section for _, section in sections if section)
+            if not text:
+                continue
+            # 目次から章の先頭として参照されている文書は扉と判定しない
+            reason = classify_text(text, position, total, titled=bool(doc_entries))
+            if reason is None:
+                _append_sections(chapters, file, doc_entries, sections)
+                if stats is not None:
+                    for key, value in doc_stats.items():
+                        stats[key] = stats.get(key, 0) + value
+                while len(chapters) > 1:
+                    chapter = chapters.pop(0)
+                    if chapter['text']:
+                        found = True
+                        yield chapter
+                continue
+        skipped.append({'file': item.file_name, 'reason': reason, 'item': item})
+
+    for chapter in chapters:
+        if chapter['text']:
+            found = True
+            yield chapter
+
+    fallback = None
+    if not found and skipped:
+        # 判定を誤って全文書を除外した場合は、nav以外の全文書を使う
+        print("  ⚠️ 本文と判定できる文書がないため、全文書を対象にします")
+        texts = []
+        for entry in skipped:
+            if entry['reason'] == 'nav':
+                continue
+            text = text_normalizer.html_to_text(entry['item'].get_content(), stats)
+            if text:
+                texts.append(text)
+        if texts:
+            fallback = {'title': None, 'level': 0, 'file': skipped[0]['file'], 'text': '\n\n'.join(texts)}
+        skipped = [entry for entry in skipped if entry['reason'] == 'nav']
+
+    if excluded is not None:
+        excluded.extend({'file': entry['file'], 'reason': entry['reason']} for entry in skipped)
+
+    if fallback is not None:
+        yield fallback
+
+
+def extract_content_text(
+    book: epub.EpubBook,
+    stats: Optional[Dict[str, int]] = None,
+    excluded: Optional[List[Dict[str, str]]] = None
+) -> str:
+    """
+    本文の文書だけを spine の順に正規化して結合（引数は extract_chapters() と同じ）
+
+    Returns:
+        章ごとに空行で区切った本文テキスト
+    """
+    return '\n\n'.join(chapter['text'] for chapter in extract_chapters(book, stats, excluded))
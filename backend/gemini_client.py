@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Geminiモデルのレジストリ
+
+genai.configure() と GenerativeModel の生成を呼び出しごとに行うと、
+そのたびにクライアント（通信路）が作り直されて接続が再利用されない
+このモジュールはAPIキーの設定をプロセスで1回だけ行い、(モデル名, 生成設定) ごとに
+作成済みのモデルを使い回す（スレッドセーフ）
+
+使い方:
+    from . import gemini_client
+
+    model = gemini_client.get_model()
+    response = model.generate_content(prompt)
+
+Streamlitのページは表示時に warm_up() を呼び、最初のGemini呼び出しの前にモデルを作成しておく
+（レジストリはプロセス全体で1つなので、全セッション・全ページで共有される）
+"""
+
+import json
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import google.generativeai as genai
+from dotenv import load_dotenv
+
+# .envファイルから環境変数を読み込む
+load_dotenv()
+
+# 既定のモデル
+DEFAULT_MODEL = 'gemini-2.5-flash-lite'
+
+# モデルの入力トークン上限を取得できない場合の値（gemini-2.5 系は 1,048,576）
+DEFAULT_INPUT_TOKEN_LIMIT = 1_048_576
+
+
+def get_api_key() -> str:
+    """Gemini APIキーを取得"""
+    api_key = os.getenv("GOOGLE_API_KEY")
+    if not api_key:
+        raise ValueError("GOOGLE_API_KEY環境変数が設定されていません")
+    return api_key
+
+
+def _config_key(generation_config: Optional[Dict[str, Any]]) -> str:
+    """生成設定をキャッシュキーに変換（キーの順序に依存しない）"""
+    if not generation_config:
+        return ''
+    return json.dumps(generation_config, sort_keys=True, default=str)
+
+
+class ModelRegistry:
+    """(モデル名, 生成設定) ごとに GenerativeModel を1つだけ作成して共有する"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._models: Dict[Tuple[str, str], genai.GenerativeModel] = {}
+        self._token_limits: Dict[str, int] = {}
+        self._api_key: Optional[str] = None
+
+    def get_model(
+        self,
+        model_name: str = DEFAULT_MODEL,
+        generation_config: Optional[Dict[str, Any]] = None
+    ) -> genai.GenerativeModel:
+        """
+        作成済みのモデルを返す（初回のみAPIキー設定とモデル作成を行う）
+
+        Args:
+            model_name: モデル名
+            generation_config: 生成設定（temperature など）
+
+        Returns:
+            GenerativeModel
+        """
+        api_key = get_api_key()
+        key = (model_name, _config_key(generation_config))
+
+        model = self._models.get(key)
+        if model is not None and api_key == self._api_key:
+            return model
+
+        with self._lock:
+            # APIキーが変わった場合は設定し直し、作成済みのモデルも破棄する
+            if api_key != self._api_key:
+                genai.configure(api_key=api_key)
+                self._api_key = api_key
+                self._models.clear()
+
+            model = self._models.get(key)
+            if model is None:
+                model = genai.GenerativeModel(model_name, generation_config=generation_config)
+                self._models[key] = model
+
+        return model
+
+    def input_token_limit(self, model_name: str = DEFAULT_MODEL) -> int:
+        """
+        モデルの入力トークン上限（初回のみAPIで取得。取得できない場合は DEFAULT_INPUT_TOKEN_LIMIT）
+        """
+        limit = self._token_limits.get(model_name)
+        if limit is not None:
+            return limit
+
+        self.get_model(model_name)
+        try:
+            limit = genai.get_model(f"models/{model_name}").input_token_limit or DEFAULT_INPUT_TOKEN_LIMIT
+        except Exception as e:
+            print(f"  ⚠️ {model_name} の入力トークン上限を取得できませんでした: {e}")
+            return DEFAULT_INPUT_TOKEN_LIMIT
+
+        with self._lock:
+            self._token_limits[model_name] = limit
+        return limit
+
+    def clear(self) -> None:
+        """作成済みのモデルを破棄（次回の get_model で作り直す）"""
+        with self._lock:
+            self._models.clear()
+            self._token_limits.clear()
+            self._api_key = None
+
+
+# プロセス全体で共有するレジストリ
+_registry = ModelRegistry()
+
+
+def get_registry() -> ModelRegistry:
+    """プロセス全体で共有するレジストリを取得"""
+    return _registry
+
+
+def get_model(
+    model_name: str = DEFAULT_MODEL,
+    generation_config: Optional[Dict[str, Any]] = None
+) -> genai.GenerativeModel:
+    """共有レジストリからモデルを取得"""
+    return _registry.get_model(model_name, generation_config)
+
+
+def warm_up(model_name: str = DEFAULT_MODEL) -> bool:
+    """
+    既定のモデルを作成しておく（2回目以降は作成済みのモデルを返すだけ）
+
+    Returns:
+        作成できた場合True（APIキー未設定の場合はFalse。エラーは実際の呼び出し時に表示する）
+    """
+    try:
+        _registry.get_model(model_name)
+        return True
+    except ValueError:
+        return False
+
+
+def input_token_limit(model_name: str = DEFAULT_MODEL) -> int:
+    """共有レジストリからモデルの入力トークン上限を取得"""
+    return _registry.input_token_limit(model_name)
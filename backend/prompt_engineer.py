@@ -4,9 +4,14 @@ Sora2プロンプトエンジニアリングモジュール
 
 書籍情報とシナリオから最適なSora2プロンプトを生成
 sample_sora.pyのプロンプト構造を参考に、詳細なシーン構成を生成
+スタイル表・テンプレートは prompt_templates で一元管理する
 """
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+
+from . import prompt_templates
+from . import prompt_preflight
+from .sora2_engine import ALLOWED_DURATIONS, RENDER_TIERS
 
 
 # グローバルスタイル定義（sample_sora.pyと同様）
@@ -17,6 +22,14 @@ GLOBAL_STYLE = (
     "Crisp motion, minimal motion blur."
 )
 
+class PromptValidationError(ValueError):
+    """バッチ内のプロンプトがSora2の制限を満たさない"""
+
+    def __init__(self, problems: Dict[int, List[str]]):
+        self.problems = problems
+        details = "; ".join(f"シーン{n}: {', '.join(p)}" for n, p in sorted(problems.items()))
+        super().__init__(f"プロンプトの検証に失敗しました（{details}）")
+
 
 def create_sora2_prompt(
     scenario: Dict[str, Any],
@@ -57,52 +70,18 @@ def create_sora2_prompt(
     # ナレーションを削除して連続したテキストにする
     summary_cleaned = summary.replace('\n', '').replace('\r', '')
 
-    # ビジュアルスタイルに応じたスタイル記述
-    style_map = {
-        "Photorealistic": "photorealistic, cinematic",
-        "Picture book": "illustrated picture book style",
-        "3D cartoon": "3D cartoon style",
-        "Retro comics": "retro comic book style",
-        "Anime": "2D anime style",
-        "Pixel art": "pixel art style",
-        "Cinematic": "cinematic film production",
-        "Hyper cartoon": "hyper-expressive cartoon",
-        "Illustration": "illustration style",
-        "Dreamtale": "dreamlike, surreal",
-        "Skytale": "skytale style",
-        "80s film": "1980s film aesthetic",
-        "Minimalist": "minimalist design",
-        "Horror": "horror atmosphere",
-        "Sketchbook": "sketchbook style"
-    }
+    # マルチパート生成の場合はパート番号を付ける
+    part_label = f" (Part {part}/{total_parts})" if total_parts > 1 and part is not None else ""
 
-    style_desc = style_map.get(visual_style, "professional")
-
-    # シンプルなプロンプト構築
-    if total_parts > 1 and part is not None:
-        # マルチパート生成の場合
-        prompt = (
-            f"Create a {duration}-second book promotional video for '{book_name}' (Part {part}/{total_parts}). "
-            f"Style: {style_desc}. Aspect ratio: {aspect_ratio}. "
-            f"Cinematic, professional quality. Smooth camera movements. "
-            f"No real person's identifiable face; use symbolic/abstract representations. "
-            f"Audio: Generate Japanese voice-over with natural emotive voice. Add subtle cinematic BGM. "
-            f"Duck BGM under voice by ~8 dB.\n\n"
-            f"Voice-over (Japanese): {summary_cleaned}"
-        )
-    else:
-        # 単一動画の場合
-        prompt = (
-            f"Create a {duration}-second book promotional video for '{book_name}'. "
-            f"Style: {style_desc}. Aspect ratio: {aspect_ratio}. "
-            f"Cinematic, professional quality. Smooth camera movements. "
-            f"No real person's identifiable face; use symbolic/abstract representations. "
-            f"Audio: Generate Japanese voice-over with natural emotive voice. Add subtle cinematic BGM. "
-            f"Duck BGM under voice by ~8 dB.\n\n"
-            f"Voice-over (Japanese): {summary_cleaned}"
-        )
-
-    return prompt
+    return prompt_templates.render(
+        "video",
+        duration=duration,
+        book_name=book_name,
+        part_label=part_label,
+        style=prompt_templates.get_style(visual_style),
+        aspect_ratio=aspect_ratio,
+        narration=summary_cleaned
+    )
 
 
 def create_scene_prompt_for_sora2(
@@ -112,7 +91,8 @@ def create_scene_prompt_for_sora2(
     aspect_ratio: str = "16:9",
     duration: int = 12,
     scene_number: int = 1,
-    total_scenes: int = 3
+    total_scenes: int = 3,
+    draft: bool = False
 ) -> str:
     """
     シーン単位のSora2プロンプトを作成（テスト成功パターン厳守）
@@ -131,52 +111,101 @@ def create_scene_prompt_for_sora2(
         duration: 動画の長さ（秒、通常12）
         scene_number: シーン番号（1-3）
         total_scenes: 総シーン数（デフォルト3）
+        draft: ドラフト（確認用プレビュー）の場合True。短尺に収まらないためナレーションは読み上げず、映像内容の指示にのみ使う
 
     Returns:
         Sora2プロンプト
     """
-    # ビジュアルスタイルをSora2が理解できる形式に変換
-    style_map = {
-        "Photorealistic": "photorealistic cinematic",
-        "Picture book": "illustrated picture book",
-        "3D cartoon": "3D animated",
-        "Retro comics": "retro comic book",
-        "Anime": "anime",
-        "Pixel art": "pixel art",
-        "Cinematic": "cinematic",
-        "Hyper cartoon": "expressive cartoon",
-        "Illustration": "illustrated",
-        "Dreamtale": "dreamlike",
-        "Skytale": "atmospheric",
-        "80s film": "1980s film",
-        "Minimalist": "minimalist",
-        "Horror": "dark atmospheric",
-        "Sketchbook": "sketchy artistic"
-    }
-
-    style_desc = style_map.get(visual_style, "cinematic")
     narration_cleaned = scene_narration.replace('\n', '').replace('\r', '')
+    values = dict(
+        scene_number=scene_number,
+        total_scenes=total_scenes,
+        duration=duration,
+        style=prompt_templates.get_style(visual_style),
+        aspect_ratio=aspect_ratio,
+        narration=narration_cleaned
+    )
+
+    # ドラフト: 音声なしの短尺プレビュー（構図・スタイルの確認用）
+    if draft:
+        ending = "DO NOT show book cover or title yet." if scene_number < total_scenes else "End with book cover reveal."
+        return prompt_templates.render("scene_draft", ending=ending, **values)
+
+    # シーン1,2では本を表示せず（ナレーションの内容を映像化のみ）、最終シーンでのみ本を表示
+    if scene_number < total_scenes:
+        return prompt_templates.render("scene", **values)
+    return prompt_templates.render("scene_final", **values)
 
-    # test_sora2.py Test 2の成功パターンを使用
-    # アスペクト比とビジュアルスタイルを反映
 
-    # シーン1,2では本を表示せず、シーン3でのみ本を表示
-    if scene_number < total_scenes:
-        # シーン1,2: 本を表示しない、ナレーションの内容を映像化のみ
-        prompt = f"""Promotional video scene {scene_number}/{total_scenes}, {duration} seconds, {style_desc} style, {aspect_ratio}.
-Japanese voice-over with background music.
-DO NOT show book cover or title yet. Focus on story content only.
+def validate_scene_prompt(prompt: str, narration: str, duration: int) -> List[str]:
+    """
+    シーンのプロンプトがSora2の制限を満たすか確認（文字数・禁止語はプリフライトチェック）
 
-Voice-over (Japanese): {narration_cleaned}"""
-    else:
-        # シーン3: 最後に本を表示
-        prompt = f"""Promotional video final scene {scene_number}/{total_scenes}, {duration} seconds, {style_desc} style, {aspect_ratio}.
-Japanese voice-over with background music.
-End with book cover reveal and title display.
+    Returns:
+        問題点のリスト（問題がなければ空）
+    """
+    problems = list(prompt_preflight.check_prompt(prompt, rewrite_names=False)['problems'])
+
+    if not narration.strip():
+        problems.append("ナレーションが空です")
+    if duration not in ALLOWED_DURATIONS:
+        problems.append(f"動画の長さ{duration}秒は指定できません（{'/'.join(map(str, ALLOWED_DURATIONS))}秒のみ）")
 
-Voice-over (Japanese): {narration_cleaned}"""
+    return problems
 
-    return prompt
+
+def build_scene_prompts(
+    scenario: Dict[str, Any],
+    scenes: List[Dict[str, Any]],
+    draft: bool = False,
+    raise_on_error: bool = True
+) -> List[Dict[str, Any]]:
+    """
+    全シーンのSora2プロンプトをまとめて作成・検証（sora2_engine.render_videos にそのまま渡せる形式）
+
+    Args:
+        scenario: 選択されたシナリオ（book_name, aspect_ratio, visual_style）
+        scenes: シーンのリスト（scene_number, narration, duration_seconds）
+        draft: ドラフト（確認用プレビュー）のプロンプトを作成する場合True
+        raise_on_error: 検証に失敗したシーンがある場合に PromptValidationError を送出するか
+
+    Returns:
+        シーンごとの生成リクエスト
+        {'scene_number', 'book_name', 'prompt', 'aspect_ratio', 'duration', 'problems'}
+    """
+    book_name = scenario['book_name']
+    aspect_ratio = scenario.get('aspect_ratio', '16:9')
+    visual_style = scenario.get('visual_style', 'Photorealistic')
+
+    requests = []
+    for scene in scenes:
+        duration = RENDER_TIERS['draft']['duration'] if draft else scene.get('duration_seconds', 12)
+        prompt = create_scene_prompt_for_sora2(
+            book_name=book_name,
+            scene_narration=scene['narration'],
+            visual_style=visual_style,
+            aspect_ratio=aspect_ratio,
+            duration=duration,
+            scene_number=scene['scene_number'],
+            total_scenes=len(scenes),
+            draft=draft
+        )
+        # 実在人物名は代名詞に置き換えてから検証する
+        prompt = prompt_preflight.check_prompt(prompt)['prompt']
+        requests.append({
+            'scene_number': scene['scene_number'],
+            'book_name': f"{book_name}_scene{scene['scene_number']}",
+            'prompt': prompt,
+            'aspect_ratio': aspect_ratio,
+            'duration': duration,
+            'problems': validate_scene_prompt(prompt, scene['narration'], duration)
+        })
+
+    problems = {r['scene_number']: r['problems'] for r in requests if r['problems']}
+    if problems and raise_on_error:
+        raise PromptValidationError(problems)
+
+    return requests
 
 
 def create_simple_prompt(
@@ -195,23 +224,12 @@ def create_simple_prompt(
     Returns:
         シンプルなSora2プロンプト
     """
-    style_map = {
-        "Photorealistic": "cinematic, photorealistic",
-        "Anime": "anime style",
-        "Illustration": "illustrated",
-        "3D Render": "3D rendered",
-        "Minimalist": "minimalist"
-    }
-
-    style = style_map.get(visual_style, "professional")
-
-    prompt = f"""A {style} promotional video for the book "{book_name}".
-
-{summary}
-
-Make it engaging and professional, designed to attract readers."""
-
-    return prompt.strip()
+    return prompt_templates.render(
+        "simple",
+        style=prompt_templates.get_style(visual_style),
+        book_name=book_name,
+        summary=summary
+    ).strip()
 
 
 def enhance_prompt_with_details(
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+プロンプトの事前チェック（プリフライト）モジュール
+
+Sora2にジョブを登録する前に、拒否されることが分かっているプロンプトをローカルで弾く
+（キュー待ちの数分後に失敗するのを、数ミリ秒で検出する）
+
+- プロンプトの文字数上限
+- 禁止語（成人向け・著作権キャラクターなど）の検出（Aho-Corasick法で全語を1パスで照合）
+- 実在人物名の検出と代名詞への置き換え（任意）
+
+禁止語・人物名は設定ファイル（JSON）で追加できる:
+    環境変数 PREFLIGHT_TERMS_FILE、未設定ならプロジェクトルートの preflight_terms.json
+
+    {
+      "blocked": {"copyright": ["キャラクター名"], "adult": ["..."]},
+      "person_names": ["人物名"]
+    }
+"""
+
+import os
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .utils import get_project_root, load_json
+
+# Sora2に送るプロンプトの最大文字数（超える場合は登録前にエラーにする）
+MAX_PROMPT_CHARS = 2000
+
+# 組み込みの禁止語（カテゴリ → 語のリスト。設定ファイルの語は load_terms() でこれに加えた別のリストにする）
+BLOCKED_TERMS: Dict[str, List[str]] = {
+    "adult": [
+        "ヌード", "裸体", "全裸", "性行為", "セックス", "アダルト", "18禁", "ポルノ",
+        "nude", "naked", "nsfw", "porn", "sex scene", "explicit",
+    ],
+    "copyright": [
+        "ミッキーマウス", "ピカチュウ", "ポケモン", "ドラえもん", "スーパーマリオ", "ハローキティ",
+        "スパイダーマン", "バットマン", "スーパーマン", "ハリー・ポッター", "ディズニー", "ジブリ",
+        "mickey mouse", "pikachu", "pokemon", "doraemon", "super mario", "hello kitty",
+        "spider-man", "spiderman", "batman", "superman", "harry potter", "disney", "ghibli",
+    ],
+}
+
+# 組み込みの実在人物名（代名詞に置き換える）
+PERSON_NAMES: List[str] = [
+    "スティーブ・ジョブズ", "イーロン・マスク", "ビル・ゲイツ", "アインシュタイン", "織田信長", "坂本龍馬",
+    "steve jobs", "elon musk", "bill gates", "einstein",
+]
+
+# 人物名の置き換え先
+PRONOUN_JA = "その人物"
+PRONOUN_EN = "this person"
+
+# 英大文字 → 小文字（文字数が変わらないようASCIIのみ変換）
+_ASCII_LOWER = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+
+class PreflightError(ValueError):
+    """プロンプトがプリフライトチェックに通らなかった"""
+
+    def __init__(self, problems: List[str]):
+        self.problems = problems
+        super().__init__(f"プリフライトチェックで拒否されました: {' / '.join(problems)}")
+
+
+class TermMatcher:
+    """
+    Aho-Corasick法による複数語の同時検索
+
+    語の数に関係なく、テキストを1回走査するだけで全ての出現位置を見つける
+    英字は大文字・小文字を区別せず、英単語の途中には一致しない
+    """
+
+    def __init__(self, terms: Iterable[Tuple[str, str]]):
+        """
+        Args:
+            terms: (語, カテゴリ) のリスト
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[str, str]]] = [[]]
+
+        for term, category in terms:
+            key = term.translate(_ASCII_LOWER)
+            if not key:
+                continue
+            state = 0
+            for char in key:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append((term, category))
+
+        # 失敗リンクを幅優先で構築
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def find_all(self, text: str) -> List[Dict[str, object]]:
+        """
+        テキスト中の全ての一致を返す
+
+        Returns:
+            {'term', 'category', 'start', 'end'} のリスト（出現順）
+        """
+        lowered = text.translate(_ASCII_LOWER)
+        goto, fail, output = self._goto, self._fail, self._output
+        matches = []
+        state = 0
+
+        for index, char in enumerate(lowered):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for term, category in output[state]:
+                start = index - len(term) + 1
+                end = index + 1
+                if _is_word_bounded(lowered, start, end):
+                    matches.append({'term': term, 'category': category, 'start': start, 'end': end})
+
+        matches.sort(key=lambda m: (m['start'], -m['end']))
+        return matches
+
+
+def _is_word_bounded(text: str, start: int, end: int) -> bool:
+    """英字で始まる・終わる語が、英単語の途中に一致していないか"""
+    def is_word_char(char: str) -> bool:
+        return char.isascii() and char.isalnum()
+
+    if is_word_char(text[start]) and start > 0 and is_word_char(text[start - 1]):
+        return False
+    if is_word_char(text[end - 1]) and end < len(text) and is_word_char(text[end]):
+        return False
+    return True
+
+
+# 組み込みの定義と設定ファイルを合わせた禁止語・人物名と、構築済みの照合器（load_terms() で作り直す）
+_blocked_terms: Dict[str, List[str]] = {}
+_person_names: List[str] = []
+_matcher: Optional[TermMatcher] = None
+
+
+def load_terms(path: Optional[Path] = None) -> None:
+    """
+    設定ファイルの禁止語・人物名を読み込み、照合器を再構築
+
+    Args:
+        path: 設定ファイル（Noneの場合は環境変数 PREFLIGHT_TERMS_FILE または preflight_terms.json。
+            存在しない場合は組み込みの定義のみ）
+    """
+    global _blocked_terms, _person_names, _matcher
+
+    if path is None:
+        path = Path(os.getenv('PREFLIGHT_TERMS_FILE') or get_project_root() / "preflight_terms.json")
+
+    # 毎回組み込みの定義のコピーから作る（何度呼んでも語が重複せず、組み込みの定義も変わらない）
+    blocked_terms = {category: list(terms) for category, terms in BLOCKED_TERMS.items()}
+    person_names = list(PERSON_NAMES)
+
+    if path.exists():
+        config = load_json(path)
+        for category, terms in config.get('blocked', {}).items():
+            blocked_terms.setdefault(category, []).extend(terms)
+        person_names.extend(config.get('person_names', []))
+        print(f"  🛡️ プリフライト設定を読み込み: {path}")
+
+    _blocked_terms, _person_names = blocked_terms, person_names
+    _matcher = _build_matcher(person_names)
+
+
+def _build_matcher(person_names: Iterable[str]) -> TermMatcher:
+    terms = [(term, category) for category, words in _blocked_terms.items() for term in words]
+    terms += [(name, "person") for name in person_names]
+    return TermMatcher(terms)
+
+
+def check_prompt(
+    prompt: str,
+    rewrite_names: bool = True,
+    extra_person_names: Optional[List[str]] = None
+) -> Dict[str, object]:
+    """
+    プロンプトを事前チェック
+
+    Args:
+        prompt: 動画生成プロンプト
+        rewrite_names: 実在人物名を代名詞に置き換える場合True（Falseの場合は人物名も拒否理由になる）
+        extra_person_names: 追加で検出する人物名（書籍の著者名など）
+
+    Returns:
+        {
+            'ok': bool,
+            'prompt': str（人物名を置き換えた後のプロンプト）,
+            'problems': [str],
+            'matches': [{'term', 'category', 'start', 'end'}],
+            'rewritten': bool
+        }
+    """
+    matcher = _build_matcher(_person_names + extra_person_names) if extra_person_names else _matcher
+
+    matches = matcher.find_all(prompt)
+    problems = []
+
+    blocked = sorted({m['term'] for m in matches if m['category'] != 'person'})
+    if blocked:
+        problems.append(f"禁止語を含みます（{', '.join(blocked)}）")
+
+    # 人物名を重ならないように左から置き換える
+    rewritten = prompt
+    person_matches = [m for m in matches if m['category'] == 'person']
+    if person_matches:
+        if rewrite_names:
+            parts = []
+            position = 0
+            for match in person_matches:
+                if match['start'] < position:
+                    continue
+                original = prompt[match['start']:match['end']]
+                parts.append(prompt[position:match['start']])
+                parts.append(PRONOUN_EN if original.isascii() else PRONOUN_JA)
+                position = match['end']
+            parts.append(prompt[position:])
+            rewritten = ''.join(parts)
+        else:
+            names = sorted({m['term'] for m in person_matches})
+            problems.append(f"実在人物名を含みます（{', '.join(names)}）")
+
+    if len(rewritten) > MAX_PROMPT_CHARS:
+        problems.append(f"プロンプトが長すぎます（{len(rewritten)}/{MAX_PROMPT_CHARS}文字）")
+
+    return {
+        'ok': not problems,
+        'prompt': rewritten,
+        'problems': problems,
+        'matches': matches,
+        'rewritten': rewritten != prompt
+    }
+
+
+load_terms()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+プロンプトテンプレート・スタイル定義モジュール
+
+全プロンプト生成関数で共有するスタイル表とテンプレートを、インポート時に1回だけ読み込む
+テンプレートは string.Template で事前にコンパイルし、呼び出しごとには値の埋め込みのみ行う
+
+設定ファイル（JSON）でスタイル・テンプレートを追加・上書きできる:
+    環境変数 PROMPT_TEMPLATE_FILE、未設定ならプロジェクトルートの prompt_templates.json
+
+    {
+      "styles": {"Watercolor": "soft watercolor painting"},
+      "templates": {"scene": "Promotional video scene $scene_number/$total_scenes, ..."}
+    }
+"""
+
+import os
+from pathlib import Path
+from string import Template
+from typing import Dict, Optional
+
+from .utils import get_project_root, load_json
+
+# ビジュアルスタイル → Sora2が理解できるスタイル記述（画面2の選択肢もこの順で表示）
+STYLE_TABLE: Dict[str, str] = {
+    "Photorealistic": "photorealistic cinematic",
+    "Picture book": "illustrated picture book",
+    "3D cartoon": "3D animated",
+    "Retro comics": "retro comic book",
+    "Anime": "anime",
+    "Pixel art": "pixel art",
+    "Cinematic": "cinematic",
+    "Hyper cartoon": "expressive cartoon",
+    "Illustration": "illustrated",
+    "Dreamtale": "dreamlike",
+    "Skytale": "atmospheric",
+    "80s film": "1980s film",
+    "Minimalist": "minimalist",
+    "Horror": "dark atmospheric",
+    "Sketchbook": "sketchy artistic",
+}
+
+# 表に無いスタイルの場合の記述
+DEFAULT_STYLE = "cinematic"
+
+# 旧バージョンのスタイル名（画面には表示しない）
+STYLE_ALIASES: Dict[str, str] = {
+    "3D Render": "3D cartoon",
+}
+
+_VOICE_OVER_AUDIO = (
+    "Audio: Generate Japanese voice-over with natural emotive voice. Add subtle cinematic BGM. "
+    "Duck BGM under voice by ~8 dB."
+)
+
+# テンプレート名 → テンプレート文字列（$name で値を埋め込む）
+TEMPLATE_SOURCES: Dict[str, str] = {
+    # 1本（またはパート）の動画全体
+    "video": (
+        "Create a ${duration}-second book promotional video for '${book_name}'${part_label}. "
+        "Style: ${style}. Aspect ratio: ${aspect_ratio}. "
+        "Cinematic, professional quality. Smooth camera movements. "
+        "No real person's identifiable face; use symbolic/abstract representations. "
+        + _VOICE_OVER_AUDIO + "\n\n"
+        "Voice-over (Japanese): ${narration}"
+    ),
+    # シーン単位（test_sora2.py Test 2の成功パターン）
+    "scene": (
+        "Promotional video scene ${scene_number}/${total_scenes}, ${duration} seconds, ${style} style, ${aspect_ratio}.\n"
+        "Japanese voice-over with background music.\n"
+        "DO NOT show book cover or title yet. Focus on story content only.\n\n"
+        "Voice-over (Japanese): ${narration}"
+    ),
+    # 最終シーン（本の表紙を表示）
+    "scene_final": (
+        "Promotional video final scene ${scene_number}/${total_scenes}, ${duration} seconds, ${style} style, ${aspect_ratio}.\n"
+        "Japanese voice-over with background music.\n"
+        "End with book cover reveal and title display.\n\n"
+        "Voice-over (Japanese): ${narration}"
+    ),
+    # ドラフト（音声なしの短尺プレビュー）
+    "scene_draft": (
+        "Draft preview of promotional video scene ${scene_number}/${total_scenes}, ${duration} seconds, ${style} style, ${aspect_ratio}.\n"
+        "No voice-over, no music. ${ending}\n\n"
+        "Scene content (Japanese, visualize only): ${narration}"
+    ),
+    # 最小限の情報のみ
+    "simple": (
+        "A ${style} promotional video for the book \"${book_name}\".\n\n"
+        "${summary}\n\n"
+        "Make it engaging and professional, designed to attract readers."
+    ),
+}
+
+# コンパイル済みテンプレート
+TEMPLATES: Dict[str, Template] = {}
+
+
+def get_style(visual_style: str) -> str:
+    """ビジュアルスタイル名をスタイル記述に変換"""
+    visual_style = STYLE_ALIASES.get(visual_style, visual_style)
+    return STYLE_TABLE.get(visual_style, DEFAULT_STYLE)
+
+
+def render(name: str, **values) -> str:
+    """
+    テンプレートに値を埋め込んでプロンプトを作成
+
+    Args:
+        name: テンプレート名（TEMPLATES のキー）
+        **values: 埋め込む値
+
+    Returns:
+        プロンプト（値が足りない場合は KeyError）
+    """
+    return TEMPLATES[name].substitute(values)
+
+
+def load_config(path: Optional[Path] = None) -> None:
+    """
+    設定ファイルのスタイル・テンプレートを読み込み、テンプレートを再コンパイル
+
+    Args:
+        path: 設定ファイル（Noneの場合は環境変数 PROMPT_TEMPLATE_FILE または prompt_templates.json。
+            存在しない場合は組み込みの定義のみ）
+    """
+    if path is None:
+        path = Path(os.getenv('PROMPT_TEMPLATE_FILE') or get_project_root() / "prompt_templates.json")
+
+    if path.exists():
+        config = load_json(path)
+        STYLE_TABLE.update(config.get('styles', {}))
+        TEMPLATE_SOURCES.update(config.get('templates', {}))
+        print(f"  🎨 プロンプト設定を読み込み: {path}")
+
+    TEMPLATES.clear()
+    TEMPLATES.update({name: Template(source) for name, source in TEMPLATE_SOURCES.items()})
+
+
+load_config()
@@ -6,17 +6,25 @@
 """
 
 from pathlib import Path
-from typing import Dict, Any, List
-import google.generativeai as genai
-import os
+from typing import Dict, Any, List, Optional
 import json
 from dotenv import load_dotenv
 from .utils import save_json, get_project_root
+from . import telemetry
+from . import gemini_client
+from . import cancellation
+from .cancellation import CancellationToken
 
 load_dotenv()
 
 
-def generate_scenarios_from_summary(book_name: str, summary: str, target_audience: str = "", book_type: str = "") -> List[Dict[str, Any]]:
+def generate_scenarios_from_summary(
+    book_name: str,
+    summary: str,
+    target_audience: str = "",
+    book_type: str = "",
+    cancel_token: Optional[CancellationToken] = None
+) -> List[Dict[str, Any]]:
     """
     論文形式の書籍概要から3つのプロモーション用シナリオパターンを生成
 
@@ -25,16 +33,12 @@ def generate_scenarios_from_summary(book_name: str, summary: str, target_audienc
         summary: 論文形式の書籍概要（800文字程度）
         target_audience: 想定される読者層
         book_type: 書籍の種類
+        cancel_token: キャンセル用トークン（パターンごとに確認し、OperationCancelledを送出）
 
     Returns:
         3つのシナリオパターンのリスト
     """
-    api_key = os.getenv("GOOGLE_API_KEY")
-    if not api_key:
-        raise ValueError("GOOGLE_API_KEY環境変数が設定されていません")
-
-    genai.configure(api_key=api_key)
-    model = genai.GenerativeModel('gemini-2.5-flash-lite')
+    model = gemini_client.get_model()
 
     # 3つのパターンを定義
     patterns = [
@@ -67,6 +71,7 @@ def generate_scenarios_from_summary(book_name: str, summary: str, target_audienc
     scenario_patterns = []
 
     for pattern in patterns:
+        cancellation.check(cancel_token)
         print(f"  🎬 パターン{pattern['pattern_id']}: {pattern['pattern_name']}を生成中...")
 
         prompt = f"""
@@ -138,13 +143,14 @@ JSON形式で出力してください。
 }}
 """
 
-        response = model.generate_content(
-            prompt,
-            generation_config={
-                "temperature": 0.7,  # プロモーション用なので創造性を高め
-                "response_mime_type": "application/json"
-            }
-        )
+        with telemetry.span("gemini.generate_content", stage="scenario", pattern_id=pattern['pattern_id']):
+            response = model.generate_content(
+                prompt,
+                generation_config={
+                    "temperature": 0.7,  # プロモーション用なので創造性を高め
+                    "response_mime_type": "application/json"
+                }
+            )
 
         result = json.loads(response.text)
 
@@ -3,25 +3,38 @@
 シーン分割モジュール（Sora2版）
 
 シナリオを複数のシーンに分割（元のテキストを正確に保持）
+
+文の区切りでN分割し、最も長いシーンの推定読み上げ時間が最小になるように分ける（動的計画法）
+各シーンの秒数は、ナレーションが収まる最短の長さを Sora2 の許容値（4/8/12秒）から選ぶ
+最長のクリップに収まらないシーンがある場合は、すべて収まるまでシーン数を増やす
 """
 
 from typing import Dict, Any, List
 
+from . import speech_timing
+from . import text_segmenter
+from .sora2_engine import ALLOWED_DURATIONS
+
+
 def split_into_scenes_for_sora2(
     scenario: Dict[str, Any],
     num_scenes: int = 3,
     chars_per_scene: int = 75  # 互換性のため残すが未使用
 ) -> List[Dict[str, Any]]:
     """
-    シナリオを複数のシーンに分割（元のテキストを正確に3分割）
+    シナリオを複数のシーンに分割（元のテキストを文単位でN分割）
 
     Args:
         scenario: 選択されたシナリオデータ
-        num_scenes: 分割するシーン数（デフォルト3）
+        num_scenes: 分割するシーン数（デフォルト3。文の数が少ない場合はそれに合わせて減り、
+                    最長のクリップに収まらないシーンがある場合は増える）
         chars_per_scene: 1シーンあたりの文字数（未使用、互換性のため残す）
 
     Returns:
         シーンのリスト（各シーンにナレーションと秒数を含む）
+
+    Raises:
+        ValueError: シナリオのテキストが空の場合、1文だけで最長のクリップに収まらない場合
     """
 
     # シナリオテキスト
@@ -30,57 +43,100 @@ def split_into_scenes_for_sora2(
     print(f"  📝 元のシナリオ: {len(summary)}文字")
     print(f"  ✂️ {num_scenes}シーンに分割中...")
 
-    # テキストをクリーニング（改行・空白を整理）
-    text = summary.replace('\n', '').strip()
-
-    # 文で分割（。で区切る）
-    sentences = [s.strip() + '。' for s in text.split('。') if s.strip()]
+    # 文で分割（。！？・ASCIIの文末記号で区切り、括弧の内側では分けない。改行は文の区切り）
+    sentences = text_segmenter.split_sentences(summary.strip())
 
     print(f"  📄 文の数: {len(sentences)}")
-
-    # 3シーンに分割（文単位で切りの良いところで分ける）
-    total_sentences = len(sentences)
-
-    if total_sentences >= 3:
-        # 文の数を3で分割
-        part_size = total_sentences // num_scenes
-
-        # シーン1: 最初の1/3
-        scene1_sentences = sentences[:part_size]
-        # シーン2: 次の1/3
-        scene2_sentences = sentences[part_size:part_size*2]
-        # シーン3: 残り全て
-        scene3_sentences = sentences[part_size*2:]
-    else:
-        # 文が3つ未満の場合は、できるだけ均等に分ける
-        scene1_sentences = [sentences[0]] if len(sentences) > 0 else []
-        scene2_sentences = [sentences[1]] if len(sentences) > 1 else []
-        scene3_sentences = sentences[2:] if len(sentences) > 2 else []
+    if not sentences:
+        raise ValueError("シナリオのテキストが空のため、シーンに分割できません")
+
+    # 文の区切りで、最長シーンの読み上げ時間が最小になるように分割
+    # （冒頭・末尾の余白はシーンごとに1回なので、文単位の負荷からは除く）
+    loads = [speech_timing.estimate_seconds(s) - speech_timing.LEAD_SECONDS for s in sentences]
+    max_seconds = max(ALLOWED_DURATIONS)
+
+    # 最長のクリップに収まらないシーンがある間は、シーン数を増やして分割し直す
+    while True:
+        groups = partition_sentences(loads, num_scenes)
+        longest = max(speech_timing.estimate_seconds(''.join(sentences[start:end])) for start, end in groups)
+        if longest <= max_seconds or len(groups) >= len(sentences):
+            break
+        num_scenes = len(groups) + 1
+        print(f"  ↪️ {max_seconds}秒に収まらないシーンがあるため、{num_scenes}シーンに分割し直します")
+
+    if longest > max_seconds:
+        raise ValueError(
+            f"{max_seconds}秒に収まらない文があるため、シーンに分割できません（推定{longest:.1f}秒）。シナリオの文を短くしてください"
+        )
 
     # 各シーンのナレーションを作成
-    scenes = [
-        {
-            "scene_number": 1,
-            "narration": ''.join(scene1_sentences),
-            "duration_seconds": 12
-        },
-        {
-            "scene_number": 2,
-            "narration": ''.join(scene2_sentences),
-            "duration_seconds": 12
-        },
-        {
-            "scene_number": 3,
-            "narration": ''.join(scene3_sentences),
-            "duration_seconds": 12
-        }
-    ]
-
-    # 文字数チェック
+    scenes = []
+    for i, (start, end) in enumerate(groups):
+        narration = ''.join(sentences[start:end])
+        scenes.append({
+            "scene_number": i + 1,
+            "narration": narration,
+            "duration_seconds": speech_timing.fit_duration(narration)
+        })
+
+    # 文字数・読み上げ時間を表示
     for scene in scenes:
         char_count = len(scene['narration'])
-        print(f"  シーン{scene['scene_number']}: {char_count}文字 - {scene['narration'][:30]}...")
+        seconds = speech_timing.estimate_seconds(scene['narration'])
+        print(f"  シーン{scene['scene_number']}: {char_count}文字 / 推定{seconds:.1f}秒 → {scene['duration_seconds']}秒 - {scene['narration'][:30]}...")
 
     print(f"  ✓ {len(scenes)}シーンに分割完了（元のテキストを正確に保持）")
 
     return scenes
+
+
+def partition_sentences(lengths: List[float], num_parts: int) -> List[tuple[int, int]]:
+    """
+    文の長さのリストを連続するnum_parts個のグループに分割（線形分割問題）
+
+    最長グループの長さを最小化し、同じ場合は長さの二乗和が小さい（より均等な）分割を選ぶ
+
+    Args:
+        lengths: 各文の長さ（文字数や推定読み上げ秒数）
+        num_parts: グループ数（文の数より多い場合は文の数に合わせる）
+
+    Returns:
+        各グループの (開始インデックス, 終了インデックス) のリスト
+    """
+    n = len(lengths)
+    k = min(num_parts, n)
+    if k <= 0:
+        return []
+
+    prefix = [0]
+    for length in lengths:
+        prefix.append(prefix[-1] + length)
+
+    # best[j][i]: 先頭i文をjグループに分けたときの (最長グループ, 二乗和)
+    inf = (float('inf'), float('inf'))
+    best = [[inf] * (n + 1) for _ in range(k + 1)]
+    split_at = [[0] * (n + 1) for _ in range(k + 1)]
+    best[0][0] = (0, 0)
+
+    for j in range(1, k + 1):
+        # 残りのグループにも最低1文ずつ残す
+        for i in range(j, n - (k - j) + 1):
+            for m in range(j - 1, i):
+                prev_max, prev_sq = best[j - 1][m]
+                if prev_max == float('inf'):
+                    continue
+                load = prefix[i] - prefix[m]
+                candidate = (max(prev_max, load), prev_sq + load * load)
+                if candidate < best[j][i]:
+                    best[j][i] = candidate
+                    split_at[j][i] = m
+
+    groups = []
+    end = n
+    for j in range(k, 0, -1):
+        start = split_at[j][end]
+        groups.append((start, end))
+        end = start
+
+    return groups[::-1]
+
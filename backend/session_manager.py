@@ -3,99 +3,327 @@
 セッション管理モジュール
 
 Streamlitのセッション状態を保存・復元する
+
+セッションは data/internal/sessions/sessions.db（SQLite）に保存する
+(book_name, created_at) のインデックスと latest_sessions（書籍→最新セッションIDのポインタ）で
+最新セッションを直接引けるため、セッション数が増えても一覧・復元が遅くならない
+内容が直前のスナップショットと同一の場合は保存をスキップする
+
+シーン生成などの途中経過は append_session_event() で差分（イベント）として追記し、
+load_session_state() が最新スナップショットにイベントを適用して復元する
+イベントが CHECKPOINT_INTERVAL 件たまると、適用後の状態をスナップショットとして保存する
+旧形式の session_*.json は初回接続時に取り込み、legacy/ に移動する
 """
 
 from pathlib import Path
+import hashlib
 import json
-from typing import Dict, Any, Optional
+import re
+import sqlite3
+from contextlib import closing
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 from .utils import get_project_root
+from . import telemetry
+
+# 書籍ごとに保持するスナップショット数（古いものは保存時に削除）
+SESSION_RETENTION = 20
+
+# 何件のイベントごとにスナップショット（チェックポイント）を作成するか
+CHECKPOINT_INTERVAL = 10
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    book_name TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    status TEXT NOT NULL,
+    data TEXT NOT NULL,
+    content_hash TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_book_created
+    ON sessions (book_name, created_at DESC, id DESC);
+CREATE TABLE IF NOT EXISTS latest_sessions (
+    book_name TEXT PRIMARY KEY,
+    session_id INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS session_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    book_name TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    event_type TEXT NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_session_events_book
+    ON session_events (book_name, id);
+"""
+
+# イベントの種類
+#   set:         payload の各キーをセッション状態に上書き
+#   scene_video: payload {"scene": {...}, "video": {...}} でシーンと生成結果を追加・更新
+#   final_video: payload を最終動画として記録
+EVENT_TYPES = ('set', 'scene_video', 'final_video')
+
+# 旧形式のファイル名（session_<書籍名>_<YYYYMMDD_HHMMSS>.json / session_<書籍名>_latest.json）
+_LEGACY_FILENAME = re.compile(r'^session_(?P<book>.+)_(?P<stamp>\d{8}_\d{6}|latest)\.json$')
+
+
+def _get_sessions_dir() -> Path:
+    return get_project_root() / "data" / "internal" / "sessions"
+
 
+def _serialize(session_data: Dict[str, Any]) -> tuple[str, str]:
+    """セッション状態を1回だけシリアライズし、(JSON文字列, 内容ハッシュ) を返す"""
+    payload = json.dumps(
+        _convert_paths_to_strings(session_data),
+        ensure_ascii=False,
+        sort_keys=True,
+        separators=(',', ':')
+    )
+    return payload, hashlib.sha256(payload.encode('utf-8')).hexdigest()
 
-def save_session_state(session_data: Dict[str, Any], book_name: str) -> Path:
+
+def _connect() -> sqlite3.Connection:
+    """セッションDBに接続（初回はスキーマ作成と旧JSONの取り込みを行う）"""
+    save_dir = _get_sessions_dir()
+    save_dir.mkdir(parents=True, exist_ok=True)
+    db_path = save_dir / "sessions.db"
+    is_new = not db_path.exists()
+
+    conn = sqlite3.connect(db_path, timeout=10)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    _upgrade_schema(conn)
+    conn.executescript(_SCHEMA)
+
+    if is_new:
+        migrate_json_sessions(conn)
+
+    return conn
+
+
+def _upgrade_schema(conn: sqlite3.Connection) -> None:
+    """content_hash 列・latest_sessions がない既存DBを現在のスキーマに合わせる"""
+    columns = [row['name'] for row in conn.execute("PRAGMA table_info(sessions)")]
+    if not columns or 'content_hash' in columns:
+        return
+
+    with conn:
+        conn.execute("ALTER TABLE sessions ADD COLUMN content_hash TEXT NOT NULL DEFAULT ''")
+        for row in conn.execute("SELECT id, data FROM sessions").fetchall():
+            _, content_hash = _serialize(json.loads(row['data']))
+            conn.execute("UPDATE sessions SET content_hash = ? WHERE id = ?", (content_hash, row['id']))
+
+        conn.executescript(_SCHEMA)
+        for row in conn.execute("SELECT DISTINCT book_name FROM sessions").fetchall():
+            _refresh_latest(conn, row['book_name'])
+
+
+def _refresh_latest(conn: sqlite3.Connection, book_name: str) -> None:
+    """latest_sessions のポインタを書籍の最新スナップショットに合わせる"""
+    conn.execute(
+        """
+        INSERT OR REPLACE INTO latest_sessions (book_name, session_id)
+        SELECT book_name, id FROM sessions WHERE book_name = ?
+        ORDER BY created_at DESC, id DESC LIMIT 1
+        """,
+        (book_name,)
+    )
+
+
+def _prune(conn: sqlite3.Connection, book_name: str, keep: int) -> int:
+    """書籍の古いスナップショットを削除し、削除件数を返す"""
+    cursor = conn.execute(
+        """
+        DELETE FROM sessions
+        WHERE book_name = ? AND id NOT IN (
+            SELECT id FROM sessions WHERE book_name = ?
+            ORDER BY created_at DESC, id DESC LIMIT ?
+        )
+        """,
+        (book_name, book_name, keep)
+    )
+    return cursor.rowcount
+
+
+def save_session_state(session_data: Dict[str, Any], book_name: str) -> int:
     """
-    セッション状態をJSONファイルに保存
+    セッション状態をセッションDBに保存
+
+    スナップショットの追加と最新ポインタの更新は1トランザクションで行うため、
+    途中でクラッシュしても書きかけのセッションは残らない
+    内容が最新スナップショットと同一の場合は保存せず、既存のIDを返す
 
     Args:
         session_data: セッション状態の辞書
         book_name: 書籍名
 
     Returns:
-        保存先パス
+        保存した（またはスキップ時は既存の）セッションID
     """
-    project_root = get_project_root()
-    save_dir = project_root / "data" / "internal" / "sessions"
-    save_dir.mkdir(parents=True, exist_ok=True)
+    with telemetry.span("session.save", book_name=book_name):
+        with closing(_connect()) as conn, conn:
+            session_id = _write_snapshot(conn, book_name, session_data)
 
-    # タイムスタンプ付きファイル名
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"session_{book_name}_{timestamp}.json"
-    save_path = save_dir / filename
-
-    # 最新セッションファイルも保存（上書き）
-    latest_path = save_dir / f"session_{book_name}_latest.json"
-
-    # パスオブジェクトを文字列に変換
-    serializable_data = {}
-    for key, value in session_data.items():
-        if isinstance(value, Path):
-            serializable_data[key] = str(value)
-        elif isinstance(value, dict):
-            # 辞書内のPathも変換
-            serializable_data[key] = _convert_paths_to_strings(value)
-        elif isinstance(value, list):
-            # リスト内のPathも変換
-            serializable_data[key] = [
-                _convert_paths_to_strings(item) if isinstance(item, dict) else item
-                for item in value
-            ]
-        else:
-            serializable_data[key] = value
+    print(f"  💾 セッション保存: {book_name} (#{session_id})")
+
+    return session_id
+
+
+def _write_snapshot(conn: sqlite3.Connection, book_name: str, session_data: Dict[str, Any]) -> int:
+    """スナップショットを追加し、最新ポインタを更新（それまでのイベントはスナップショットに含まれるので削除）"""
+    # パスオブジェクトを文字列に変換してシリアライズ（1回のみ）
+    payload, content_hash = _serialize(session_data)
+    created_at = datetime.now().isoformat(timespec="microseconds")
+    status = session_data.get('status', 'in_progress')
 
-    # JSON保存
-    with open(save_path, "w", encoding="utf-8") as f:
-        json.dump(serializable_data, f, ensure_ascii=False, indent=2)
+    conn.execute("DELETE FROM session_events WHERE book_name = ?", (book_name,))
 
-    with open(latest_path, "w", encoding="utf-8") as f:
-        json.dump(serializable_data, f, ensure_ascii=False, indent=2)
+    latest = conn.execute(
+        """
+        SELECT s.id, s.content_hash FROM latest_sessions AS l
+        JOIN sessions AS s ON s.id = l.session_id
+        WHERE l.book_name = ?
+        """,
+        (book_name,)
+    ).fetchone()
 
-    print(f"  💾 セッション保存: {save_path}")
+    if latest is not None and latest['content_hash'] == content_hash:
+        telemetry.increment("session.save_skipped")
+        return latest['id']
 
-    return save_path
+    cursor = conn.execute(
+        "INSERT INTO sessions (book_name, created_at, status, data, content_hash) VALUES (?, ?, ?, ?, ?)",
+        (book_name, created_at, status, payload, content_hash)
+    )
+    session_id = cursor.lastrowid
+    conn.execute(
+        "INSERT OR REPLACE INTO latest_sessions (book_name, session_id) VALUES (?, ?)",
+        (book_name, session_id)
+    )
+    _prune(conn, book_name, SESSION_RETENTION)
+
+    telemetry.observe("session.bytes", len(payload.encode('utf-8')))
+
+    return session_id
+
+
+def append_session_event(book_name: str, event_type: str, payload: Dict[str, Any]) -> int:
+    """
+    セッションの差分をイベントとして追記
+
+    保存コストはイベントの大きさだけに比例し、セッション全体の大きさには依存しない
+    未反映のイベントが CHECKPOINT_INTERVAL 件に達した場合はスナップショットを作成する
+
+    Args:
+        book_name: 書籍名
+        event_type: イベントの種類（EVENT_TYPES のいずれか）
+        payload: イベントの内容
+
+    Returns:
+        追記したイベントID
+    """
+    if event_type not in EVENT_TYPES:
+        raise ValueError(f"未対応のイベント: {event_type}（{' / '.join(EVENT_TYPES)}）")
+
+    data = json.dumps(_convert_paths_to_strings(payload), ensure_ascii=False, separators=(',', ':'))
+    created_at = datetime.now().isoformat(timespec="microseconds")
+
+    with telemetry.span("session.append_event", book_name=book_name, event_type=event_type):
+        with closing(_connect()) as conn, conn:
+            cursor = conn.execute(
+                "INSERT INTO session_events (book_name, created_at, event_type, payload) VALUES (?, ?, ?, ?)",
+                (book_name, created_at, event_type, data)
+            )
+            event_id = cursor.lastrowid
+
+            pending = conn.execute(
+                "SELECT COUNT(*) FROM session_events WHERE book_name = ?", (book_name,)
+            ).fetchone()[0]
+            if pending >= CHECKPOINT_INTERVAL:
+                session_id = _write_snapshot(conn, book_name, _replay(conn, book_name))
+                print(f"  💾 セッションチェックポイント: {book_name} (#{session_id})")
+
+    telemetry.observe("session.event_bytes", len(data.encode('utf-8')))
+
+    return event_id
+
+
+def _apply_event(session_data: Dict[str, Any], event_type: str, payload: Dict[str, Any]) -> None:
+    """イベントをセッション状態に適用"""
+    if event_type == 'set':
+        session_data.update(payload)
+
+    elif event_type == 'scene_video':
+        scene = payload['scene']
+        scene_number = scene['scene_number']
+
+        scenes = session_data.setdefault('scenes', [])
+        for i, existing in enumerate(scenes):
+            if existing.get('scene_number') == scene_number:
+                scenes[i] = scene
+                break
+        else:
+            scenes.append(scene)
+            scenes.sort(key=lambda s: s.get('scene_number', 0))
+
+        # JSON保存時と同じく、シーン番号のキーは文字列
+        session_data.setdefault('scene_videos', {})[str(scene_number)] = payload['video']
+
+    elif event_type == 'final_video':
+        session_data['final_video'] = payload
+
+
+def _replay(conn: sqlite3.Connection, book_name: str) -> Dict[str, Any]:
+    """最新スナップショットに未反映のイベントを順に適用した状態を返す"""
+    row = conn.execute(
+        """
+        SELECT s.data FROM latest_sessions AS l
+        JOIN sessions AS s ON s.id = l.session_id
+        WHERE l.book_name = ?
+        """,
+        (book_name,)
+    ).fetchone()
+    session_data = json.loads(row['data']) if row is not None else {}
+
+    events = conn.execute(
+        "SELECT event_type, payload FROM session_events WHERE book_name = ? ORDER BY id",
+        (book_name,)
+    )
+    for event in events:
+        _apply_event(session_data, event['event_type'], json.loads(event['payload']))
+
+    return session_data
 
 
 def load_session_state(
-    book_name: str, use_latest: bool = True
+    book_name: str, use_latest: bool = True, session_id: Optional[int] = None
 ) -> Optional[Dict[str, Any]]:
     """
-    セッション状態をJSONファイルから復元
+    セッション状態をセッションDBから復元
 
     Args:
         book_name: 書籍名
-        use_latest: True の場合、最新のセッションファイルを使用
+        use_latest: 互換性のための引数（常に最新のセッションを使用）
+        session_id: 指定した場合、そのスナップショットを復元
 
     Returns:
-        セッション状態の辞書。ファイルがない場合はNone
+        セッション状態の辞書（最新の場合は未反映のイベントを適用済み）。セッションがない場合はNone
     """
-    project_root = get_project_root()
-    save_dir = project_root / "data" / "internal" / "sessions"
-
-    if use_latest:
-        session_file = save_dir / f"session_{book_name}_latest.json"
-    else:
-        # 最新のタイムスタンプ付きファイルを検索
-        session_files = list(save_dir.glob(f"session_{book_name}_*.json"))
-        if not session_files:
-            return None
-        session_file = max(session_files, key=lambda p: p.stat().st_mtime)
+    with closing(_connect()) as conn:
+        if session_id is not None:
+            row = conn.execute(
+                "SELECT data FROM sessions WHERE id = ? AND book_name = ?",
+                (session_id, book_name)
+            ).fetchone()
+            session_data = json.loads(row['data']) if row is not None else None
+        else:
+            session_data = _replay(conn, book_name) or None
 
-    if not session_file.exists():
+    if session_data is None:
         return None
 
-    with open(session_file, "r", encoding="utf-8") as f:
-        session_data = json.load(f)
-
-    print(f"  📂 セッション復元: {session_file}")
+    print(f"  📂 セッション復元: {book_name}")
 
     return session_data
 
@@ -114,29 +342,136 @@ def _convert_paths_to_strings(obj: Any) -> Any:
         return obj
 
 
-def get_saved_sessions(book_name: Optional[str] = None) -> list[Path]:
+def get_saved_sessions(book_name: Optional[str] = None) -> List[Dict[str, Any]]:
     """
-    保存されているセッションファイルのリストを取得
+    保存されているセッションの一覧を取得（データ本体は読み込まない）
 
     Args:
         book_name: 書籍名（指定した場合、その書籍のセッションのみ）
 
     Returns:
-        セッションファイルのパスリスト
+        セッション情報（id, book_name, created_at, status）のリスト（新しい順）
     """
-    project_root = get_project_root()
-    save_dir = project_root / "data" / "internal" / "sessions"
+    query = "SELECT id, book_name, created_at, status FROM sessions"
+    params: tuple = ()
+    if book_name:
+        query += " WHERE book_name = ?"
+        params = (book_name,)
+    query += " ORDER BY created_at DESC, id DESC"
 
-    if not save_dir.exists():
-        return []
+    with closing(_connect()) as conn:
+        return [dict(row) for row in conn.execute(query, params)]
 
-    if book_name:
-        pattern = f"session_{book_name}_*.json"
-    else:
-        pattern = "session_*.json"
 
-    session_files = list(save_dir.glob(pattern))
-    # 新しい順にソート
-    session_files.sort(key=lambda p: p.stat().st_mtime, reverse=True)
+def get_latest_sessions() -> List[Dict[str, Any]]:
+    """
+    書籍ごとの最新セッション情報を取得
+
+    Returns:
+        セッション情報（id, book_name, created_at, status）のリスト（書籍名順）
+    """
+    with closing(_connect()) as conn:
+        rows = conn.execute(
+            """
+            SELECT s.id, s.book_name, s.created_at, s.status
+            FROM latest_sessions AS l
+            JOIN sessions AS s ON s.id = l.session_id
+            ORDER BY s.book_name
+            """
+        ).fetchall()
+
+    return [dict(row) for row in rows]
+
+
+def compact_sessions(keep: int = SESSION_RETENTION) -> int:
+    """
+    全書籍の古いスナップショットを削除してDBを縮小
+
+    Args:
+        keep: 書籍ごとに残すスナップショット数
+
+    Returns:
+        削除したスナップショット数
+    """
+    with closing(_connect()) as conn:
+        with conn:
+            books = [row['book_name'] for row in conn.execute("SELECT DISTINCT book_name FROM sessions")]
+            removed = sum(_prune(conn, book, keep) for book in books)
+        conn.execute("VACUUM")
+
+    print(f"  🧹 セッション整理: {removed}件削除")
+
+    return removed
+
 
-    return session_files
+def migrate_json_sessions(conn: Optional[sqlite3.Connection] = None) -> int:
+    """
+    旧形式（session_*.json）のセッションファイルをセッションDBに取り込む
+
+    取り込んだファイルは sessions/legacy/ に移動する
+    タイムスタンプ付きファイルがある書籍では _latest.json は重複なので取り込まない
+
+    Args:
+        conn: 既存の接続（Noneの場合は新規接続）
+
+    Returns:
+        取り込んだセッション数
+    """
+    if conn is None:
+        with closing(_connect()) as own_conn:
+            return migrate_json_sessions(own_conn)
+
+    save_dir = _get_sessions_dir()
+    legacy_files = []
+    for path in sorted(save_dir.glob("session_*.json")):
+        match = _LEGACY_FILENAME.match(path.name)
+        if match:
+            legacy_files.append((path, match.group('book'), match.group('stamp')))
+
+    if not legacy_files:
+        return 0
+
+    books_with_history = {book for _, book, stamp in legacy_files if stamp != 'latest'}
+    legacy_dir = save_dir / "legacy"
+    legacy_dir.mkdir(exist_ok=True)
+
+    imported = 0
+    with conn:
+        for path, book, stamp in legacy_files:
+            if stamp == 'latest' and book in books_with_history:
+                path.replace(legacy_dir / path.name)
+                continue
+
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    session_data = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"  ⚠️ セッション取り込み失敗: {path.name}: {e}")
+                continue
+
+            if stamp == 'latest':
+                created_at = datetime.fromtimestamp(path.stat().st_mtime)
+            else:
+                created_at = datetime.strptime(stamp, "%Y%m%d_%H%M%S")
+
+            payload, content_hash = _serialize(session_data)
+            conn.execute(
+                "INSERT INTO sessions (book_name, created_at, status, data, content_hash) VALUES (?, ?, ?, ?, ?)",
+                (
+                    book,
+                    created_at.isoformat(timespec="microseconds"),
+                    session_data.get('status', 'in_progress'),
+                    payload,
+                    content_hash
+                )
+            )
+            path.replace(legacy_dir / path.name)
+            imported += 1
+
+        for book in {book for _, book, _ in legacy_files}:
+            _prune(conn, book, SESSION_RETENTION)
+            _refresh_latest(conn, book)
+
+    print(f"  📦 旧セッション取り込み: {imported}件")
+
+    return imported
@@ -3,14 +3,50 @@
 Sora2 API統合モジュール
 
 OpenAI Sora2 APIを使用して動画を生成
+
+同期API:
+    generate_video(): 生成開始 → 完了待ち → ダウンロードまで一括実行
+
+非同期API（1つのイベントループで多数のジョブを追跡する場合）:
+    job_id = submit_video(prompt, ...)
+    status = await wait_video(job_id)
+    download_video(job_id, output_path)
+
+バッチAPI（絵コンテ全体を1回で生成する場合）:
+    results = render_videos(prompt_engineer.build_scene_prompts(scenario, scenes))
 """
 
+import asyncio
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 import time
 
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
+
+from . import telemetry
+from . import cancellation
+from . import prompt_preflight
+from .cancellation import CancellationToken
+
+# ポーリング間隔の下限・上限（秒）
+MIN_POLL_INTERVAL = 2.0
+MAX_POLL_INTERVAL = 30.0
+
+# 指定可能な動画の長さ（秒）
+ALLOWED_DURATIONS = [4, 8, 12]
+
+# レンダリング品質の段階
+# draft: 確認用の安価なプレビュー（sora-2の最小解像度・最短尺）
+# final: 承認済みシーンの本番生成（モデル・尺は呼び出し側の指定どおり）
+RENDER_TIERS = {
+    "draft": {"model": "sora-2", "duration": 4},
+    "final": {}
+}
+
+# 生成中を表すステータス
+PENDING_STATUSES = ('queued', 'in_progress')
 
 
 def get_api_key() -> str:
@@ -31,13 +67,336 @@ def get_api_key() -> str:
     return api_key
 
 
+def _normalize_duration(duration: int) -> int:
+    """durationを4, 8, 12のうち最も近い値に補正"""
+    if duration not in ALLOWED_DURATIONS:
+        # 最も近い値を選択
+        adjusted = min(ALLOWED_DURATIONS, key=lambda x: abs(x - duration))
+        print(f"⚠️ Duration adjusted to {adjusted}s (only 4, 8, 12 are allowed)")
+        return adjusted
+    return duration
+
+
+def _resolve_size(model: str, aspect_ratio: str) -> str:
+    """アスペクト比をモデルが対応するサイズに変換"""
+    # sora-2: 720x1280, 1280x720 のみ
+    # sora-2-pro: 1024x1792, 1792x1024 もサポート
+    if "pro" in model.lower():
+        size_map = {
+            "16:9": "1792x1024",
+            "9:16": "1024x1792",
+            "1:1": "1024x1024"
+        }
+    else:
+        size_map = {
+            "16:9": "1280x720",
+            "9:16": "720x1280",
+            "1:1": "720x1280"  # 1:1は非対応なので縦型を使用
+        }
+    return size_map.get(aspect_ratio, "720x1280")
+
+
+def next_poll_interval(progress: Optional[float], elapsed: float) -> float:
+    """
+    次のポーリングまでの間隔を決める
+
+    進捗（0-100）が分かる場合は残り時間の見積もりの1/4だけ待つ（完了間際ほど短く）。
+    進捗が不明な場合は経過時間に応じて徐々に間隔を広げる。
+
+    Args:
+        progress: APIが返した進捗（%）。不明・キューイング中はNone/0
+        elapsed: 生成開始からの経過秒数
+
+    Returns:
+        待機秒数（MIN_POLL_INTERVAL〜MAX_POLL_INTERVAL）
+    """
+    if progress and 0 < progress < 100:
+        remaining = elapsed * (100 - progress) / progress
+        interval = remaining / 4
+    else:
+        interval = MIN_POLL_INTERVAL + elapsed * 0.1
+
+    return max(MIN_POLL_INTERVAL, min(MAX_POLL_INTERVAL, interval))
+
+
+def _prepare_output_dir(output_dir: Optional[Path]) -> Path:
+    """出力ディレクトリを作成（Noneの場合は data/output/sora2_videos）"""
+    if output_dir is None:
+        project_root = Path(__file__).parent.parent
+        output_dir = project_root / "data" / "output" / "sora2_videos"
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    return output_dir
+
+
+def _output_path(output_dir: Path, book_name: str, tier: str) -> Path:
+    """保存先ファイル名（書籍名_タイムスタンプ[_draft].mp4）"""
+    safe_book_name = "".join(c for c in book_name if c.isalnum() or c in (' ', '-', '_')).strip()
+    timestamp = int(time.time())
+    suffix = "_draft" if tier == "draft" else ""
+    return output_dir / f"{safe_book_name}_{timestamp}{suffix}.mp4"
+
+
+def _failure_message(video) -> str:
+    error = getattr(video, 'error', None)
+    return getattr(error, 'message', None) or str(error or video.status)
+
+
+def _cancel_remote_job(client: OpenAI, video_id: str) -> None:
+    """リモートの生成ジョブを削除（Sora2 APIにはキャンセル専用エンドポイントがないため削除で代替）"""
+    client.videos.delete(video_id)
+    print(f"⏹️ 生成ジョブを削除しました (Video ID: {video_id})")
+
+
+def _wait_for_completion(client: OpenAI, video, cancel_token: Optional[CancellationToken] = None):
+    """
+    生成完了までポーリング
+
+    キャンセルされた場合はリモートジョブを削除し、OperationCancelledを送出
+    """
+    unregister = lambda: None
+    if cancel_token is not None:
+        unregister = cancel_token.register(lambda: _cancel_remote_job(client, video.id))
+
+    started_at = time.time()
+    try:
+        while video.status in PENDING_STATUSES:
+            interval = next_poll_interval(getattr(video, 'progress', None), time.time() - started_at)
+            cancellation.sleep(interval, cancel_token)
+            video = client.videos.retrieve(video.id)
+    finally:
+        unregister()
+
+    if video.status != 'completed':
+        raise RuntimeError(f"Sora2 generation failed: {_failure_message(video)}")
+
+    return video
+
+
+def submit_video(
+    prompt: str,
+    aspect_ratio: str = "16:9",
+    duration: int = 12,
+    model: str = "sora-2",
+    client: Optional[OpenAI] = None
+) -> str:
+    """
+    Sora2の生成ジョブを登録し、完了を待たずにジョブIDを返す
+
+    Args:
+        prompt: 動画生成プロンプト
+        aspect_ratio: アスペクト比 ("16:9", "9:16", "1:1")
+        duration: 動画の長さ（秒） - 4, 8, 12のみ指定可能
+        model: 使用モデル ("sora-2" or "sora-2-pro")
+        client: OpenAIクライアント（複数ジョブで共有する場合に指定）
+
+    Returns:
+        ジョブID（wait_video / download_video に渡す）
+    """
+    if client is None:
+        client = OpenAI(api_key=get_api_key())
+
+    duration = _normalize_duration(duration)
+    size = _resolve_size(model, aspect_ratio)
+
+    with telemetry.span("sora2.create", model=model, seconds=duration, size=size):
+        video = client.videos.create(
+            model=model,
+            prompt=prompt,
+            seconds=str(duration),
+            size=size
+        )
+
+    print(f"🎬 生成ジョブを登録 (Video ID: {video.id}, {model}, {size}, {duration}s)")
+    return video.id
+
+
+async def _cancellable_sleep(seconds: float, cancel_token: Optional[CancellationToken]) -> None:
+    """イベントループを止めずに待機（キャンセルは0.5秒刻みで確認）"""
+    deadline = time.monotonic() + seconds
+    while True:
+        cancellation.check(cancel_token)
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        await asyncio.sleep(min(remaining, 0.5) if cancel_token is not None else remaining)
+
+
+async def _delete_remote_job(client: AsyncOpenAI, job_id: str) -> None:
+    """リモートの生成ジョブを削除（失敗しても例外は送出しない）"""
+    try:
+        await client.videos.delete(job_id)
+        print(f"⏹️ 生成ジョブを削除しました (Video ID: {job_id})")
+    except Exception as delete_error:
+        print(f"⚠️ 生成ジョブの削除に失敗: {delete_error}")
+
+
+async def wait_video(
+    job_id: str,
+    cancel_token: Optional[CancellationToken] = None,
+    timeout: Optional[float] = None,
+    client: Optional[AsyncOpenAI] = None
+) -> Dict[str, Any]:
+    """
+    生成ジョブの完了を非同期に待つ（進捗と経過時間に応じてポーリング間隔を調整）
+
+    複数ジョブは wait_videos で1つのクライアントを共有して同時に待てる
+    完了しなかったジョブ（キャンセル・タイムアウト・ポーリングの失敗）はリモートでも削除する
+
+    Args:
+        job_id: submit_video が返したジョブID
+        cancel_token: キャンセル用トークン（キャンセル時はリモートジョブも削除）
+        timeout: 最大待機秒数（Noneの場合は無制限）
+        client: 非同期クライアント（Noneの場合は作成し、待機後に閉じる）
+
+    Returns:
+        {
+            'id': str,
+            'status': 'completed' | 'failed' | 'cancelled' | 'timeout',
+            'progress': float | None,
+            'elapsed_seconds': float,
+            'polls': int,
+            'error': str (失敗時のみ)
+        }
+    """
+    if client is None:
+        async with AsyncOpenAI(api_key=get_api_key()) as client:
+            return await wait_video(job_id, cancel_token=cancel_token, timeout=timeout, client=client)
+
+    started_at = time.time()
+    polls = 0
+    progress = None
+
+    def result(status: str, **extra) -> Dict[str, Any]:
+        return {
+            'id': job_id,
+            'status': status,
+            'progress': progress,
+            'elapsed_seconds': time.time() - started_at,
+            'polls': polls,
+            **extra
+        }
+
+    try:
+        with telemetry.span("sora2.wait_video"):
+            while True:
+                video = await client.videos.retrieve(job_id)
+                polls += 1
+                progress = getattr(video, 'progress', None)
+
+                if video.status == 'completed':
+                    return result('completed')
+                if video.status not in PENDING_STATUSES:
+                    return result('failed', error=_failure_message(video))
+
+                elapsed = time.time() - started_at
+                if timeout is not None and elapsed >= timeout:
+                    await _delete_remote_job(client, job_id)
+                    return result('timeout', error=f"{timeout}秒以内に完了しませんでした")
+
+                await _cancellable_sleep(next_poll_interval(progress, elapsed), cancel_token)
+
+    except cancellation.OperationCancelled as e:
+        await _delete_remote_job(client, job_id)
+        return result('cancelled', error=str(e))
+
+    except Exception as e:
+        # ポーリングに失敗したジョブは結果を取りに行けないため、生成を続けさせない
+        await _delete_remote_job(client, job_id)
+        return result('failed', error=str(e))
+
+    finally:
+        telemetry.increment("sora2.polls", polls)
+
+
+async def wait_videos(
+    job_ids: List[str],
+    cancel_token: Optional[CancellationToken] = None,
+    timeout: Optional[float] = None
+) -> List[Dict[str, Any]]:
+    """
+    複数の生成ジョブを1つの非同期クライアントで同時に待つ（結果はjob_idsと同じ順）
+
+    1つのジョブが失敗しても他のジョブの待機は続け、ジョブごとに結果（失敗時は 'failed'）を返す
+    """
+    async with AsyncOpenAI(api_key=get_api_key()) as client:
+        outcomes = await asyncio.gather(
+            *(wait_video(job_id, cancel_token=cancel_token, timeout=timeout, client=client) for job_id in job_ids),
+            return_exceptions=True
+        )
+
+    return [
+        outcome if not isinstance(outcome, BaseException) else {
+            'id': job_id,
+            'status': 'failed',
+            'progress': None,
+            'elapsed_seconds': None,
+            'polls': 0,
+            'error': str(outcome) or type(outcome).__name__
+        }
+        for job_id, outcome in zip(job_ids, outcomes)
+    ]
+
+
+def download_video(
+    job_id: str,
+    output_path: Path,
+    client: Optional[OpenAI] = None,
+    cancel_token: Optional[CancellationToken] = None,
+    max_retries: int = 3,
+    retry_delay: float = 5
+) -> Path:
+    """
+    生成済み動画をダウンロード（リトライあり）
+
+    Args:
+        job_id: 生成ジョブID
+        output_path: 保存先パス
+        client: OpenAIクライアント
+        cancel_token: キャンセル用トークン
+        max_retries: 最大試行回数
+        retry_delay: 再試行までの待機秒数
+
+    Returns:
+        保存先パス
+    """
+    if client is None:
+        client = OpenAI(api_key=get_api_key())
+
+    for attempt in range(max_retries):
+        try:
+            with telemetry.span("sora2.download_content", attempt=attempt + 1):
+                content = client.videos.download_content(job_id)
+
+                output_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(output_path, "wb") as f:
+                    for chunk in content.iter_bytes():
+                        f.write(chunk)
+
+            print(f"✓ 保存完了: {output_path}")
+            return output_path
+
+        except Exception as download_error:
+            telemetry.increment("sora2.download_failures")
+            if attempt < max_retries - 1:
+                print(f"⚠️ ダウンロード失敗 (試行 {attempt + 1}/{max_retries}): {download_error}")
+                print(f"   {retry_delay}秒後に再試行...")
+                cancellation.sleep(retry_delay, cancel_token)
+            else:
+                # 最後の試行でも失敗
+                raise download_error
+
+
 def generate_video(
     prompt: str,
     book_name: str,
     aspect_ratio: str = "16:9",
     duration: int = 10,
     output_dir: Optional[Path] = None,
-    model: str = "sora-2"
+    model: str = "sora-2",
+    cancel_token: Optional[CancellationToken] = None,
+    tier: str = "final",
+    preflight: bool = True
 ) -> Dict[str, Any]:
     """
     Sora2で動画を生成
@@ -49,6 +408,11 @@ def generate_video(
         duration: 動画の長さ（秒） - 4, 8, 12のみ指定可能
         output_dir: 出力ディレクトリ（Noneの場合は自動生成）
         model: 使用モデル ("sora-2" or "sora-2-pro")
+        cancel_token: キャンセル用トークン（キャンセル時はリモートジョブも削除）
+        tier: "draft"（低解像度・4秒の確認用）または "final"（本番）。
+            draft の場合は model / duration を RENDER_TIERS の値で上書きする
+        preflight: 登録前にプロンプトをチェックする場合True
+            （禁止語・文字数超過は即座にエラー、実在人物名は代名詞に置き換える）
 
     Returns:
         生成結果の辞書
@@ -58,90 +422,72 @@ def generate_video(
             'aspect_ratio': str,
             'duration': int,
             'generation_id': str,
-            'status': 'success' | 'error',
-            'error': str (エラー時のみ)
+            'model': str,
+            'tier': str,
+            'status': 'success' | 'error' | 'cancelled',
+            'error': str (エラー・キャンセル時のみ)
         }
     """
+    if tier not in RENDER_TIERS:
+        raise ValueError(f"未対応のtier: {tier}（{', '.join(RENDER_TIERS)}）")
+    model = RENDER_TIERS[tier].get("model", model)
+    duration = RENDER_TIERS[tier].get("duration", duration)
+
+    # プリフライトチェック（拒否されるプロンプトはキュー待ちの前に失敗させる）
+    if preflight:
+        checked = prompt_preflight.check_prompt(prompt)
+        if not checked['ok']:
+            telemetry.increment("sora2.preflight_rejected")
+            return {
+                'video_file': None,
+                'prompt': prompt,
+                'aspect_ratio': aspect_ratio,
+                'duration': duration,
+                'generation_id': None,
+                'model': model,
+                'tier': tier,
+                'status': 'error',
+                'error': str(prompt_preflight.PreflightError(checked['problems']))
+            }
+        prompt = checked['prompt']
+
     client = OpenAI(api_key=get_api_key())
 
     # durationの検証（4, 8, 12のみ）
-    allowed_durations = [4, 8, 12]
-    if duration not in allowed_durations:
-        # 最も近い値を選択
-        duration = min(allowed_durations, key=lambda x: abs(x - duration))
-        print(f"⚠️ Duration adjusted to {duration}s (only 4, 8, 12 are allowed)")
+    duration = _normalize_duration(duration)
 
     # 出力ディレクトリの準備
-    if output_dir is None:
-        project_root = Path(__file__).parent.parent
-        output_dir = project_root / "data" / "output" / "sora2_videos"
-
-    output_dir.mkdir(parents=True, exist_ok=True)
+    output_dir = _prepare_output_dir(output_dir)
 
     # アスペクト比をサイズに変換
-    # sora-2: 720x1280, 1280x720 のみ
-    # sora-2-pro: 1024x1792, 1792x1024 もサポート
-    if "pro" in model.lower():
-        size_map = {
-            "16:9": "1792x1024",
-            "9:16": "1024x1792",
-            "1:1": "1024x1024"
-        }
-    else:
-        size_map = {
-            "16:9": "1280x720",
-            "9:16": "720x1280",
-            "1:1": "720x1280"  # 1:1は非対応なので縦型を使用
-        }
-    size = size_map.get(aspect_ratio, "720x1280")
+    size = _resolve_size(model, aspect_ratio)
 
     # ファイル名の準備
-    safe_book_name = "".join(c for c in book_name if c.isalnum() or c in (' ', '-', '_')).strip()
-    timestamp = int(time.time())
-    output_filename = f"{safe_book_name}_{timestamp}.mp4"
-    output_path = output_dir / output_filename
+    output_path = _output_path(output_dir, book_name, tier)
 
     try:
-        # Sora2 API呼び出し (create_and_poll で非同期生成+ポーリング)
+        # Sora2 API呼び出し (create で生成開始 → キャンセル可能なポーリング)
+        cancellation.check(cancel_token)
         print("🎬 Sora2で動画生成中...")
+        print(f"   Tier: {tier}")
         print(f"   Model: {model}")
         print(f"   Aspect Ratio: {aspect_ratio} → Size: {size}")
         print(f"   Duration: {duration}s")
 
-        video = client.videos.create_and_poll(
-            model=model,
-            prompt=prompt,
-            seconds=str(duration),  # "8", "10", "12"
-            size=size
-        )
+        with telemetry.span("sora2.create_and_poll", model=model, seconds=duration, size=size, tier=tier):
+            video = client.videos.create(
+                model=model,
+                prompt=prompt,
+                seconds=str(duration),  # "8", "10", "12"
+                size=size
+            )
+            video = _wait_for_completion(client, video, cancel_token)
 
         print(f"✓ 動画生成完了 (Video ID: {video.id})")
 
         # 動画をダウンロード（リトライあり）
         print("📥 動画をダウンロード中...")
-        max_retries = 3
-        retry_delay = 5  # 秒
-
-        for attempt in range(max_retries):
-            try:
-                content = client.videos.download_content(video.id)
-
-                output_path.parent.mkdir(parents=True, exist_ok=True)
-                with open(output_path, "wb") as f:
-                    for chunk in content.iter_bytes():
-                        f.write(chunk)
-
-                print(f"✓ 保存完了: {output_path}")
-                break
-
-            except Exception as download_error:
-                if attempt < max_retries - 1:
-                    print(f"⚠️ ダウンロード失敗 (試行 {attempt + 1}/{max_retries}): {download_error}")
-                    print(f"   {retry_delay}秒後に再試行...")
-                    time.sleep(retry_delay)
-                else:
-                    # 最後の試行でも失敗
-                    raise download_error
+        download_video(video.id, output_path, client=client, cancel_token=cancel_token)
 
         result = {
             'video_file': output_path,
@@ -149,11 +495,27 @@ def generate_video(
             'aspect_ratio': aspect_ratio,
             'duration': duration,
             'generation_id': video.id,
+            'model': model,
+            'tier': tier,
             'status': 'success'
         }
 
         return result
 
+    except cancellation.OperationCancelled as e:
+        print("⏹️ 動画生成をキャンセルしました")
+        return {
+            'video_file': None,
+            'prompt': prompt,
+            'aspect_ratio': aspect_ratio,
+            'duration': duration,
+            'generation_id': None,
+            'model': model,
+            'tier': tier,
+            'status': 'cancelled',
+            'error': str(e)
+        }
+
     except Exception as e:
         # エラー時
         error_result = {
@@ -162,6 +524,8 @@ def generate_video(
             'aspect_ratio': aspect_ratio,
             'duration': duration,
             'generation_id': None,
+            'model': model,
+            'tier': tier,
             'status': 'error',
             'error': str(e)
         }
@@ -169,6 +533,132 @@ def generate_video(
         return error_result
 
 
+def submit_videos(
+    requests: List[Dict[str, Any]],
+    model: str = "sora-2",
+    tier: str = "final",
+    client: Optional[OpenAI] = None,
+    cancel_token: Optional[CancellationToken] = None,
+    max_workers: int = 4
+) -> List[Dict[str, Any]]:
+    """
+    複数の生成ジョブを1つのクライアントで並行して登録（各プロンプトはプリフライトチェック済みで登録）
+
+    Args:
+        requests: 生成リクエストのリスト
+            {'prompt', 'aspect_ratio', 'duration', ...}（その他のキーはそのまま結果に引き継ぐ）
+        model: 使用モデル ("sora-2" or "sora-2-pro")
+        tier: "draft" または "final"（draft の場合は model / duration を RENDER_TIERS の値で上書き）
+        client: OpenAIクライアント（Noneの場合は新規作成し、全ジョブで共有）
+        cancel_token: キャンセル用トークン（キャンセル後のリクエストは登録しない）
+        max_workers: 同時に登録するジョブ数
+
+    Returns:
+        requestsと同じ順のジョブハンドルのリスト
+        {..., 'job_id': str | None, 'model': str, 'duration': int, 'tier': str,
+         'status': 'submitted' | 'error' | 'cancelled', 'error': str (失敗時のみ)}
+    """
+    if tier not in RENDER_TIERS:
+        raise ValueError(f"未対応のtier: {tier}（{', '.join(RENDER_TIERS)}）")
+    model = RENDER_TIERS[tier].get("model", model)
+
+    if client is None:
+        client = OpenAI(api_key=get_api_key())
+
+    def submit(request: Dict[str, Any]) -> Dict[str, Any]:
+        duration = _normalize_duration(RENDER_TIERS[tier].get("duration", request.get("duration", 12)))
+        handle = {**request, 'job_id': None, 'model': model, 'duration': duration, 'tier': tier}
+        try:
+            cancellation.check(cancel_token)
+            checked = prompt_preflight.check_prompt(request['prompt'])
+            if not checked['ok']:
+                telemetry.increment("sora2.preflight_rejected")
+                raise prompt_preflight.PreflightError(checked['problems'])
+            handle['prompt'] = checked['prompt']
+            handle['job_id'] = submit_video(
+                checked['prompt'],
+                aspect_ratio=request.get('aspect_ratio', '16:9'),
+                duration=duration,
+                model=model,
+                client=client
+            )
+            handle['status'] = 'submitted'
+        except cancellation.OperationCancelled as e:
+            handle.update(status='cancelled', error=str(e))
+        except Exception as e:
+            handle.update(status='error', error=str(e))
+        return handle
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(requests)))) as pool:
+        return list(pool.map(submit, requests))
+
+
+def render_videos(
+    requests: List[Dict[str, Any]],
+    output_dir: Optional[Path] = None,
+    model: str = "sora-2",
+    tier: str = "final",
+    cancel_token: Optional[CancellationToken] = None,
+    timeout: Optional[float] = None
+) -> List[Dict[str, Any]]:
+    """
+    複数の動画をまとめて生成（一括登録 → 同時に完了待ち → ダウンロード）
+
+    Args:
+        requests: 生成リクエストのリスト
+            {'prompt', 'book_name'（ファイル名用）, 'aspect_ratio', 'duration', ...}
+        output_dir: 出力ディレクトリ（Noneの場合は自動生成）
+        model: 使用モデル ("sora-2" or "sora-2-pro")
+        tier: "draft" または "final"
+        cancel_token: キャンセル用トークン（キャンセル時は登録済みのリモートジョブも削除）
+        timeout: ジョブごとの最大待機秒数（Noneの場合は無制限）
+
+    Returns:
+        requestsと同じ順の生成結果（generate_video と同じ形式に、リクエストのキーを加えたもの）
+    """
+    if not requests:
+        return []
+
+    output_dir = _prepare_output_dir(output_dir)
+    client = OpenAI(api_key=get_api_key())
+
+    with telemetry.span("sora2.render_videos", model=model, tier=tier, count=len(requests)):
+        handles = submit_videos(requests, model=model, tier=tier, client=client, cancel_token=cancel_token)
+
+        submitted = [h for h in handles if h['status'] == 'submitted']
+        statuses = asyncio.run(wait_videos(
+            [h['job_id'] for h in submitted], cancel_token=cancel_token, timeout=timeout
+        )) if submitted else []
+
+        for handle, status in zip(submitted, statuses):
+            if status['status'] != 'completed':
+                handle.update(status='cancelled' if status['status'] == 'cancelled' else 'error', error=status.get('error'))
+                continue
+            try:
+                handle['video_file'] = download_video(
+                    handle['job_id'],
+                    _output_path(output_dir, handle.get('book_name', handle['job_id']), tier),
+                    client=client,
+                    cancel_token=cancel_token
+                )
+                handle['status'] = 'success'
+            except cancellation.OperationCancelled as e:
+                handle.update(status='cancelled', error=str(e))
+            except Exception as e:
+                handle.update(status='error', error=str(e))
+
+    results = []
+    for handle in handles:
+        result = dict(handle)
+        result['generation_id'] = result.pop('job_id')
+        result.setdefault('video_file', None)
+        if result['status'] == 'success':
+            result.pop('error', None)
+        results.append(result)
+
+    return results
+
+
 def check_generation_status(generation_id: str) -> Dict[str, Any]:
     """
     動画生成のステータスをチェック
@@ -188,7 +678,7 @@ def check_generation_status(generation_id: str) -> Dict[str, Any]:
 
         return {
             'id': generation_id,
-            'status': status.status,  # 'pending', 'processing', 'completed', 'failed'
+            'status': status.status,  # 'queued', 'in_progress', 'completed', 'failed'
             'progress': getattr(status, 'progress', None),
             'url': getattr(status, 'url', None)
         }
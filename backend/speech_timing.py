@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+ナレーション読み上げ時間の推定モジュール
+
+日本語テキストのモーラ数（拍数）と句読点の間から読み上げ秒数を推定し、
+ナレーションが収まる最短のSora2クリップ長（4/8/12秒）を選ぶ
+
+読み上げ速度は実際の生成結果で校正できる（data/internal/speech_timing.json に保存）:
+    python -m backend.speech_timing calibrate samples.json
+    （samples.json: [{"text": "ナレーション", "seconds": 実測秒数}, ...]）
+"""
+
+import re
+import sys
+from pathlib import Path
+from typing import Iterable, Optional, Tuple
+
+from .sora2_engine import ALLOWED_DURATIONS
+from .utils import get_project_root, load_json, save_json
+
+# 既定の読み上げ速度（モーラ/秒）。ナレーションは1分あたり約450モーラ
+DEFAULT_MORA_PER_SECOND = 7.5
+
+# 句読点ごとの間（秒）
+PAUSE_SECONDS = {
+    '、': 0.25, '，': 0.25, ',': 0.25,
+    '。': 0.5, '．': 0.5, '！': 0.5, '？': 0.5, '!': 0.5, '?': 0.5,
+    '…': 0.4, '―': 0.3, '—': 0.3,
+}
+
+# クリップ冒頭・末尾の余白（秒）
+LEAD_SECONDS = 0.5
+
+# 文字種ごとのモーラ数（かな以外は平均的な読みの長さで近似）
+KANJI_MORA = 1.8
+LATIN_MORA = 0.7
+DIGIT_MORA = 2.0
+
+# 直前のかなと合わせて1モーラになる小書き文字（っ・ッは1モーラとして数える）
+_SMALL_KANA = set('ゃゅょぁぃぅぇぉゎャュョァィゥェォヮ')
+
+_KANA = re.compile(r'[ぁ-ゟ゠-ヿｦ-ﾟ]')
+_KANJI = re.compile(r'[㐀-䶿一-鿿豈-﫿々〆]')
+
+# 校正結果の読み上げ速度（未読み込みの場合はNone）
+_calibrated_rate: Optional[float] = None
+
+
+def _calibration_file() -> Path:
+    return get_project_root() / "data" / "internal" / "speech_timing.json"
+
+
+def count_morae(text: str) -> float:
+    """テキストのモーラ数（拍数）を推定"""
+    morae = 0.0
+    for char in text:
+        if char in _SMALL_KANA:
+            continue
+        if _KANA.match(char):
+            morae += 1
+        elif _KANJI.match(char):
+            morae += KANJI_MORA
+        elif char.isdigit():
+            morae += DIGIT_MORA
+        elif char.isascii() and char.isalpha():
+            morae += LATIN_MORA
+    return morae
+
+
+def pause_seconds(text: str) -> float:
+    """句読点による間の合計（秒）"""
+    return sum(PAUSE_SECONDS.get(char, 0.0) for char in text)
+
+
+def get_mora_per_second() -> float:
+    """読み上げ速度（校正済みならその値、なければ既定値）"""
+    global _calibrated_rate
+
+    if _calibrated_rate is None:
+        calibration_file = _calibration_file()
+        if calibration_file.exists():
+            _calibrated_rate = load_json(calibration_file)['mora_per_second']
+        else:
+            _calibrated_rate = DEFAULT_MORA_PER_SECOND
+
+    return _calibrated_rate
+
+
+def estimate_seconds(text: str, mora_per_second: Optional[float] = None) -> float:
+    """
+    ナレーションの読み上げ秒数を推定
+
+    Args:
+        text: ナレーション
+        mora_per_second: 読み上げ速度（Noneの場合は校正値または既定値）
+
+    Returns:
+        推定秒数（冒頭・末尾の余白を含む）
+    """
+    rate = mora_per_second or get_mora_per_second()
+    return count_morae(text) / rate + pause_seconds(text) + LEAD_SECONDS
+
+
+def fit_duration(text: str) -> int:
+    """ナレーションが収まる最短のクリップ長（収まらない場合は最長）を返す"""
+    return choose_duration(estimate_seconds(text))
+
+
+def choose_duration(seconds: float) -> int:
+    """指定秒数が収まる最短のクリップ長（収まらない場合は最長）を返す"""
+    for duration in sorted(ALLOWED_DURATIONS):
+        if seconds <= duration:
+            return duration
+    return max(ALLOWED_DURATIONS)
+
+
+def calibrate(samples: Iterable[Tuple[str, float]]) -> float:
+    """
+    実測した読み上げ時間から読み上げ速度を求め、校正ファイルに保存
+
+    Args:
+        samples: (ナレーション, 実測秒数) のリスト
+
+    Returns:
+        校正後の読み上げ速度（モーラ/秒）
+    """
+    global _calibrated_rate
+
+    total_morae = 0.0
+    total_speech = 0.0
+    count = 0
+    for text, seconds in samples:
+        speech = seconds - pause_seconds(text) - LEAD_SECONDS
+        if speech <= 0:
+            continue
+        total_morae += count_morae(text)
+        total_speech += speech
+        count += 1
+
+    if count == 0 or total_speech <= 0:
+        raise ValueError("校正に使えるサンプルがありません")
+
+    _calibrated_rate = total_morae / total_speech
+    save_json(_calibration_file(), {
+        'mora_per_second': round(_calibrated_rate, 3),
+        'samples': count
+    })
+
+    return _calibrated_rate
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "calibrate":
+        samples = [(s['text'], s['seconds']) for s in load_json(Path(sys.argv[2]))]
+        rate = calibrate(samples)
+        print(f"✓ 読み上げ速度: {rate:.2f} モーラ/秒（{len(samples)}サンプル）")
+    elif len(sys.argv) == 2:
+        seconds = estimate_seconds(sys.argv[1])
+        print(f"推定 {seconds:.1f}秒 → {choose_duration(seconds)}秒クリップ")
+    else:
+        print("使い方: python -m backend.speech_timing \"ナレーション\" | calibrate samples.json")
+        raise SystemExit(2)
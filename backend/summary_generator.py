@@ -3,18 +3,28 @@
 書籍概要生成モジュール
 
 EPUBから抽出したテキストから、論文形式の客観的な概要を生成
+
+本文全体がモデルの入力上限に収まる場合は、チャンクに分けずに1回のリクエストで概要を作る
+（長文コンテキスト分析。book_analyzer.analyze_book の mode="auto" から使う）
 """
 
 from pathlib import Path
-from typing import Dict, Any
-import google.generativeai as genai
-import os
+from typing import Dict, Any, Callable, Optional
 import json
 from dotenv import load_dotenv
+from . import telemetry
+from . import gemini_client
+from . import cancellation
+from . import text_segmenter
+from . import text_normalizer
+from .cancellation import CancellationToken
 
 # .envファイルから環境変数を読み込む
 load_dotenv()
 
+# 本文に使う入力トークンの割合（残りはプロンプト・出力と、長い入力での品質低下に備えた余裕）
+LONG_CONTEXT_RATIO = 0.8
+
 
 def chunk_text(text: str, chunk_size: int = 2000) -> list[str]:
     """
@@ -33,6 +43,12 @@ def chunk_text(text: str, chunk_size: int = 2000) -> list[str]:
     # 段落ごとに処理
     paragraphs = text.split('\n\n')
 
+    # チャンクサイズを超える段落は文の区切りで分ける
+    paragraphs = [
+        piece for para in paragraphs
+        for piece in text_segmenter.split_to_fit(para, chunk_size)
+    ]
+
     for para in paragraphs:
         if len(current_chunk) + len(para) <= chunk_size:
             current_chunk += para + "\n\n"
@@ -76,15 +92,88 @@ def summarize_chunk(chunk: str, chunk_index: int, model) -> str:
 200-300文字の要約のみを出力してください。
 """
 
-    response = model.generate_content(
-        prompt,
-        generation_config={"temperature": 0.3}
-    )
+    with telemetry.span("gemini.generate_content", stage="summarize_chunk"):
+        response = model.generate_content(
+            prompt,
+            generation_config={"temperature": 0.3}
+        )
 
     return response.text.strip()
 
 
-def generate_book_summary(book_name: str, full_text: str, target_length: int = 800) -> Dict[str, Any]:
+def count_tokens(text: str, model_name: str = gemini_client.DEFAULT_MODEL) -> int:
+    """
+    テキストの入力トークン数（APIで数える。失敗した場合は text_normalizer の推定値）
+    """
+    try:
+        with telemetry.span("gemini.count_tokens"):
+            return gemini_client.get_model(model_name).count_tokens(text).total_tokens
+    except Exception as e:
+        print(f"  ⚠️ トークン数を取得できませんでした（推定値を使用）: {e}")
+        return text_normalizer.estimate_tokens(text)
+
+
+def estimate_long_context(
+    estimated_tokens: int,
+    model_name: str = gemini_client.DEFAULT_MODEL,
+    ratio: float = LONG_CONTEXT_RATIO
+) -> Optional[Dict[str, Any]]:
+    """
+    推定トークン数だけで、本文全体が1回のリクエストに収まらないと判定できるか
+
+    全文の文字列を作る前に、章ごとの推定値の合計などで判定するために使う
+
+    Args:
+        estimated_tokens: 本文の推定トークン数（text_normalizer.estimate_tokens）
+        model_name: モデル名
+        ratio: 入力上限のうち本文に使う割合
+
+    Returns:
+        予算の2倍を超える場合は check_long_context() と同じ形式の判定結果、
+        収まる可能性があり全文を数える必要がある場合はNone
+    """
+    budget = int(gemini_client.input_token_limit(model_name) * ratio)
+    if estimated_tokens > budget * 2:
+        return {'fits': False, 'tokens': estimated_tokens, 'budget': budget, 'estimated': True}
+    return None
+
+
+def check_long_context(
+    full_text: str,
+    model_name: str = gemini_client.DEFAULT_MODEL,
+    ratio: float = LONG_CONTEXT_RATIO
+) -> Dict[str, Any]:
+    """
+    本文全体を1回のリクエストで送れるか判定
+
+    推定トークン数が予算の2倍を超える場合は、APIで数えずに収まらないと判定する
+
+    Args:
+        full_text: 書籍の全文テキスト
+        model_name: モデル名
+        ratio: 入力上限のうち本文に使う割合
+
+    Returns:
+        {'fits': bool, 'tokens': 本文のトークン数, 'budget': 本文に使えるトークン数, 'estimated': 推定値かどうか}
+    """
+    context = estimate_long_context(text_normalizer.estimate_tokens(full_text), model_name, ratio)
+    if context is not None:
+        return context
+
+    budget = int(gemini_client.input_token_limit(model_name) * ratio)
+    tokens = count_tokens(full_text, model_name)
+    return {'fits': tokens <= budget, 'tokens': tokens, 'budget': budget, 'estimated': False}
+
+
+def generate_book_summary(
+    book_name: str,
+    full_text: str,
+    target_length: int = 800,
+    max_chars: Optional[int] = 50000,
+    toc: str = "",
+    progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+    cancel_token: Optional[CancellationToken] = None
+) -> Dict[str, Any]:
     """
     書籍の客観的な概要を生成（論文形式）
 
@@ -92,22 +181,25 @@ def generate_book_summary(book_name: str, full_text: str, target_length: int = 8
         book_name: 書籍名
         full_text: 書籍の全文テキスト
         target_length: 目標文字数（デフォルト800文字）
+        max_chars: 送る本文の上限文字数（超える場合は先頭のみ。Noneの場合は全文を送る）
+        toc: 目次テキスト（book_analyzer.format_toc() の戻り値）。指定すると構成の説明に使う
+        progress_callback: 生成完了時に {'tokens_used'} を受け取るコールバック
+        cancel_token: キャンセル用トークン
 
     Returns:
         概要情報を含む辞書
     """
 
-    # Gemini API設定
-    api_key = os.getenv("GOOGLE_API_KEY")
-    if not api_key:
-        raise ValueError("GOOGLE_API_KEY環境変数が設定されていません")
-
-    genai.configure(api_key=api_key)
-    model = genai.GenerativeModel('gemini-2.5-flash-lite')
+    # Geminiモデル（共有レジストリから取得）
+    model = gemini_client.get_model()
 
     # テキストが長すぎる場合は最初の部分のみ使用（トークン制限対策）
-    max_chars = 50000
-    text_for_analysis = full_text[:max_chars] if len(full_text) > max_chars else full_text
+    truncated = max_chars is not None and len(full_text) > max_chars
+    text_for_analysis = full_text[:max_chars] if truncated else full_text
+    toc_section = f"""
+## 目次（書籍の構成）
+{toc}
+""" if toc else ""
 
     prompt = f"""
 あなたは学術論文の要旨を書く専門家です。
@@ -115,8 +207,8 @@ def generate_book_summary(book_name: str, full_text: str, target_length: int = 8
 
 ## 書籍名
 {book_name}
-
-## 書籍テキスト（抜粋）
+{toc_section}
+## 書籍テキスト（{"抜粋" if truncated else "全文"}）
 {text_for_analysis}
 
 ---
@@ -171,14 +263,24 @@ JSON形式で出力してください。
 }}
 """
 
+    cancellation.check(cancel_token)
     print(f"  🤖 Gemini APIで書籍概要を生成中（目標{target_length}文字）...")
-    response = model.generate_content(
-        prompt,
-        generation_config={
-            "temperature": 0.3,  # 客観性を保つため低めに設定
-            "response_mime_type": "application/json"
-        }
-    )
+    with telemetry.span("gemini.generate_content", stage="book_summary"):
+        response = model.generate_content(
+            prompt,
+            generation_config={
+                "temperature": 0.3,  # 客観性を保つため低めに設定
+                "response_mime_type": "application/json"
+            }
+        )
+
+    usage = getattr(response, 'usage_metadata', None)
+    tokens = getattr(usage, 'total_token_count', 0) or 0
+    telemetry.increment("gemini.tokens", tokens, stage="book_summary")
+    # 応答待ちの間にキャンセルされた場合（長文コンテキストの1回のリクエストは途中で止められない）は結果を使わない
+    cancellation.check(cancel_token)
+    if progress_callback:
+        progress_callback({'tokens_used': tokens})
 
     result = json.loads(response.text)
 
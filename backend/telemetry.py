@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+計測モジュール
+
+スパン（処理時間）・カウンター・ヒストグラムを記録し、エクスポーターに出力する
+無効時（デフォルト）は共有のno-opスパンを返すだけなので、ほぼオーバーヘッドなし
+
+環境変数:
+    TELEMETRY_EXPORTER: none | jsonl | prometheus | otel（デフォルト: none）
+    TELEMETRY_PATH: 出力先ファイル（jsonl / prometheus のみ）
+    TELEMETRY_FLUSH_INTERVAL: prometheus のファイルを書き出す最短間隔（秒、デフォルト: 10）
+
+使い方:
+    from . import telemetry
+
+    with telemetry.span("gemini.generate_content", model="gemini-2.5-flash-lite"):
+        response = model.generate_content(prompt)
+
+    telemetry.increment("sora2.download_retries")
+    telemetry.observe("session.bytes", len(payload))
+"""
+
+import atexit
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from .utils import get_project_root, atomic_write_text
+
+# ヒストグラムのバケット境界（秒）。Sora2は数分かかるため上限を広めに取る
+DEFAULT_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+# prometheus のファイルを書き出す最短間隔（秒）
+DEFAULT_FLUSH_INTERVAL = float(os.getenv('TELEMETRY_FLUSH_INTERVAL', '10'))
+
+# 現在のエクスポーター（Noneの場合は計測無効）
+_exporter = None
+
+
+class _NoopSpan:
+    """計測無効時に返す共有スパン"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _Span:
+    """処理時間を計測するスパン"""
+
+    __slots__ = ('name', 'attributes', 'start', 'handle', 'exporter')
+
+    def __init__(self, name: str, attributes: Dict[str, Any], exporter):
+        self.name = name
+        self.attributes = attributes
+        self.exporter = exporter
+        self.start = 0.0
+        self.handle = None
+
+    def __enter__(self):
+        self.handle = self.exporter.start_span(self.name, self.attributes)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self.start
+        status = 'error' if exc_type else 'ok'
+        if exc_type:
+            self.attributes['error'] = exc_type.__name__
+        self.exporter.end_span(self.handle, self.name, duration, status, self.attributes)
+        return False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+
+def _label_key(labels: Dict[str, Any]) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted((str(k), str(v)) for k, v in labels.items()))
+
+
+def _metric_name(name: str) -> str:
+    """Prometheus形式のメトリクス名に変換（例: gemini.generate_content → gemini_generate_content）"""
+    return re.sub(r'[^a-zA-Z0-9_:]', '_', name)
+
+
+class JsonLinesExporter:
+    """イベントを1行1JSONで追記するエクスポーター"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._file = open(self.path, 'a', encoding='utf-8', buffering=1)
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        record['timestamp'] = time.time()
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            # configure() で差し替えた後も、実行中のスパンが古いエクスポーターに書くことがある
+            if not self._file.closed:
+                self._file.write(line + '\n')
+
+    def start_span(self, name: str, attributes: Dict[str, Any]):
+        return None
+
+    def end_span(self, handle, name: str, duration: float, status: str, attributes: Dict[str, Any]) -> None:
+        self._write({
+            'type': 'span',
+            'name': name,
+            'duration_ms': round(duration * 1000, 3),
+            'status': status,
+            'attributes': attributes
+        })
+
+    def increment(self, name: str, value: float, labels: Dict[str, Any]) -> None:
+        self._write({'type': 'counter', 'name': name, 'value': value, 'labels': labels})
+
+    def observe(self, name: str, value: float, labels: Dict[str, Any]) -> None:
+        self._write({'type': 'histogram', 'name': name, 'value': value, 'labels': labels})
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class PrometheusExporter:
+    """
+    メモリ上で集計し、node_exporterのtextfile形式で書き出すエクスポーター
+
+    スパンは `<name>_seconds` ヒストグラム（status ラベル付き）として集計する
+    Streamlitのサーバーのように長時間動くプロセスでもスクレイプできるよう、メトリクスを更新するたびに
+    ファイルを書き出す（前回から flush_interval 秒以内の更新は、残り時間の経過後にまとめて書き出す）
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL
+    ):
+        self.path = Path(path)
+        self.buckets = buckets
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[tuple, float]] = {}
+        # name -> label_key -> [bucket_counts..., sum, count]
+        self._histograms: Dict[str, Dict[tuple, list]] = {}
+        self._flush_lock = threading.Lock()
+        self._last_flush: Optional[float] = None
+        self._timer: Optional[threading.Timer] = None
+
+    def _updated(self) -> None:
+        """更新後の書き出し（間隔内なら Timer で遅らせ、連続した更新を1回の書き出しにまとめる）"""
+        with self._lock:
+            if self._timer is not None:
+                return
+            now = time.monotonic()
+            delay = 0.0 if self._last_flush is None else self._last_flush + self.flush_interval - now
+            if delay > 0:
+                self._timer = threading.Timer(delay, self._timed_flush)
+                self._timer.daemon = True
+                self._timer.start()
+                return
+            self._last_flush = now
+        self.flush()
+
+    def _timed_flush(self) -> None:
+        with self._lock:
+            self._timer = None
+            self._last_flush = time.monotonic()
+        self.flush()
+
+    def start_span(self, name: str, attributes: Dict[str, Any]):
+        return None
+
+    def end_span(self, handle, name: str, duration: float, status: str, attributes: Dict[str, Any]) -> None:
+        self.observe(f"{name}_seconds", duration, {'status': status})
+
+    def increment(self, name: str, value: float, labels: Dict[str, Any]) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(_metric_name(name) + '_total', {})
+            series[key] = series.get(key, 0) + value
+        self._updated()
+
+    def observe(self, name: str, value: float, labels: Dict[str, Any]) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(_metric_name(name), {})
+            state = series.get(key)
+            if state is None:
+                state = [0] * len(self.buckets) + [0.0, 0]
+                series[key] = state
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+        self._updated()
+
+    def render(self) -> str:
+        """textfile形式の文字列を生成"""
+        def fmt_labels(key: tuple, extra: Optional[Tuple[str, str]] = None) -> str:
+            pairs = list(key) + ([extra] if extra else [])
+            if not pairs:
+                return ''
+            return '{' + ','.join(f'{k}="{v}"' for k, v in pairs) + '}'
+
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                lines.append(f"# TYPE {name} counter")
+                for key, value in series.items():
+                    lines.append(f"{name}{fmt_labels(key)} {value}")
+
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f"# TYPE {name} histogram")
+                for key, state in series.items():
+                    for bound, count in zip(self.buckets, state):
+                        lines.append(f"{name}_bucket{fmt_labels(key, ('le', str(bound)))} {count}")
+                    lines.append(f"{name}_bucket{fmt_labels(key, ('le', '+Inf'))} {state[-1]}")
+                    lines.append(f"{name}_sum{fmt_labels(key)} {state[-2]}")
+                    lines.append(f"{name}_count{fmt_labels(key)} {state[-1]}")
+
+        return '\n'.join(lines) + '\n'
+
+    def flush(self) -> None:
+        # 書きかけのファイルをスクレイプされないよう、一時ファイル→renameで置き換える
+        # （同時に書き出す場合も、古い集計で新しいファイルを上書きしないよう直列化する）
+        with self._flush_lock:
+            atomic_write_text(self.path, self.render())
+
+    def close(self) -> None:
+        """待機中の書き出しを取り消し、最新の集計を書き出す"""
+        with self._lock:
+            timer, self._timer = self._timer, None
+        if timer is not None:
+            timer.cancel()
+        self.flush()
+
+
+class OpenTelemetryExporter:
+    """OpenTelemetry API に転送するエクスポーター（SDK・エクスポーターの設定は利用側で行う）"""
+
+    def __init__(self):
+        from opentelemetry import trace, metrics
+
+        self._tracer = trace.get_tracer("book_promo_sora2")
+        self._meter = metrics.get_meter("book_promo_sora2")
+        self._lock = threading.Lock()
+        self._instruments: Dict[str, Any] = {}
+
+    def _instrument(self, kind: str, name: str):
+        with self._lock:
+            inst = self._instruments.get(name)
+            if inst is None:
+                if kind == 'counter':
+                    inst = self._meter.create_counter(name)
+                else:
+                    inst = self._meter.create_histogram(name)
+                self._instruments[name] = inst
+            return inst
+
+    def start_span(self, name: str, attributes: Dict[str, Any]):
+        return self._tracer.start_span(name, attributes={k: str(v) for k, v in attributes.items()})
+
+    def end_span(self, handle, name: str, duration: float, status: str, attributes: Dict[str, Any]) -> None:
+        handle.set_attribute('status', status)
+        if 'error' in attributes:
+            handle.set_attribute('error', str(attributes['error']))
+        handle.end()
+        self._instrument('histogram', f"{name}.duration").record(duration, {'status': status})
+
+    def increment(self, name: str, value: float, labels: Dict[str, Any]) -> None:
+        self._instrument('counter', name).add(value, {k: str(v) for k, v in labels.items()})
+
+    def observe(self, name: str, value: float, labels: Dict[str, Any]) -> None:
+        self._instrument('histogram', name).record(value, {k: str(v) for k, v in labels.items()})
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+def span(name: str, **attributes):
+    """
+    処理時間を計測するコンテキストマネージャーを返す
+
+    Args:
+        name: スパン名（例: "sora2.create_and_poll"）
+        **attributes: 付加情報（モデル名など）
+
+    Returns:
+        with文で使うスパン（無効時は共有のno-opスパン）
+    """
+    exporter = _exporter
+    if exporter is None:
+        return _NOOP_SPAN
+    return _Span(name, attributes, exporter)
+
+
+def increment(name: str, value: float = 1, **labels) -> None:
+    """カウンターを加算"""
+    exporter = _exporter
+    if exporter is None:
+        return
+    exporter.increment(name, value, labels)
+
+
+def observe(name: str, value: float, **labels) -> None:
+    """ヒストグラムに値を記録"""
+    exporter = _exporter
+    if exporter is None:
+        return
+    exporter.observe(name, value, labels)
+
+
+def is_enabled() -> bool:
+    """計測が有効かどうか"""
+    return _exporter is not None
+
+
+def flush() -> None:
+    """バッファ済みのメトリクスを書き出す"""
+    exporter = _exporter
+    if exporter is not None:
+        exporter.flush()
+
+
+def configure(exporter: Optional[str] = None, path: Optional[Path] = None) -> None:
+    """
+    エクスポーターを設定
+
+    未対応のエクスポーター名の場合は警告を表示して計測を無効にする
+    （インポート時に環境変数から設定するため、.env の誤記ですべてのモジュールが読み込めなくならないように）
+    差し替える前のエクスポーターは閉じる（jsonl のファイルを閉じ、prometheus は最新の集計を書き出す）
+
+    Args:
+        exporter: "none" | "jsonl" | "prometheus" | "otel"（Noneの場合は環境変数 TELEMETRY_EXPORTER）
+        path: 出力先ファイル（Noneの場合は環境変数 TELEMETRY_PATH、未設定なら data/internal/telemetry/ 配下）
+    """
+    global _exporter
+
+    if exporter is None:
+        exporter = os.getenv('TELEMETRY_EXPORTER', 'none')
+    exporter = exporter.strip().lower()
+
+    if path is None and os.getenv('TELEMETRY_PATH'):
+        path = Path(os.environ['TELEMETRY_PATH'])
+
+    telemetry_dir = get_project_root() / "data" / "internal" / "telemetry"
+    new_exporter = None
+
+    if exporter in ('', 'none', 'off'):
+        pass
+    elif exporter == 'jsonl':
+        new_exporter = JsonLinesExporter(path or telemetry_dir / "events.jsonl")
+    elif exporter == 'prometheus':
+        new_exporter = PrometheusExporter(path or telemetry_dir / "metrics.prom")
+    elif exporter == 'otel':
+        try:
+            new_exporter = OpenTelemetryExporter()
+        except ImportError:
+            print("⚠️ opentelemetry がインストールされていないため計測を無効化します")
+    else:
+        print(f"⚠️ 未対応のエクスポーター: {exporter}（none / jsonl / prometheus / otel）。計測を無効化します")
+
+    previous, _exporter = _exporter, new_exporter
+    if previous is not None:
+        previous.close()
+
+
+configure()
+atexit.register(flush)
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+EPUB本文の正規化モジュール
+
+soup.get_text() のままだとルビ（<rt>/<rp>）の読みが本文に混ざり、注記付きの語が
+「漢字\\nかんじ」のように二重に出力される。インライン要素の境目やHTMLソースの折り返しでも
+余計な改行・空白が入るため、そのままGeminiに送るとトークンを無駄に消費する
+
+このモジュールは以下を行い、内容を変えずに文字数（≒トークン数）を減らす
+- ルビの読み・括弧（<rt>/<rp>/<rtc>）と script/style を除去
+- ruby・span などのインライン要素を展開し、段落内の不要な改行を除去
+- NFKC正規化（全角英数→半角、半角カナ→全角など。…‥ は文末記号として残す）
+- 空白の連続を1つに、空行の連続を1つにまとめる
+
+epub_structure（book_analyzer / epub_parser の extract_text_from_epub）から使う
+"""
+
+import re
+import unicodedata
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from bs4 import BeautifulSoup
+
+# 読みとして除去する要素（本文ではないもの）
+DROP_TAGS = ('rt', 'rp', 'rtc', 'script', 'style')
+
+# 展開する（前後に改行を入れない）インライン要素
+INLINE_TAGS = (
+    'a', 'abbr', 'b', 'bdi', 'bdo', 'cite', 'code', 'em', 'font', 'i', 'kbd', 'mark', 'q',
+    'rb', 'ruby', 's', 'samp', 'small', 'span', 'strong', 'sub', 'sup', 'tt', 'u', 'var',
+)
+
+# 日本語の文字（この間の改行はHTMLソースの折り返しなので詰める）
+_CJK = '[\u3000-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff00-\uffef]'
+_CJK_WRAP = re.compile(rf'(?<={_CJK})[ \t\r\f\v]*\n\s*(?={_CJK})')
+_SPACES = re.compile(r'\s+')
+_LINE_SPACES = re.compile(r'[^\S\n]+')
+_BLANK_LINES = re.compile(r'\n{3,}')
+
+# NFKC で "..." に分解させない文字（文分割・読み上げ時間の推定で文末として扱う）
+_NFKC_KEEP = re.compile(r'([…‥])')
+
+# html_to_sections() で区切り位置に挿入する目印（私用領域の文字なので本文とは衝突しない）
+_SECTION_MARK = '\ue000'
+_SECTION_SPLIT = re.compile(rf'\s*{_SECTION_MARK}(\d+){_SECTION_MARK}\s*')
+
+# トークン数の推定: 日本語はおおむね1文字1トークン、それ以外は4文字1トークン
+_CJK_CHAR = re.compile(_CJK)
+
+
+def normalize_text(text: str) -> str:
+    """
+    抽出済みテキストを正規化（NFKC・空白の圧縮）
+
+    段落の区切り（改行）は残し、空行は1行までにまとめる
+    """
+    text = ''.join(
+        part if _NFKC_KEEP.fullmatch(part) else unicodedata.normalize('NFKC', part)
+        for part in _NFKC_KEEP.split(text)
+    )
+    text = _LINE_SPACES.sub(' ', text)
+    lines = [line.strip() for line in text.split('\n')]
+    return _BLANK_LINES.sub('\n\n', '\n'.join(lines)).strip()
+
+
+def _collapse_inline_whitespace(text: str) -> str:
+    """テキストノード内の空白を圧縮（日本語の間の折り返しは詰め、それ以外は空白1つにする）"""
+    return _SPACES.sub(' ', _CJK_WRAP.sub('', text))
+
+
+def _parse(html: Union[str, bytes], stats: Optional[Dict[str, int]]) -> BeautifulSoup:
+    """HTMLをパース（stats があれば正規化前の文字数を集計）"""
+    soup = BeautifulSoup(html, 'html.parser')
+    if stats is not None:
+        raw = soup.get_text(separator='\n', strip=True)
+        _add(stats, 'raw_chars', len(raw))
+        _add(stats, 'raw_tokens', estimate_tokens(raw))
+    return soup
+
+
+def _soup_to_text(soup: BeautifulSoup) -> str:
+    """ルビ除去・インライン要素の展開・空白圧縮をして本文を取り出す"""
+    for tag in soup.find_all(DROP_TAGS):
+        tag.decompose()
+    for tag in soup.find_all(INLINE_TAGS):
+        tag.unwrap()
+    soup.smooth()
+
+    for node in soup.find_all(string=True):
+        collapsed = _collapse_inline_whitespace(node)
+        if collapsed != node:
+            node.replace_with(collapsed)
+
+    return normalize_text(soup.get_text(separator='\n', strip=True))
+
+
+def _count(stats: Optional[Dict[str, int]], text: str) -> None:
+    if stats is not None:
+        _add(stats, 'chars', len(text))
+        _add(stats, 'tokens', estimate_tokens(text))
+
+
+def html_to_text(html: Union[str, bytes], stats: Optional[Dict[str, int]] = None) -> str:
+    """
+    XHTML文書から正規化済みの本文を抽出
+
+    Args:
+        html: XHTMLの内容
+        stats: 指定した場合、正規化前後の文字数・推定トークン数を加算する
+            （raw_chars / chars / raw_tokens / tokens）
+
+    Returns:
+        ブロック要素ごとに改行で区切った本文
+    """
+    text = _soup_to_text(_parse(html, stats))
+    _count(stats, text)
+    return text
+
+
+def html_to_sections(
+    html: Union[str, bytes],
+    anchor_ids: List[str],
+    stats: Optional[Dict[str, int]] = None
+) -> List[Tuple[Optional[str], str]]:
+    """
+    XHTML文書を指定したid（目次のリンク先）の位置で区切って本文を抽出
+
+    Args:
+        html: XHTMLの内容
+        anchor_ids: 区切り位置とする要素のid（文書内の順序は問わない）
+        stats: html_to_text() と同じ集計用の辞書
+
+    Returns:
+        [(id, 本文), ...]（最初のidより前の部分は id=None。見つからないidは含まない）
+    """
+    soup = _parse(html, stats)
+    for i, anchor in enumerate(anchor_ids):
+        element = soup.find(id=anchor)
+        if element is not None:
+            element.insert_before(f'{_SECTION_MARK}{i}{_SECTION_MARK}')
+
+    parts = _SECTION_SPLIT.split(_soup_to_text(soup))
+    sections = [(None, parts[0].strip())]
+    for index, text in zip(parts[1::2], parts[2::2]):
+        sections.append((anchor_ids[int(index)], text.strip()))
+
+    for _, text in sections:
+        _count(stats, text)
+    return sections
+
+
+def estimate_tokens(text: str) -> int:
+    """トークン数の概算（APIを呼ばずに削減量を見積もるため）"""
+    cjk = len(_CJK_CHAR.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def reduction_report(stats: Dict[str, int]) -> Dict[str, Any]:
+    """
+    html_to_text() で集計した stats から削減量をまとめる
+
+    Returns:
+        raw_chars / chars / raw_tokens / tokens に加え、
+        chars_removed / tokens_removed / char_reduction / token_reduction（0〜1）
+    """
+    raw_chars = stats.get('raw_chars', 0)
+    raw_tokens = stats.get('raw_tokens', 0)
+    chars = stats.get('chars', 0)
+    tokens = stats.get('tokens', 0)
+    return {
+        'raw_chars': raw_chars,
+        'chars': chars,
+        'raw_tokens': raw_tokens,
+        'tokens': tokens,
+        'chars_removed': raw_chars - chars,
+        'tokens_removed': raw_tokens - tokens,
+        'char_reduction': round(1 - chars / raw_chars, 4) if raw_chars else 0.0,
+        'token_reduction': round(1 - tokens / raw_tokens, 4) if raw_tokens else 0.0,
+    }
+
+
+def _add(stats: Dict[str, int], key: str, value: int) -> None:
+    stats[key] = stats.get(key, 0) + value
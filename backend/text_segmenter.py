@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+日本語の文分割モジュール
+
+。！？…や ASCII の .!? を文末として、かぎ括弧・丸括弧などの入れ子の内側では分割しない
+正規表現1つで区切り候補だけを走査する1パス処理なので、書籍全体でも高速に動く
+
+シーン分割（scene_splitter_sora2）とチャンク分割（book_analyzer / summary_generator）で共用する
+"""
+
+import re
+from typing import Iterator, List, Tuple
+
+# 開き括弧 → 閉じ括弧
+_BRACKETS = {
+    '「': '」', '『': '』', '（': '）', '(': ')', '【': '】',
+    '〈': '〉', '《': '》', '〔': '〕', '［': '］', '“': '”', '‘': '’',
+}
+_CLOSERS = set(_BRACKETS.values())
+
+# 区切り候補: 括弧 / 文末記号の連続（！？や…… など） / 後ろが空白・行末のASCIIピリオド / 改行
+_TOKEN = re.compile(
+    r'(?P<open>[「『（(【〈《〔［“‘])'
+    r'|(?P<close>[」』）)】〉》〕］”’])'
+    r'|(?P<end>[。！？!?…‥]+|\.+(?=\s|$))'
+    r'|(?P<newline>\n)'
+)
+
+
+def iter_sentence_spans(text: str) -> Iterator[Tuple[int, int]]:
+    """
+    文の (開始位置, 終了位置) を順に返す（前後の空白は含まない）
+
+    - 括弧の内側の文末記号では分割しない（「行こう。」と言った。→ 1文）
+    - 文末記号の直後の閉じ括弧は文に含める（「行こう。」→ 閉じ括弧まで1文）
+    - 改行は段落の区切りとして必ず分割し、閉じ忘れの括弧もリセットする
+    """
+    start = 0
+    depth = 0
+    # 直前のトークンが文末記号だったか（閉じ括弧で括弧の外に出たときの判定に使う）
+    after_end = False
+
+    for match in _TOKEN.finditer(text):
+        kind = match.lastgroup
+        cut = None
+
+        if kind == 'open':
+            depth += 1
+        elif kind == 'close':
+            if depth > 0:
+                depth -= 1
+            # 「……。」の直後が行末・次の括弧の場合は、閉じ括弧までで1文
+            if depth == 0 and after_end:
+                following = text[match.end():match.end() + 1]
+                if not following or following.isspace() or following in _BRACKETS:
+                    cut = match.end()
+        elif kind == 'end':
+            if depth == 0:
+                cut = match.end()
+                # 文末記号に続く対応のない閉じ括弧も文に含める
+                while cut < len(text) and text[cut] in _CLOSERS:
+                    cut += 1
+        else:
+            depth = 0
+            cut = match.start()
+
+        after_end = kind == 'end'
+
+        if cut is not None and cut > start:
+            span = _strip_span(text, start, cut)
+            if span:
+                yield span
+            start = cut
+
+    span = _strip_span(text, start, len(text))
+    if span:
+        yield span
+
+
+def _strip_span(text: str, start: int, end: int):
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return (start, end) if start < end else None
+
+
+def split_sentences(text: str) -> List[str]:
+    """テキストを文のリストに分割"""
+    return [text[start:end] for start, end in iter_sentence_spans(text)]
+
+
+def split_to_fit(text: str, max_chars: int) -> List[str]:
+    """
+    テキストを文の区切りでまとめ直し、各部分がmax_chars以内になるように分割
+
+    1文だけでmax_charsを超える場合は、その文を文字数で区切る
+
+    Args:
+        text: 分割するテキスト（段落など）
+        max_chars: 1部分あたりの最大文字数
+
+    Returns:
+        分割後のテキストのリスト
+    """
+    if len(text) <= max_chars:
+        return [text]
+
+    parts = []
+    current_start = None
+    current_end = 0
+
+    for start, end in iter_sentence_spans(text):
+        if current_start is not None and end - current_start > max_chars:
+            parts.append(text[current_start:current_end])
+            current_start = None
+
+        if current_start is None:
+            # 1文だけで上限を超える場合は文字数で区切る
+            while end - start > max_chars:
+                parts.append(text[start:start + max_chars])
+                start += max_chars
+            current_start = start
+
+        current_end = end
+
+    if current_start is not None:
+        parts.append(text[current_start:current_end])
+
+    return parts
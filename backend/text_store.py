@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+ディスク上のテキストストア（メモリマップ）
+
+書籍本文・チャンク・チャンクまとめのようなテキストの列を、1つのUTF-8ファイルと
+各要素のバイト位置のインデックス（<ファイル名>.idx.json）に保存する
+TextStore はパスとインデックスだけを持ち、要素を読むときに初めてファイルを mmap して
+その範囲だけをデコードするため、書籍が大きくてもプロセス・セッションのメモリはほぼ増えない
+
+テキストファイルは要素を separator（既定は空行）でつないだものなので、そのまま本文として読める
+
+ファイル名は <prefix>.<内容のハッシュ>.txt（本文とインデックスから作る）
+同じ名前のファイルは常に同じ内容なので、複数のセッション・プロセスが同じ書籍を同時に分析しても
+別の実行の内容で上書きされず、セッションに保持したパスは常にその実行の内容を指す
+内容が変わるたびにファイルが増えるため、書き出した側が処理の完了後に prune() で古いストアを削除する
+
+使い方:
+    from . import text_store
+
+    store = text_store.write(output_dir, book_name, (chapter['text'] for chapter in chapters))
+    len(store), store[3], store.chars(3), store.char_count, store.head(500)
+
+    # セッション状態などにはパス（文字列）だけを保持し、表示するときに開く
+    for text in text_store.load(path):
+        ...
+"""
+
+import glob
+import hashlib
+import json
+import mmap
+import os
+import re
+import tempfile
+import time
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from .utils import get_project_root, load_json, match_file_mode, save_json
+
+# インデックスファイルの拡張子（テキストファイル名に付ける）
+INDEX_SUFFIX = ".idx.json"
+
+# prune() で残す期間（秒）。別のセッションが表示中・分析中のストアを消さないように、最近のものは残す
+MAX_AGE_SECONDS = float(os.getenv('TEXT_STORE_MAX_AGE_HOURS', '24')) * 3600
+
+
+def get_store_dir() -> Path:
+    """チャンク・チャンクまとめのストアの保存先"""
+    return get_project_root() / "data" / "internal" / "text_store"
+
+
+def index_path(path: Path) -> Path:
+    """テキストファイルに対応するインデックスファイル"""
+    path = Path(path)
+    return path.with_name(path.name + INDEX_SUFFIX)
+
+
+class TextStore(Sequence):
+    """
+    テキストの列への遅延ハンドル（添字・len・イテレーションで文字列を読み出す）
+
+    mmap は最初の読み出しで開き、close() で閉じる（pickle・コピーではパスとインデックスだけが渡る）
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        index = load_json(index_path(self.path))
+        self._offsets: List[List[int]] = index['offsets']
+        self._chars: List[int] = index['chars']
+        self._size: int = index['size']
+        self.char_count: int = index['char_count']
+        self._file = None
+        self._mmap: Optional[mmap.mmap] = None
+
+    def _buffer(self):
+        if self._mmap is None:
+            size = self.path.stat().st_size
+            if size != self._size:
+                raise ValueError(f"テキストストアのインデックスが本文と一致しません: {self.path}")
+            if size == 0:
+                return b''
+            self._file = open(self.path, 'rb')
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mmap
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        start, end = self._offsets[index]
+        return self._buffer()[start:end].decode('utf-8')
+
+    def select(self, indices: Iterable[int]) -> 'Selection':
+        """指定した要素だけの遅延ビュー"""
+        return Selection(self, list(indices))
+
+    def chars(self, index: int) -> int:
+        """要素の文字数（読み出さずにインデックスから返す）"""
+        return self._chars[index]
+
+    def head(self, chars: int) -> str:
+        """先頭から chars 文字（途中で切れたマルチバイト文字は捨てる）"""
+        return self._buffer()[:chars * 4].decode('utf-8', errors='ignore')[:chars]
+
+    def read(self) -> str:
+        """テキストファイル全体（長文コンテキスト分析など、全文が必要な場合のみ使う）"""
+        return self._buffer()[:].decode('utf-8')
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+            self._file.close()
+            self._mmap = None
+            self._file = None
+
+    def __enter__(self) -> 'TextStore':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.close()
+        return False
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_file'] = None
+        state['_mmap'] = None
+        return state
+
+
+class Selection(Sequence):
+    """TextStore の一部の要素への遅延ビュー"""
+
+    def __init__(self, store: TextStore, indices: List[int]):
+        self.store = store
+        self.indices = indices
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.store[i] for i in self.indices[index]]
+        return self.store[self.indices[index]]
+
+
+def write(directory: Path, prefix: str, pieces: Iterable[str], separator: str = "\n\n") -> TextStore:
+    """
+    テキストの列を書き出してストアを作る（1要素ずつ書くため、全文を結合した文字列は作らない）
+
+    テキストは一時ファイルに書き、内容のハッシュからファイル名を決める
+    インデックスを先に保存してからテキストファイルを置き換えるため、インデックスを読めたストアは
+    常に本文と一致する（テキストの置き換え前に落ちた場合は、開くときにサイズの不一致で検出する）
+
+    Args:
+        directory: 保存先ディレクトリ
+        prefix: ファイル名の先頭（書籍名など）
+        pieces: 書き出すテキスト
+        separator: 要素間の区切り
+
+    Returns:
+        作成したストア（path は directory / "<prefix>.<ハッシュ>.txt"）
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    sep = separator.encode('utf-8')
+    offsets: List[List[int]] = []
+    chars: List[int] = []
+    position = 0
+    digest = hashlib.sha256()
+
+    fd, tmp_name = tempfile.mkstemp(dir=directory, prefix=f".{prefix}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            for i, piece in enumerate(pieces):
+                if i:
+                    f.write(sep)
+                    digest.update(sep)
+                    position += len(sep)
+                data = piece.encode('utf-8')
+                f.write(data)
+                digest.update(data)
+                offsets.append([position, position + len(data)])
+                chars.append(len(piece))
+                position += len(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+        char_count = sum(chars) + len(separator) * max(len(chars) - 1, 0)
+        index = {'offsets': offsets, 'chars': chars, 'size': position, 'char_count': char_count}
+        # 同じ本文でも区切り方が違えば別のストアにする
+        digest.update(json.dumps(offsets).encode('utf-8'))
+        path = directory / f"{prefix}.{digest.hexdigest()[:16]}.txt"
+
+        save_json(index_path(path), index, indent=None)
+        match_file_mode(tmp_name, path)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+    return TextStore(path)
+
+
+def remove(path: Path) -> None:
+    """ストア（テキストファイルとインデックス）を削除"""
+    Path(path).unlink(missing_ok=True)
+    index_path(path).unlink(missing_ok=True)
+
+
+def prune(directory: Path, prefix: str, keep: Iterable[Path] = (), max_age: Optional[float] = None) -> int:
+    """
+    同じ prefix の古いストアを削除（書き出した処理が完了した後に呼ぶ）
+
+    Args:
+        directory: ストアの保存先ディレクトリ
+        prefix: write() に渡したファイル名の先頭（"<prefix>.<ハッシュ>.txt" だけが対象）
+        keep: 残すストアのパス（今回の実行で作ったもの）
+        max_age: 更新からこの秒数以内のストアは残す（Noneの場合は MAX_AGE_SECONDS）
+
+    Returns:
+        削除したストア数
+    """
+    max_age = MAX_AGE_SECONDS if max_age is None else max_age
+    cutoff = time.time() - max_age
+    name_pattern = re.compile(re.escape(prefix) + r'\.[0-9a-f]{16}\.txt')
+    keep = {Path(path).resolve() for path in keep}
+
+    removed = 0
+    for path in Path(directory).glob(f"{glob.escape(prefix)}.*.txt"):
+        # "<prefix>.chunks.<ハッシュ>.txt" や、prefix で始まる別の書籍のストアは対象外
+        if not name_pattern.fullmatch(path.name) or path.resolve() in keep:
+            continue
+        try:
+            if path.stat().st_mtime > cutoff:
+                continue
+        except FileNotFoundError:
+            continue
+        remove(path)
+        removed += 1
+    return removed
+
+
+def clear() -> int:
+    """
+    get_store_dir() のストアをすべて削除（内容ごとにファイルが作られるため、不要になったら掃除する）
+
+    Returns:
+        削除したストア数
+    """
+    paths = list(get_store_dir().glob("*.txt"))
+    for path in paths:
+        remove(path)
+    return len(paths)
+
+
+def load(path: Path) -> TextStore:
+    """既存のストアを開く（インデックスだけを読み、本文は読み出すときに mmap する）"""
+    return TextStore(path)
@@ -3,7 +3,10 @@
 共通ユーティリティ関数
 """
 
+import os
+import stat
 import subprocess
+import tempfile
 from pathlib import Path
 from typing import Tuple, Optional
 import json
@@ -57,10 +60,49 @@ def load_json(file_path: Path) -> dict:
 
 
 def save_json(file_path: Path, data: dict, indent: int = 2):
-    """JSONファイルに保存"""
+    """JSONファイルに保存（一時ファイルに書いてから置き換えるため、書きかけの状態が残らない）"""
+    atomic_write_text(file_path, json.dumps(data, ensure_ascii=False, indent=indent))
+
+
+def _current_umask() -> int:
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+# プロセスのumask（起動時に1回だけ読む。os.umask は読むだけでも一時的に書き換えるため）
+_UMASK = _current_umask()
+
+
+def match_file_mode(tmp_path: Path, file_path: Path):
+    """
+    一時ファイルの権限を置き換え先に合わせる
+
+    tempfile.mkstemp は 0600 でファイルを作るため、そのまま置き換えると他のユーザー・グループから
+    読めなくなる。既存のファイルがあればその権限、なければ通常の作成と同じ 0666 & ~umask にする
+    """
+    try:
+        mode = stat.S_IMODE(os.stat(file_path).st_mode)
+    except FileNotFoundError:
+        mode = 0o666 & ~_UMASK
+    os.chmod(tmp_path, mode)
+
+
+def atomic_write_text(file_path: Path, text: str):
+    """同じディレクトリの一時ファイルに書き込み、os.replaceで置き換える（権限は match_file_mode を参照）"""
+    file_path = Path(file_path)
     file_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(file_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=indent)
+    fd, tmp_name = tempfile.mkstemp(dir=file_path.parent, prefix=f".{file_path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        match_file_mode(tmp_name, file_path)
+        os.replace(tmp_name, file_path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
 
 
 def ensure_dir(path: Path) -> Path:
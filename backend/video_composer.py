@@ -13,6 +13,8 @@ import tempfile
 import subprocess
 import shutil
 
+from . import telemetry
+
 try:
     from moviepy.editor import VideoFileClip, concatenate_videoclips
     MOVIEPY_AVAILABLE = True
@@ -67,7 +69,8 @@ def _concatenate_with_ffmpeg(video_files: List[Path], output_file: Path) -> Path
             str(output_file)
         ]
 
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        with telemetry.span("ffmpeg.concat", num_files=len(video_files)):
+            result = subprocess.run(cmd, capture_output=True, text=True)
 
         if result.returncode != 0:
             raise RuntimeError(f"ffmpeg failed: {result.stderr}")
@@ -134,16 +137,17 @@ def concatenate_videos(
             temp_audio = Path(tempfile.gettempdir()) / f"temp-audio-{int(time.time())}.m4a"
 
             # 出力
-            final_clip.write_videofile(
-                str(output_file),
-                codec='libx264',
-                audio_codec='aac',
-                temp_audiofile=str(temp_audio),
-                remove_temp=True,
-                logger=None,  # ログ出力を抑制
-                verbose=False,
-                threads=4
-            )
+            with telemetry.span("moviepy.write_videofile", num_files=len(video_files)):
+                final_clip.write_videofile(
+                    str(output_file),
+                    codec='libx264',
+                    audio_codec='aac',
+                    temp_audiofile=str(temp_audio),
+                    remove_temp=True,
+                    logger=None,  # ログ出力を抑制
+                    verbose=False,
+                    threads=4
+                )
 
             # クリーンアップ
             for clip in clips:
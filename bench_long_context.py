@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+長文コンテキスト分析とチャンク分析（map-reduce）の比較
+
+各EPUBを analyze_book の mode="auto"（入力上限に収まれば全文を1回で送る）と mode="full" で分析し、
+処理時間・使用トークン・Gemini API呼び出し回数・概要の一致度（文字bigramのコサイン類似度）を表示する
+
+※ Gemini APIを実際に呼ぶ（full は書籍の長さに比例して呼び出し回数が増える）
+※ 比較のため差分キャッシュは使わない（--use-cache で有効化）
+※ 入力上限に収まらない書籍では auto も full と同じ処理になる
+
+使い方:
+  python bench_long_context.py data/raw/本1.epub data/raw/本2.epub
+  python bench_long_context.py data/raw/*.epub --out long_context.json
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import google.generativeai as genai
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, str(Path(__file__).parent))
+from backend import book_analyzer, chunk_sampler
+from backend.utils import save_json
+
+# generate_content の呼び出し回数（計測用に GenerativeModel をラップして数える）
+_calls = 0
+_generate_content = genai.GenerativeModel.generate_content
+
+
+def _counting_generate_content(self, *args, **kwargs):
+    global _calls
+    _calls += 1
+    return _generate_content(self, *args, **kwargs)
+
+
+genai.GenerativeModel.generate_content = _counting_generate_content
+
+
+def run(epub_path: Path, output_dir: Path, mode: str, use_cache: bool) -> dict:
+    global _calls
+    _calls = 0
+    start = time.perf_counter()
+    result = book_analyzer.analyze_book(epub_path, output_dir, mode=mode, use_cache=use_cache)
+    result['elapsed_seconds'] = round(time.perf_counter() - start, 1)
+    result['calls'] = _calls
+    return result
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="長文コンテキスト分析とチャンク分析の比較")
+    ap.add_argument("epubs", nargs="+", help="EPUBファイル")
+    ap.add_argument("--use-cache", action="store_true", help="差分キャッシュを使う")
+    ap.add_argument("--out", help="比較結果を保存するJSONファイル")
+    args = ap.parse_args()
+
+    epub_paths = [Path(p) for p in args.epubs]
+    missing = [p for p in epub_paths if not p.exists()]
+    if missing:
+        print(f"✗ ファイルが見つかりません: {', '.join(map(str, missing))}")
+        return 2
+    output_dir = Path("data/raw")
+
+    rows = []
+    for epub_path in epub_paths:
+        auto = run(epub_path, output_dir, "auto", args.use_cache)
+        full = run(epub_path, output_dir, "full", args.use_cache)
+        similarity = chunk_sampler.text_similarity(auto['summary'], full['summary'])
+        rows.append({
+            "book_name": full['book_name'],
+            "character_count": full['character_count'],
+            "num_chunks": full['num_chunks'],
+            "context_tokens": auto['context_tokens'],
+            "auto_mode": auto['analysis_mode'],
+            "summary_similarity": round(similarity, 4) if similarity is not None else None,
+            **{
+                f"{name}_{k}": result[k]
+                for name, result in (("auto", auto), ("full", full))
+                for k in ("elapsed_seconds", "tokens_used", "calls")
+            },
+        })
+
+    print("\n=== 比較 ===")
+    print(f"{'書籍':<20} {'auto':<12} {'時間(秒)':>16} {'トークン':>22} {'呼び出し':>12} {'類似度':>7}")
+    for row in rows:
+        similarity = f"{row['summary_similarity']:.3f}" if row['summary_similarity'] is not None else "-"
+        print(
+            f"{row['book_name'][:20]:<20} {row['auto_mode']:<12}"
+            f" {row['auto_elapsed_seconds']:>7} / {row['full_elapsed_seconds']:>6}"
+            f" {row['auto_tokens_used']:>10,} / {row['full_tokens_used']:>9,}"
+            f" {row['auto_calls']:>5} / {row['full_calls']:>4}"
+            f" {similarity:>7}"
+        )
+    print("（各列は auto / full）")
+
+    if args.out:
+        save_json(Path(args.out), {"books": rows})
+        print(f"\n📄 比較結果: {args.out}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Geminiモデル取得のベンチマーク
+
+呼び出しごとに genai.configure() + GenerativeModel() を行う旧方式と、
+gemini_client のレジストリから取得する方式の1回あたりのオーバーヘッドを比較する
+
+--live を付けると実際に generate_content を呼び、接続の使い回しによる
+2回目以降のレイテンシの差も計測する（GOOGLE_API_KEY が必要、APIを消費）
+
+使い方:
+  python bench_model_registry.py
+  python bench_model_registry.py --live --calls 5
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import google.generativeai as genai
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, str(Path(__file__).parent))
+from backend import gemini_client
+
+PROMPT = "「本」を一言で説明してください。"
+
+
+def legacy_get_model():
+    """旧方式: 呼び出しごとに設定・モデル作成"""
+    genai.configure(api_key=os.environ["GOOGLE_API_KEY"])
+    return genai.GenerativeModel(gemini_client.DEFAULT_MODEL)
+
+
+def bench_overhead(name: str, get_model, iterations: int) -> float:
+    get_model()  # ウォームアップ
+    start = time.perf_counter()
+    for _ in range(iterations):
+        get_model()
+    per_call = (time.perf_counter() - start) / iterations
+    print(f"{name:<12} {per_call * 1_000_000:>10.1f} µs/回")
+    return per_call
+
+
+def bench_live(name: str, get_model, calls: int) -> None:
+    latencies = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        get_model().generate_content(PROMPT)
+        latencies.append(time.perf_counter() - start)
+    rest = latencies[1:] or latencies
+    print(f"{name:<12} 初回 {latencies[0]:.2f}秒 / 2回目以降の平均 {sum(rest) / len(rest):.2f}秒")
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Geminiモデル取得のベンチマーク")
+    ap.add_argument("--iterations", type=int, default=2000, help="オーバーヘッド計測の反復回数")
+    ap.add_argument("--live", action="store_true", help="実際にAPIを呼んでレイテンシを計測")
+    ap.add_argument("--calls", type=int, default=3, help="--live 時の呼び出し回数")
+    args = ap.parse_args()
+
+    # オーバーヘッド計測のみの場合はダミーのキーで十分（通信しない）
+    os.environ.setdefault("GOOGLE_API_KEY", "dummy-key-for-benchmark")
+
+    print("=== モデル取得のオーバーヘッド ===")
+    legacy = bench_overhead("legacy", legacy_get_model, args.iterations)
+    registry = bench_overhead("registry", gemini_client.get_model, args.iterations)
+    print(f"→ 1回あたり {(legacy - registry) * 1_000_000:.1f} µs 削減（{legacy / registry:.0f}倍）")
+
+    if args.live:
+        print("\n=== generate_content のレイテンシ ===")
+        bench_live("legacy", legacy_get_model, args.calls)
+        gemini_client.get_registry().clear()
+        bench_live("registry", gemini_client.get_model, args.calls)
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+サンプル分析と全体分析の比較
+
+同じEPUBを analyze_book の mode="sampled" と mode="full" で分析し、
+処理時間・まとめたチャンク数・使用トークン・概要の一致度（文字bigramのコサイン類似度、
+主要トピックの重なり）を表示する
+
+※ Gemini APIを実際に呼ぶ（full は書籍の長さに比例して呼び出し回数が増える）
+※ 比較のため差分キャッシュは使わない（--use-cache で有効化）
+
+使い方:
+  python bench_sampled_analysis.py data/raw/本.epub
+  python bench_sampled_analysis.py data/raw/本.epub --sample-size 5 --out comparison.json
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, str(Path(__file__).parent))
+from backend import book_analyzer, chunk_sampler, text_store
+from backend.utils import save_json
+
+
+def run(epub_path: Path, output_dir: Path, mode: str, sample_size: int, use_cache: bool) -> dict:
+    start = time.perf_counter()
+    result = book_analyzer.analyze_book(
+        epub_path, output_dir, mode=mode, sample_size=sample_size, use_cache=use_cache
+    )
+    result['elapsed_seconds'] = round(time.perf_counter() - start, 1)
+    return result
+
+
+def topic_overlap(a: list, b: list) -> float:
+    """主要トピックの重なり（Jaccard）"""
+    a, b = set(a or []), set(b or [])
+    return len(a & b) / len(a | b) if a | b else 0.0
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="サンプル分析と全体分析の比較")
+    ap.add_argument("epub", help="EPUBファイル")
+    ap.add_argument("--sample-size", type=int, default=chunk_sampler.SAMPLE_SIZE, help="sampled でまとめるチャンク数")
+    ap.add_argument("--use-cache", action="store_true", help="差分キャッシュを使う")
+    ap.add_argument("--out", help="比較結果を保存するJSONファイル")
+    args = ap.parse_args()
+
+    epub_path = Path(args.epub)
+    if not epub_path.exists():
+        print(f"✗ ファイルが見つかりません: {epub_path}")
+        return 2
+    output_dir = Path("data/raw")
+
+    sampled = run(epub_path, output_dir, "sampled", args.sample_size, args.use_cache)
+    full = run(epub_path, output_dir, "full", args.sample_size, args.use_cache)
+
+    print("\n=== 比較 ===")
+    print(f"{'':<10} {'時間(秒)':>10} {'まとめ数':>8} {'トークン':>10}")
+    for name, result in (("sampled", sampled), ("full", full)):
+        summaries = len(text_store.load(result['chunk_summary_store']))
+        print(f"{name:<10} {result['elapsed_seconds']:>10} {summaries:>8} {result['tokens_used']:>10,}")
+
+    similarity = chunk_sampler.text_similarity(sampled['summary'], full['summary'])
+    overlap = topic_overlap(sampled.get('main_topics'), full.get('main_topics'))
+    if similarity is not None:
+        print(f"\n概要の類似度（bigramコサイン）: {similarity:.3f}")
+    print(f"主要トピックの重なり（Jaccard）: {overlap:.2f}")
+    print(f"\n--- sampled ---\n{sampled['summary']}\n\n--- full ---\n{full['summary']}")
+
+    if args.out:
+        save_json(Path(args.out), {
+            "book_name": full['book_name'],
+            "num_chunks": full['num_chunks'],
+            "sample_size": args.sample_size,
+            "sampled_chunks": sampled['sampled_chunks'],
+            "summary_similarity": round(similarity, 4) if similarity is not None else None,
+            "topic_overlap": round(overlap, 4),
+            "sampled": {k: sampled.get(k) for k in ("elapsed_seconds", "tokens_used", "summary", "main_topics")},
+            "full": {k: full.get(k) for k in ("elapsed_seconds", "tokens_used", "summary", "main_topics")},
+        })
+        print(f"\n📄 比較結果: {args.out}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -12,7 +12,8 @@ import sys
 # backend モジュールのパスを追加
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from backend import book_analyzer
+from backend import book_analyzer, gemini_client, chunk_sampler, text_store, background_task
+from backend.cancellation import OperationCancelled
 
 st.set_page_config(
     page_title="1️⃣ EPUBアップロード＆概要抽出",
@@ -20,6 +21,36 @@ st.set_page_config(
     layout="wide"
 )
 
+# Geminiのモデルを作成しておき、最初の生成時の初期化を省く（レジストリは全セッションで共有）
+gemini_client.warm_up()
+
+
+@st.fragment(run_every=1)
+def show_analysis_progress(task):
+    """実行中の書籍分析の進捗とキャンセルボタン（1秒ごとにこの部分だけ再実行）"""
+    if task.finished or task.cancelled:
+        # 完了したらページ全体を再実行して結果を表示する
+        st.rerun()
+
+    event = task.progress
+    if event is None:
+        st.markdown('<div class="process-step">分析を開始しています...</div>', unsafe_allow_html=True)
+        st.progress(0.0)
+    else:
+        stage_label = f"Step {event['stage_index']}/{event['total_stages']}: {event['stage']}"
+        if event['stage_index'] == 3 and event['chunks_total']:
+            stage_label += f"（{event['chunks_done']}/{event['chunks_total']}チャンク）"
+        st.markdown(f'<div class="process-step">{stage_label}</div>', unsafe_allow_html=True)
+        st.progress(event['progress'])
+
+        stats = f"🔢 使用トークン: {event['tokens_used']:,} | ⏱️ 経過: {event['elapsed_seconds']:.0f}秒"
+        if event['eta_seconds'] is not None and not event['done']:
+            stats += f" | 残り約{event['eta_seconds']:.0f}秒"
+        st.caption(stats)
+
+    st.button("⏹️ 分析をキャンセル", on_click=task.cancel, use_container_width=True)
+
+
 # カスタムCSS
 st.markdown("""
 <style>
@@ -89,54 +120,75 @@ with col_left:
             st.success(f"✅ {uploaded_file.name}")
             st.info(f"📊 サイズ: {uploaded_file.size / 1024:.1f} KB")
 
-            # 解析＆概要生成ボタン
-            if st.button("🚀 解析して概要を生成", type="primary", use_container_width=True):
-
-                progress_placeholder = st.empty()
-                status_placeholder = st.empty()
-
+            analysis_mode = st.radio(
+                "分析モード",
+                options=list(book_analyzer.ANALYSIS_MODES),
+                format_func=lambda m: {
+                    "auto": "📖 自動（収まれば全文を1回で分析）",
+                    "full": "📚 全体（すべてのチャンクをまとめる）",
+                    "sampled": "⚡ サンプル（高速プレビュー）"
+                }[m],
+                horizontal=True,
+                help="自動は本文全体がモデルの入力上限に収まる場合に1回のAPI呼び出しで概要を作成し、収まらない場合は全体と同じ処理になります。"
+                     "サンプルは代表的なチャンクだけをまとめるため、書籍の長さに関わらず数回のAPI呼び出しで概要を作成します"
+            )
+            sample_size = chunk_sampler.SAMPLE_SIZE
+            if analysis_mode == "sampled":
+                sample_size = st.slider("まとめるチャンク数", min_value=3, max_value=20, value=sample_size)
+
+            use_cache = st.checkbox(
+                "♻️ 前回の分析結果を再利用",
+                value=True,
+                help="同じファイル名の書籍を分析済みの場合、内容が変わったチャンクだけを再分析します（訂正版の再アップロード向け）"
+            )
+
+            # 分析は別スレッドで実行し、セッション状態のタスクを再実行のたびに確認する
+            # （スクリプトが処理で止まらないため、キャンセルボタンが実行中に効く）
+            analysis_task = st.session_state.get('analysis_task')
+
+            if analysis_task is not None and (analysis_task.finished or analysis_task.cancelled):
+                del st.session_state.analysis_task
                 try:
-                    # EPUBファイルを保存
-                    output_dir = Path("data/raw")
-                    output_dir.mkdir(parents=True, exist_ok=True)
-
-                    epub_path = output_dir / uploaded_file.name
-                    with open(epub_path, 'wb') as f:
-                        f.write(uploaded_file.read())
-
-                    # プログレス表示用コンテナ
-                    progress_container = st.container()
-
-                    with progress_container:
-                        # Step 1: テキスト抽出
-                        st.markdown('<div class="process-step">📄 Step 1/4: テキスト抽出中...</div>', unsafe_allow_html=True)
-
-                        # Step 2: チャンク化（book_analyzer内で実行）
-                        st.markdown('<div class="process-step">🔍 Step 2/4: チャンク化中...</div>', unsafe_allow_html=True)
-
-                        # Step 3: チャンクまとめ（book_analyzer内で実行）
-                        st.markdown('<div class="process-step">📝 Step 3/4: 各チャンクをまとめ中...</div>', unsafe_allow_html=True)
-
-                        # Step 4: 全体概要生成（book_analyzer内で実行）
-                        st.markdown('<div class="process-step">✨ Step 4/4: 全体概要を生成中...</div>', unsafe_allow_html=True)
-
-                    # 新しいbook_analyzerを使用（チャンク化→チャンクまとめ→論文形式概要まで全自動）
-                    result = book_analyzer.analyze_book(epub_path, output_dir)
+                    result = analysis_task.result()
 
                     # セッション状態に保存
                     st.session_state.book_analysis = result
                     st.session_state.current_step = 2
 
-                    progress_placeholder.empty()
-                    status_placeholder.success("✅ 書籍分析が完了しました！")
+                    st.success("✅ 書籍分析が完了しました！")
                     st.balloons()
                     st.rerun()
 
+                except OperationCancelled:
+                    st.warning("⏹️ 書籍分析をキャンセルしました")
+
                 except Exception as e:
-                    progress_placeholder.empty()
-                    status_placeholder.error(f"❌ エラー: {str(e)}")
+                    st.error(f"❌ エラー: {str(e)}")
                     st.exception(e)
 
+            if analysis_task is not None and not (analysis_task.finished or analysis_task.cancelled):
+                show_analysis_progress(analysis_task)
+
+            # 解析＆概要生成ボタン
+            elif st.button("🚀 解析して概要を生成", type="primary", use_container_width=True):
+                # EPUBファイルを保存
+                output_dir = Path("data/raw")
+                output_dir.mkdir(parents=True, exist_ok=True)
+
+                epub_path = output_dir / uploaded_file.name
+                with open(epub_path, 'wb') as f:
+                    f.write(uploaded_file.read())
+
+                # 新しいbook_analyzerを使用（チャンク化→チャンクまとめ→論文形式概要まで全自動）
+                st.session_state.analysis_task = background_task.start(
+                    lambda task: book_analyzer.analyze_book(
+                        epub_path, output_dir, progress_callback=task.report, cancel_token=task.token,
+                        use_cache=use_cache, mode=analysis_mode, sample_size=sample_size
+                    ),
+                    name="analyze_book"
+                )
+                st.rerun()
+
         else:
             st.markdown("""
             **対応ファイル形式:**
@@ -176,8 +228,7 @@ with col_left:
                 'character_count': char_count,
                 'num_chunks': 1,
                 'book_type': '手動入力',
-                'main_topics': [],
-                'chunk_summaries': [book_text]
+                'main_topics': []
             }
             st.session_state.current_step = 2
 
@@ -204,6 +255,30 @@ with col_right:
         with col_c:
             st.metric("チャンク数", result['num_chunks'])
 
+        normalization = result.get('normalization')
+        if normalization and normalization['chars_removed'] > 0:
+            st.caption(
+                f"🧹 ルビ・空白の正規化: -{normalization['chars_removed']:,}文字（{normalization['char_reduction']:.1%}）"
+                f" / 推定-{normalization['tokens_removed']:,}トークン（{normalization['token_reduction']:.1%}）"
+            )
+
+        if result.get('analysis_mode') == 'long_context':
+            st.caption(f"📖 長文コンテキスト分析: 全文（{result['context_tokens']:,}トークン）を1回のリクエストで分析")
+        if result.get('analysis_mode') == 'sampled':
+            st.caption(f"⚡ サンプル分析: {len(result['sampled_chunks'])}/{result['num_chunks']} チャンクから概要を作成")
+        if result.get('resumed_chunks'):
+            st.caption(f"⏯️ 中断した分析から再開（{result['resumed_chunks']} チャンクのまとめは記録済み）")
+        if result.get('reused_chunks'):
+            st.caption(f"♻️ 前回の分析から {result['reused_chunks']}/{result['num_chunks']} チャンクのまとめを再利用")
+        if result.get('deduplicated_chunks'):
+            st.caption(f"🧬 近似重複の {result['deduplicated_chunks']} チャンクは代表のまとめを使い回し（API呼び出しを削減）")
+
+        excluded_documents = result.get('excluded_documents')
+        if excluded_documents:
+            with st.expander(f"⏭️ 本文以外として除外した文書（{len(excluded_documents)}件）"):
+                for doc in excluded_documents:
+                    st.caption(f"{doc['file']}: {doc['reason']}")
+
         st.markdown("---")
 
         # 論文形式の概要表示
@@ -229,12 +304,15 @@ with col_right:
             for topic in result['main_topics']:
                 st.write(f"- {topic}")
 
-        # チャンクまとめを表示（デバッグ・確認用）
-        with st.expander("🔍 チャンクまとめ（詳細）"):
-            for i, chunk_summary in enumerate(result['chunk_summaries']):
-                st.markdown(f"**チャンク{i+1}:**")
-                st.write(chunk_summary)
-                st.markdown("---")
+        # チャンクまとめを表示（デバッグ・確認用。セッションにはパスだけを保持し、表示時にファイルから読む）
+        summary_store = result.get('chunk_summary_store')
+        if summary_store and Path(summary_store).exists():
+            with st.expander("🔍 チャンクまとめ（詳細）"):
+                with text_store.load(summary_store) as chunk_summaries:
+                    for i, chunk_summary in enumerate(chunk_summaries):
+                        st.markdown(f"**チャンク{i+1}:**")
+                        st.write(chunk_summary)
+                        st.markdown("---")
 
         st.markdown("---")
 
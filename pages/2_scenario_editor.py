@@ -11,7 +11,7 @@ import sys
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from backend import scenario_generator_v2
+from backend import scenario_generator_v2, prompt_templates, gemini_client
 
 st.set_page_config(
     page_title="2️⃣ シナリオ編集",
@@ -19,6 +19,9 @@ st.set_page_config(
     layout="wide"
 )
 
+# Geminiのモデルを作成しておき、最初の生成時の初期化を省く（レジストリは全セッションで共有）
+gemini_client.warm_up()
+
 # カスタムCSS
 st.markdown("""
 <style>
@@ -191,12 +194,8 @@ if st.session_state.get('scenarios'):
     # ビジュアルスタイル選択
     st.markdown("### 🎨 ビジュアルスタイル")
 
-    visual_styles = [
-        "Photorealistic", "Picture book", "3D cartoon", "Retro comics",
-        "Anime", "Pixel art", "Cinematic", "Hyper cartoon",
-        "Illustration", "Dreamtale", "Skytale", "80s film",
-        "Minimalist", "Horror", "Sketchbook"
-    ]
+    # スタイル表（設定ファイルで追加したスタイルも含む）
+    visual_styles = list(prompt_templates.STYLE_TABLE)
 
     cols_per_row = 5
     rows = [visual_styles[i:i+cols_per_row] for i in range(0, len(visual_styles), cols_per_row)]
@@ -222,8 +221,8 @@ if st.session_state.get('scenarios'):
     st.markdown("---")
     st.info("""
     💡 **動画生成について**
-    - シナリオは自動的に3シーン（各12秒）に分割されます
-    - 合計36秒の動画が生成されます
+    - シナリオは自動的に3シーンに分割されます
+    - 各シーンはナレーションの読み上げ時間に合わせて4・8・12秒から選ばれます（合計12〜36秒）
     - 各シーンのナレーションは70-80文字に最適化されます
     """)
 
@@ -12,7 +12,8 @@ import sys
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from backend import sora2_engine, prompt_engineer, video_composer, session_manager, scene_splitter_sora2
+from backend import sora2_engine, prompt_engineer, video_composer, session_manager, scene_splitter_sora2, speech_timing, background_task
+from backend.cancellation import OperationCancelled
 
 st.set_page_config(
     page_title="3️⃣ Sora2動画生成",
@@ -20,6 +21,18 @@ st.set_page_config(
     layout="wide"
 )
 
+
+@st.fragment(run_every=2)
+def show_task_progress(task, label, key):
+    """実行中の生成とキャンセルボタン（2秒ごとにこの部分だけ再実行）"""
+    if task.finished or task.cancelled:
+        # 完了したらページ全体を再実行して結果を表示する
+        st.rerun()
+
+    st.info(label)
+    st.button("⏹️ キャンセル", key=key, on_click=task.cancel)
+
+
 # カスタムCSS
 st.markdown("""
 <style>
@@ -81,6 +94,7 @@ st.markdown("""
 <li>著作権キャラクター・音楽は使用できません</li>
 <li>18歳以上向けコンテンツは使用できません</li>
 <li>実在人物が登場する場合は自動的に代名詞に置き換えられます</li>
+<li>生成前にプロンプトを自動チェックし、禁止語を含む場合は送信せずにエラーにします</li>
 </ul>
 </div>
 """, unsafe_allow_html=True)
@@ -109,7 +123,7 @@ with col_settings:
     st.markdown("<br>", unsafe_allow_html=True)
     if st.button("⚙️ 設定変更", use_container_width=True, help="シナリオ選択に戻る"):
         # シーン関連データを削除してシナリオ選択に戻る
-        keys_to_delete = ['scenes', 'scene_videos', 'final_video']
+        keys_to_delete = ['scenes', 'scene_videos', 'scene_drafts', 'approved_scenes', 'final_video']
         for key in keys_to_delete:
             if key in st.session_state:
                 del st.session_state[key]
@@ -126,9 +140,10 @@ st.subheader("🎬 Step 1: シーン分割")
 if 'scenes' not in st.session_state:
     st.info("""
     💡 **シーン分割について**
-    - シナリオを自動的に3シーン（各12秒）に分割します
+    - シナリオを自動的に3シーンに分割します（12秒に収まらないシーンがある場合はシーン数を増やします）
     - 元のシナリオテキストを文単位で分割（テキストは変更されません）
-    - 文の区切りの良いところで3分割します
+    - 最も長いシーンができるだけ短くなるよう、文の区切りで均等に分けます
+    - 各シーンの長さはナレーションに合わせて4・8・12秒から選ばれます
     """)
 
     if st.button("✂️ シーンに分割", type="primary", use_container_width=True):
@@ -139,6 +154,19 @@ if 'scenes' not in st.session_state:
                     num_scenes=3
                 )
                 st.session_state.scenes = scenes
+
+                # セッション保存（以降のシーン生成は差分イベントとして追記）
+                try:
+                    session_manager.save_session_state({
+                        'book_name': scenario['book_name'],
+                        'scenario': scenario,
+                        'scenes': scenes,
+                        'scene_videos': {},
+                        'generation_mode': 'scene_based'
+                    }, scenario['book_name'])
+                except Exception as e:
+                    st.warning(f"⚠️ セッション保存エラー: {str(e)}")
+
                 st.success("✅ シーン分割完了！")
                 st.rerun()
             except Exception as e:
@@ -158,6 +186,10 @@ else:
             del st.session_state.scenes
             if 'scene_videos' in st.session_state:
                 del st.session_state.scene_videos
+            if 'scene_drafts' in st.session_state:
+                del st.session_state.scene_drafts
+            if 'approved_scenes' in st.session_state:
+                del st.session_state.approved_scenes
             if 'final_video' in st.session_state:
                 del st.session_state.final_video
             st.rerun()
@@ -177,13 +209,18 @@ else:
                 key=f"narration_{i}"
             )
 
+            # 編集後のナレーションに合わせてクリップ長を選び直す
             char_count = len(edited_narration)
-            st.caption(f"📊 文字数: {char_count}文字")
+            estimated_seconds = speech_timing.estimate_seconds(edited_narration)
+            duration_seconds = speech_timing.choose_duration(estimated_seconds)
+            st.caption(f"📊 文字数: {char_count}文字 / 推定読み上げ: {estimated_seconds:.1f}秒 → {duration_seconds}秒クリップ")
+            if estimated_seconds > max(sora2_engine.ALLOWED_DURATIONS):
+                st.warning(f"⚠️ {max(sora2_engine.ALLOWED_DURATIONS)}秒に収まらない可能性があります。ナレーションを短くしてください")
 
             edited_scenes.append({
                 'scene_number': scene['scene_number'],
                 'narration': edited_narration,
-                'duration_seconds': 12
+                'duration_seconds': duration_seconds
             })
 
     # 編集されたシーンを保存
@@ -202,13 +239,183 @@ if 'scenes' in st.session_state:
     if 'scene_videos' not in st.session_state:
         st.session_state.scene_videos = {}
 
-    st.info("""
+    # ドラフト（確認用プレビュー）と承認状態を初期化
+    if 'scene_drafts' not in st.session_state:
+        st.session_state.scene_drafts = {}
+    if 'approved_scenes' not in st.session_state:
+        st.session_state.approved_scenes = set()
+
+    def discard_draft(scene_num):
+        """シーンのドラフトと承認を取り消す（承認チェックボックスの状態も戻す）"""
+        st.session_state.scene_drafts.pop(scene_num, None)
+        st.session_state.approved_scenes.discard(scene_num)
+        st.session_state.pop(f"approve_scene_{scene_num}", None)
+
+    # ドラフト生成後にナレーションを編集したシーンは、確認していないプロンプトで本番生成しないようにドラフトと承認を取り消す
+    current_narrations = {s['scene_number']: s['narration'] for s in scenes}
+    for scene_num, draft_result in list(st.session_state.scene_drafts.items()):
+        if draft_result.get('narration') != current_narrations.get(scene_num):
+            discard_draft(scene_num)
+    st.session_state.approved_scenes &= set(st.session_state.scene_drafts)
+
+    total_seconds = sum(scene['duration_seconds'] for scene in scenes)
+
+    st.info(f"""
     💡 **動画生成について**
-    - 各シーンを個別に生成します（各12秒）
-    - 合計生成時間: 36秒
+    - 各シーンを個別に生成します（ナレーションに合わせて4・8・12秒）
+    - 合計生成時間: {total_seconds}秒
     - 生成には1シーンあたり1-3分かかります
+    - ドラフト確認モードでは、低解像度・4秒・音声なしのプレビューで構図を確認し、承認したシーンだけを本番生成します
     """)
 
+    col_mode, col_model = st.columns([2, 1])
+
+    with col_mode:
+        draft_review = st.toggle(
+            "📝 ドラフトで確認してから本番生成",
+            value=True,
+            key="draft_review",
+            help="本番生成（高コスト）の前に、安価なドラフトで内容を確認します"
+        )
+
+    with col_model:
+        final_model = st.selectbox(
+            "本番生成モデル",
+            ["sora-2", "sora-2-pro"],
+            key="final_model",
+            help="sora-2-pro は高解像度ですが、生成コストが高くなります"
+        )
+
+    def save_scene_progress(scene, result):
+        """シーンの生成結果をセッションに保存（途中経過: このシーンの差分のみ追記）"""
+        try:
+            session_manager.append_session_event(
+                scenario['book_name'],
+                'scene_video',
+                {
+                    'scene': scene,
+                    'video': {
+                        'video_file': str(result['video_file']),
+                        'generation_id': result.get('generation_id'),
+                        'prompt': result.get('prompt')
+                    }
+                }
+            )
+        except Exception as e:
+            st.warning(f"⚠️ セッション保存エラー: {str(e)}")
+
+    BATCH_LABELS = {"draft": "ドラフト", "final": "本番生成"}
+
+    def start_batch_render(target_scenes, tier):
+        """対象シーンのプロンプトをまとめて作成・検証し、一括生成を別スレッドで開始"""
+        target_numbers = {s['scene_number'] for s in target_scenes}
+        try:
+            requests = [
+                r for r in prompt_engineer.build_scene_prompts(scenario, scenes, draft=(tier == "draft"))
+                if r['scene_number'] in target_numbers
+            ]
+        except prompt_engineer.PromptValidationError as e:
+            st.error(f"❌ {str(e)}")
+            return
+
+        # 生成時のナレーションを結果に残す（ドラフト確認後の編集を検出するため）
+        narrations = {s['scene_number']: s['narration'] for s in target_scenes}
+        for r in requests:
+            r['narration'] = narrations[r['scene_number']]
+
+        st.session_state.batch_task = background_task.start(
+            lambda task: sora2_engine.render_videos(
+                requests,
+                model=final_model,
+                tier=tier,
+                cancel_token=task.token
+            ),
+            name=f"render_videos_{tier}"
+        )
+        st.session_state.batch_tier = tier
+        st.session_state.batch_count = len(requests)
+        st.rerun()
+
+    def collect_batch_results(task, label):
+        """一括生成の結果を表示し、成功したシーンを返す（シーン番号→結果の辞書, すべて成功したか）"""
+        try:
+            results = task.result()
+        except OperationCancelled:
+            st.warning(f"⏹️ {label}をキャンセルしました")
+            return {}, False
+        except Exception as e:
+            st.error(f"❌ {label}エラー: {str(e)}")
+            st.exception(e)
+            return {}, False
+
+        rendered = {}
+        for result in results:
+            scene_num = result['scene_number']
+            if result['status'] == 'success':
+                rendered[scene_num] = result
+            elif result['status'] == 'cancelled':
+                st.warning(f"⏹️ シーン {scene_num} の{label}をキャンセルしました")
+            else:
+                st.error(f"❌ シーン {scene_num} の{label}エラー: {result.get('error', '不明なエラー')}")
+        return rendered, len(rendered) == len(results)
+
+    # 一括生成は別スレッドで実行し、セッション状態のタスクを再実行のたびに確認する
+    batch_task = st.session_state.get('batch_task')
+
+    if batch_task is not None and (batch_task.finished or batch_task.cancelled):
+        batch_tier = st.session_state.batch_tier
+        del st.session_state.batch_task
+        rendered, all_rendered = collect_batch_results(batch_task, BATCH_LABELS[batch_tier])
+        if batch_tier == "draft":
+            st.session_state.scene_drafts.update(rendered)
+        else:
+            for scene in scenes:
+                if scene['scene_number'] in rendered:
+                    st.session_state.scene_videos[scene['scene_number']] = rendered[scene['scene_number']]
+                    save_scene_progress(scene, rendered[scene['scene_number']])
+        if all_rendered:
+            st.rerun()
+        batch_task = None
+
+    if batch_task is not None:
+        show_task_progress(
+            batch_task,
+            f"🎬 {st.session_state.batch_count}シーンの{BATCH_LABELS[st.session_state.batch_tier]}を同時に生成中... (1-3分)",
+            key="cancel_batch"
+        )
+
+    col_batch_draft, col_batch_final = st.columns(2)
+
+    # 全シーンのドラフトを一括生成
+    if draft_review:
+        missing_drafts = [
+            s for s in scenes
+            if s['scene_number'] not in st.session_state.scene_drafts
+            and s['scene_number'] not in st.session_state.scene_videos
+        ]
+
+        with col_batch_draft:
+            if batch_task is None and missing_drafts and st.button(
+                f"⚡ ドラフトを一括生成（{len(missing_drafts)}シーン）",
+                type="primary",
+                use_container_width=True
+            ):
+                start_batch_render(missing_drafts, "draft")
+
+    # 本番生成できる（ドラフト確認モードでは承認済みの）未生成シーンを一括生成
+    pending_finals = [
+        s for s in scenes
+        if s['scene_number'] not in st.session_state.scene_videos
+        and (not draft_review or s['scene_number'] in st.session_state.approved_scenes)
+    ]
+
+    with col_batch_final:
+        if batch_task is None and pending_finals and st.button(
+            f"🎬 {'承認済みシーン' if draft_review else '全シーン'}を一括で本番生成（{len(pending_finals)}シーン）",
+            use_container_width=True
+        ):
+            start_batch_render(pending_finals, "final")
+
     # 各シーンの生成ボタンとプレビュー
     for i, scene in enumerate(scenes):
         scene_num = scene['scene_number']
@@ -219,7 +426,7 @@ if 'scenes' in st.session_state:
             col_info, col_action = st.columns([3, 1])
 
             with col_info:
-                st.caption(f"ナレーション: {scene['narration']} ({len(scene['narration'])}文字)")
+                st.caption(f"ナレーション: {scene['narration']} ({len(scene['narration'])}文字 / {scene['duration_seconds']}秒)")
 
             with col_action:
                 # シーンが既に生成済みかチェック
@@ -236,64 +443,113 @@ if 'scenes' in st.session_state:
                                 del st.session_state.final_video
                             st.rerun()
                 else:
-                    if st.button(f"▶️ シーン {scene_num} を生成", key=f"gen_scene_{scene_num}"):
-                        with st.spinner(f"🎬 シーン {scene_num} を生成中... (1-3分)"):
-                            try:
-                                # test_scene_flow.pyの成功パターンを使用
-                                prompt = prompt_engineer.create_scene_prompt_for_sora2(
-                                    book_name=scenario['book_name'],
-                                    scene_narration=scene['narration'],
-                                    visual_style=scenario.get('visual_style', 'Photorealistic'),
-                                    aspect_ratio=scenario.get('aspect_ratio', '16:9'),
-                                    duration=12,
-                                    scene_number=scene_num,
-                                    total_scenes=len(scenes)
-                                )
+                    # ドラフト確認モードでは承認済みのシーンのみ本番生成できる
+                    if draft_review:
+                        has_draft = scene_num in st.session_state.scene_drafts
+                        approved = st.checkbox(
+                            "✅ ドラフトを承認",
+                            value=scene_num in st.session_state.approved_scenes,
+                            key=f"approve_scene_{scene_num}",
+                            disabled=not has_draft,
+                            help=None if has_draft else "先にドラフトを生成してください"
+                        )
+                        if approved:
+                            st.session_state.approved_scenes.add(scene_num)
+                        else:
+                            st.session_state.approved_scenes.discard(scene_num)
+
+                    awaiting_approval = draft_review and scene_num not in st.session_state.approved_scenes
+
+                    # 生成は別スレッドで実行し、セッション状態のタスクを再実行のたびに確認する
+                    scene_task = st.session_state.get(f'scene_task_{scene_num}')
+
+                    if scene_task is not None and (scene_task.finished or scene_task.cancelled):
+                        del st.session_state[f'scene_task_{scene_num}']
+                        try:
+                            result = scene_task.result()
 
-                                # デバッグ表示
-                                with st.expander(f"🔍 シーン {scene_num} プロンプト"):
-                                    st.code(prompt)
+                            if result['status'] == 'success':
+                                # 生成結果を保存
+                                st.session_state.scene_videos[scene_num] = result
 
-                                # Sora2で生成
-                                result = sora2_engine.generate_video(
+                                # セッション保存（途中経過）
+                                save_scene_progress(scene, result)
+
+                                st.success(f"✅ シーン {scene_num} 生成完了！")
+                                st.balloons()
+                                st.rerun()
+                            elif result['status'] == 'cancelled':
+                                st.warning(f"⏹️ シーン {scene_num} の生成をキャンセルしました")
+                            else:
+                                st.error(f"❌ シーン {scene_num} 生成エラー: {result.get('error', '不明なエラー')}")
+
+                        except OperationCancelled:
+                            st.warning(f"⏹️ シーン {scene_num} の生成をキャンセルしました")
+
+                        except Exception as e:
+                            st.error(f"❌ シーン {scene_num} エラー: {str(e)}")
+                            st.exception(e)
+
+                    if scene_task is not None and not (scene_task.finished or scene_task.cancelled):
+                        show_task_progress(scene_task, f"🎬 シーン {scene_num} を生成中... (1-3分)", key=f"cancel_scene_{scene_num}")
+
+                        # デバッグ表示
+                        with st.expander(f"🔍 シーン {scene_num} プロンプト"):
+                            st.code(st.session_state.get(f'scene_prompt_{scene_num}', ''))
+
+                    elif st.button(
+                        f"▶️ シーン {scene_num} を本番生成" if draft_review else f"▶️ シーン {scene_num} を生成",
+                        key=f"gen_scene_{scene_num}",
+                        disabled=awaiting_approval
+                    ):
+                        try:
+                            # test_scene_flow.pyの成功パターンを使用
+                            prompt = prompt_engineer.create_scene_prompt_for_sora2(
+                                book_name=scenario['book_name'],
+                                scene_narration=scene['narration'],
+                                visual_style=scenario.get('visual_style', 'Photorealistic'),
+                                aspect_ratio=scenario.get('aspect_ratio', '16:9'),
+                                duration=scene['duration_seconds'],
+                                scene_number=scene_num,
+                                total_scenes=len(scenes)
+                            )
+
+                            st.session_state[f'scene_prompt_{scene_num}'] = prompt
+
+                            # Sora2で生成（キャンセルするとSora2のジョブも削除）
+                            st.session_state[f'scene_task_{scene_num}'] = background_task.start(
+                                lambda task, prompt=prompt, scene=scene, scene_num=scene_num: sora2_engine.generate_video(
                                     prompt=prompt,
                                     book_name=f"{scenario['book_name']}_scene{scene_num}",
                                     aspect_ratio=scenario.get('aspect_ratio', '16:9'),
-                                    duration=12
-                                )
-
-                                if result['status'] == 'success':
-                                    # 生成結果を保存
-                                    st.session_state.scene_videos[scene_num] = result
-
-                                    # セッション保存（途中経過）
-                                    try:
-                                        session_data = {
-                                            'book_name': scenario['book_name'],
-                                            'scenario': scenario,
-                                            'scenes': scenes,
-                                            'scene_videos': {
-                                                k: {
-                                                    'video_file': str(v['video_file']),
-                                                    'generation_id': v.get('generation_id'),
-                                                    'prompt': v.get('prompt')
-                                                } for k, v in st.session_state.scene_videos.items()
-                                            },
-                                            'generation_mode': 'scene_based'
-                                        }
-                                        session_manager.save_session_state(session_data, scenario['book_name'])
-                                    except Exception as e:
-                                        st.warning(f"⚠️ セッション保存エラー: {str(e)}")
-
-                                    st.success(f"✅ シーン {scene_num} 生成完了！")
-                                    st.balloons()
-                                    st.rerun()
-                                else:
-                                    st.error(f"❌ シーン {scene_num} 生成エラー: {result.get('error', '不明なエラー')}")
-
-                            except Exception as e:
-                                st.error(f"❌ シーン {scene_num} エラー: {str(e)}")
-                                st.exception(e)
+                                    duration=scene['duration_seconds'],
+                                    model=final_model,
+                                    cancel_token=task.token,
+                                    tier="final"
+                                ),
+                                name=f"generate_scene_{scene_num}"
+                            )
+                            st.rerun()
+
+                        except Exception as e:
+                            st.error(f"❌ シーン {scene_num} エラー: {str(e)}")
+                            st.exception(e)
+
+            # 本番未生成でドラフトがある場合はドラフトをプレビュー表示
+            if scene_num not in st.session_state.scene_videos and scene_num in st.session_state.scene_drafts:
+                draft_result = st.session_state.scene_drafts[scene_num]
+
+                if draft_result.get('video_file') and Path(draft_result['video_file']).exists():
+                    col_preview, col_draft_action = st.columns([2, 1])
+
+                    with col_preview:
+                        st.video(str(draft_result['video_file']))
+
+                    with col_draft_action:
+                        st.caption(f"📝 ドラフト（{draft_result['duration']}秒・音声なし）")
+                        if st.button("🔄 ドラフトを作り直す", key=f"redo_draft_{scene_num}", use_container_width=True):
+                            discard_draft(scene_num)
+                            st.rerun()
 
             # 生成済みの場合はプレビュー表示
             if scene_num in st.session_state.scene_videos:
@@ -333,16 +589,16 @@ if 'scenes' in st.session_state and 'scene_videos' in st.session_state:
     scene_videos = st.session_state.scene_videos
 
     # 全シーンが生成済みかチェック
-    all_scenes_ready = all(scene['scene_number'] in scene_videos for scene in scenes)
+    all_scenes_ready = bool(scenes) and all(scene['scene_number'] in scene_videos for scene in scenes)
 
     if all_scenes_ready:
         st.subheader("🎬 Step 3: 最終結合")
 
         if 'final_video' not in st.session_state:
-            st.info("""
+            st.info(f"""
             💡 **最終結合について**
-            - 3つのシーンを1つの動画に結合します
-            - 合計36秒の完成動画が作成されます
+            - {len(scenes)}つのシーンを1つの動画に結合します
+            - 合計{sum(scene['duration_seconds'] for scene in scenes)}秒の完成動画が作成されます
             """)
 
             if st.button("🔗 動画を結合", type="primary", use_container_width=True):
@@ -362,10 +618,11 @@ if 'scenes' in st.session_state and 'scene_videos' in st.session_state:
                             output_file=temp_dir / f"{scenario['book_name']}_final.mp4"
                         )
 
-                        # 最終動画を保存
+                        # 最終動画を保存（各シーンのクリップ長の合計）
+                        total_seconds = sum(scene['duration_seconds'] for scene in scenes)
                         st.session_state.final_video = {
                             'video_file': final_video_path,
-                            'duration': 36,
+                            'duration': total_seconds,
                             'aspect_ratio': scenario.get('aspect_ratio', '16:9'),
                             'scene_count': len(scenes)
                         }
@@ -385,7 +642,7 @@ if 'scenes' in st.session_state and 'scene_videos' in st.session_state:
                                 },
                                 'final_video': {
                                     'video_file': str(final_video_path),
-                                    'duration': 36
+                                    'duration': total_seconds
                                 },
                                 'generation_mode': 'scene_based',
                                 'status': 'completed'
@@ -467,7 +724,7 @@ if 'scenes' in st.session_state and 'scene_videos' in st.session_state:
                 with col_a1:
                     if st.button("🔄 別の動画を生成", use_container_width=True):
                         # 生成結果のみクリア
-                        keys_to_delete = ['scenes', 'scene_videos', 'final_video']
+                        keys_to_delete = ['scenes', 'scene_videos', 'scene_drafts', 'approved_scenes', 'final_video']
                         for key in keys_to_delete:
                             if key in st.session_state:
                                 del st.session_state[key]
@@ -476,7 +733,7 @@ if 'scenes' in st.session_state and 'scene_videos' in st.session_state:
                 with col_a2:
                     if st.button("📝 シナリオを変更", use_container_width=True):
                         # シーン関連をクリア
-                        keys_to_delete = ['scenes', 'scene_videos', 'final_video']
+                        keys_to_delete = ['scenes', 'scene_videos', 'scene_drafts', 'approved_scenes', 'final_video']
                         for key in keys_to_delete:
                             if key in st.session_state:
                                 del st.session_state[key]
@@ -486,7 +743,7 @@ if 'scenes' in st.session_state and 'scene_videos' in st.session_state:
                 with col_a3:
                     if st.button("📖 別の書籍で生成", use_container_width=True):
                         # 全クリア
-                        keys_to_delete = ['scenes', 'scene_videos', 'final_video', 'selected_scenario']
+                        keys_to_delete = ['scenes', 'scene_videos', 'scene_drafts', 'approved_scenes', 'final_video', 'selected_scenario']
                         for key in keys_to_delete:
                             if key in st.session_state:
                                 del st.session_state[key]
@@ -242,7 +242,7 @@ col_a1, col_a2, col_a3 = st.columns(3)
 with col_a1:
     if st.button("🔄 別の動画を生成", use_container_width=True):
         # 動画関連のみクリア
-        keys_to_delete = ['scenes', 'scene_videos', 'final_video']
+        keys_to_delete = ['scenes', 'scene_videos', 'scene_drafts', 'approved_scenes', 'final_video']
         for key in keys_to_delete:
             if key in st.session_state:
                 del st.session_state[key]
@@ -251,7 +251,7 @@ with col_a1:
 with col_a2:
     if st.button("📝 シナリオを変更", use_container_width=True):
         # シーン・動画をクリア
-        keys_to_delete = ['scenes', 'scene_videos', 'final_video']
+        keys_to_delete = ['scenes', 'scene_videos', 'scene_drafts', 'approved_scenes', 'final_video']
         for key in keys_to_delete:
             if key in st.session_state:
                 del st.session_state[key]
@@ -261,7 +261,7 @@ with col_a2:
 with col_a3:
     if st.button("📖 別の書籍で生成", use_container_width=True):
         # 全クリア
-        keys_to_delete = ['scenes', 'scene_videos', 'final_video', 'selected_scenario']
+        keys_to_delete = ['scenes', 'scene_videos', 'scene_drafts', 'approved_scenes', 'final_video', 'selected_scenario']
         for key in keys_to_delete:
             if key in st.session_state:
                 del st.session_state[key]
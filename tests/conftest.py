@@ -0,0 +1,6 @@
+"""pytest の共通設定（backend パッケージをインポートできるようにプロジェクトルートをパスに追加）"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
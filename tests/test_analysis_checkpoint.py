@@ -0,0 +1,43 @@
+"""analysis_checkpoint.ChunkCheckpoint（記録・再開・resume=False でのリセット）"""
+
+import pytest
+
+from backend import analysis_checkpoint
+
+
+@pytest.fixture(autouse=True)
+def checkpoint_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(analysis_checkpoint, "get_checkpoint_dir", lambda: tmp_path)
+    return tmp_path
+
+
+def test_records_are_resumed():
+    with analysis_checkpoint.ChunkCheckpoint("book") as checkpoint:
+        checkpoint.record("a", "まとめA")
+        checkpoint.record("b", "まとめB")
+
+    assert analysis_checkpoint.ChunkCheckpoint("book").completed == {"a": "まとめA", "b": "まとめB"}
+
+
+def test_partial_last_line_is_dropped(checkpoint_dir):
+    with analysis_checkpoint.ChunkCheckpoint("book") as checkpoint:
+        checkpoint.record("a", "まとめA")
+    with open(checkpoint_dir / "book.jsonl", "a", encoding="utf-8") as f:
+        f.write('{"hash": "b", "summ')
+
+    with analysis_checkpoint.ChunkCheckpoint("book") as checkpoint:
+        assert checkpoint.completed == {"a": "まとめA"}
+        checkpoint.record("c", "まとめC")
+
+    assert analysis_checkpoint.ChunkCheckpoint("book").completed == {"a": "まとめA", "c": "まとめC"}
+
+
+def test_resume_false_discards_previous_records():
+    with analysis_checkpoint.ChunkCheckpoint("book") as checkpoint:
+        checkpoint.record("a", "古いまとめ")
+
+    with analysis_checkpoint.ChunkCheckpoint("book", resume=False) as checkpoint:
+        assert checkpoint.completed == {}
+        checkpoint.record("b", "まとめB")
+
+    assert analysis_checkpoint.ChunkCheckpoint("book").completed == {"b": "まとめB"}
@@ -0,0 +1,14 @@
+"""book_analyzer.chunk_chapters"""
+
+from backend import book_analyzer, text_normalizer
+
+
+def test_split_chapter_pieces_fit_budget_with_label():
+    paragraphs = ["吾輩は猫である。" for _ in range(200)]
+    chapters = [{"title": "第一章　長い見出しの付いた章", "text": "\n\n".join(paragraphs)}]
+
+    chunks = book_analyzer.chunk_chapters(chapters, token_budget=300)
+
+    assert len(chunks) > 1
+    assert all(chunk["label"].startswith("第一章") for chunk in chunks)
+    assert all(text_normalizer.estimate_tokens(chunk["text"]) <= 300 for chunk in chunks)
@@ -0,0 +1,40 @@
+"""epub_structure.extract_chapters"""
+
+from ebooklib import epub
+
+from backend import epub_structure
+
+
+def _write_book(path):
+    book = epub.EpubBook()
+    book.set_identifier("test-book")
+    book.set_title("テスト")
+    book.set_language("ja")
+
+    title = epub.EpubHtml(title="扉", file_name="title.xhtml", lang="ja")
+    title.content = "<html><body><h1>テストの本</h1><p>著者名</p></body></html>"
+    chapters = []
+    for i in range(1, 4):
+        chapter = epub.EpubHtml(title=f"第{i}章", file_name=f"ch{i}.xhtml", lang="ja")
+        body = "".join(f"<p>第{i}章の本文{j}です。物語は続く。</p>" for j in range(20))
+        chapter.content = f"<html><body><h2>第{i}章</h2>{body}</body></html>"
+        chapters.append(chapter)
+
+    for item in [title] + chapters:
+        book.add_item(item)
+    book.toc = [epub.Link(f"ch{i}.xhtml", f"第{i}章", f"c{i}") for i in range(1, 4)]
+    book.add_item(epub.EpubNcx())
+    book.add_item(epub.EpubNav())
+    book.spine = ["nav", title] + chapters
+    epub.write_epub(str(path), book)
+
+
+def test_title_page_after_nav_is_front_matter(tmp_path):
+    path = tmp_path / "book.epub"
+    _write_book(path)
+
+    excluded = []
+    chapters = epub_structure.extract_chapters(epub.read_epub(str(path)), excluded=excluded)
+
+    assert [chapter["title"] for chapter in chapters] == ["第1章", "第2章", "第3章"]
+    assert {"file": "title.xhtml", "reason": "text:titlepage"} in excluded
@@ -0,0 +1,41 @@
+"""prompt_preflight.load_terms（設定ファイルの語の読み込み）"""
+
+import json
+
+import pytest
+
+from backend import prompt_preflight
+
+
+@pytest.fixture
+def terms_file(tmp_path):
+    path = tmp_path / "preflight_terms.json"
+    path.write_text(json.dumps({
+        "blocked": {"copyright": ["架空キャラ"]},
+        "person_names": ["山田太郎"]
+    }, ensure_ascii=False), encoding="utf-8")
+    yield path
+    prompt_preflight.load_terms(tmp_path / "missing.json")
+
+
+def test_load_terms_does_not_change_defaults(terms_file):
+    defaults = {category: list(terms) for category, terms in prompt_preflight.BLOCKED_TERMS.items()}
+    person_names = list(prompt_preflight.PERSON_NAMES)
+
+    prompt_preflight.load_terms(terms_file)
+    prompt_preflight.load_terms(terms_file)
+
+    assert prompt_preflight.BLOCKED_TERMS == defaults
+    assert prompt_preflight.PERSON_NAMES == person_names
+    assert prompt_preflight._person_names.count("山田太郎") == 1
+
+
+def test_loaded_terms_are_checked(terms_file):
+    prompt_preflight.load_terms(terms_file)
+
+    result = prompt_preflight.check_prompt("架空キャラと山田太郎が歩く")
+    assert not result['ok']
+    assert result['prompt'] == "架空キャラとその人物が歩く"
+
+    prompt_preflight.load_terms(terms_file.parent / "missing.json")
+    assert prompt_preflight.check_prompt("架空キャラと山田太郎が歩く")['ok']
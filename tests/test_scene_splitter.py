@@ -0,0 +1,41 @@
+"""scene_splitter_sora2.split_into_scenes_for_sora2"""
+
+import pytest
+
+from backend import scene_splitter_sora2, speech_timing
+from backend.sora2_engine import ALLOWED_DURATIONS
+
+
+def _scenario(summary):
+    return {"selected_pattern": {"summary": summary}}
+
+
+def test_split_keeps_text():
+    summary = "吾輩は猫である。名前はまだ無い。どこで生れたかとんと見当がつかぬ。"
+    scenes = scene_splitter_sora2.split_into_scenes_for_sora2(_scenario(summary), num_scenes=3)
+
+    assert [s["scene_number"] for s in scenes] == [1, 2, 3]
+    assert "".join(s["narration"] for s in scenes) == summary
+
+
+@pytest.mark.parametrize("summary", ["", "  \n "])
+def test_blank_scenario_raises(summary):
+    with pytest.raises(ValueError):
+        scene_splitter_sora2.split_into_scenes_for_sora2(_scenario(summary))
+
+
+def test_long_scenario_adds_scenes_until_each_fits():
+    summary = "吾輩は猫である。名前はまだ無い。どこで生れたかとんと見当がつかぬ。" * 4
+    scenes = scene_splitter_sora2.split_into_scenes_for_sora2(_scenario(summary), num_scenes=1)
+
+    assert len(scenes) > 1
+    assert "".join(s["narration"] for s in scenes) == summary
+    assert all(
+        speech_timing.estimate_seconds(s["narration"]) <= max(ALLOWED_DURATIONS) for s in scenes
+    )
+
+
+def test_sentence_longer_than_any_clip_raises():
+    summary = "吾輩は猫である" * 20 + "。"
+    with pytest.raises(ValueError):
+        scene_splitter_sora2.split_into_scenes_for_sora2(_scenario(summary))
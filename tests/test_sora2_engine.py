@@ -0,0 +1,54 @@
+"""sora2_engine.wait_videos（ジョブごとの結果・失敗したジョブの削除・クライアントのクローズ）"""
+
+import asyncio
+from types import SimpleNamespace
+
+from backend import sora2_engine
+
+
+class FakeVideos:
+    def __init__(self, statuses):
+        self.statuses = statuses
+        self.deleted = []
+
+    async def retrieve(self, job_id):
+        status = self.statuses[job_id]
+        if isinstance(status, Exception):
+            raise status
+        return SimpleNamespace(id=job_id, status=status, progress=100, error=None)
+
+    async def delete(self, job_id):
+        self.deleted.append(job_id)
+
+
+class FakeAsyncOpenAI:
+    instances = []
+
+    def __init__(self, api_key=None):
+        self.videos = FakeVideos(self.statuses)
+        self.closed = False
+        FakeAsyncOpenAI.instances.append(self)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.closed = True
+
+
+def test_one_failure_does_not_orphan_siblings(monkeypatch):
+    FakeAsyncOpenAI.statuses = {"ok": "completed", "broken": ConnectionError("reset"), "late": "queued"}
+    FakeAsyncOpenAI.instances = []
+    monkeypatch.setattr(sora2_engine, "AsyncOpenAI", FakeAsyncOpenAI)
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+
+    results = asyncio.run(sora2_engine.wait_videos(["ok", "broken", "late"], timeout=0))
+
+    assert [r["id"] for r in results] == ["ok", "broken", "late"]
+    assert [r["status"] for r in results] == ["completed", "failed", "timeout"]
+    assert "reset" in results[1]["error"]
+
+    # 1つのクライアントを共有し、待機後に閉じる。完了しなかったジョブはリモートでも削除する
+    [client] = FakeAsyncOpenAI.instances
+    assert client.closed
+    assert sorted(client.videos.deleted) == ["broken", "late"]
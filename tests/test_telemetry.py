@@ -0,0 +1,55 @@
+"""telemetry の PrometheusExporter（プロセス終了を待たずにファイルへ書き出すこと）"""
+
+import time
+
+import pytest
+
+from backend import telemetry
+
+
+@pytest.fixture
+def prometheus(tmp_path):
+    path = tmp_path / "metrics.prom"
+    telemetry.configure("prometheus", path=path)
+    yield path
+    telemetry.configure("none")
+
+
+def test_span_is_written_without_exit(prometheus):
+    with telemetry.span("test.render"):
+        pass
+
+    assert prometheus.exists()
+    assert 'test_render_seconds_count{status="ok"} 1' in prometheus.read_text()
+
+
+def test_updates_within_interval_are_flushed_later(prometheus):
+    telemetry._exporter.flush_interval = 0.2
+    telemetry.increment("test.first")
+    telemetry.increment("test.second")
+
+    # 2回目の更新は間隔内なので、まだ書き出されていない
+    assert "test_second_total" not in prometheus.read_text()
+
+    deadline = time.monotonic() + 5
+    while "test_second_total" not in prometheus.read_text() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert "test_second_total 1" in prometheus.read_text()
+
+
+def test_unknown_exporter_disables_telemetry(capsys):
+    telemetry.configure("prometheus-typo")
+
+    assert not telemetry.is_enabled()
+    assert "prometheus-typo" in capsys.readouterr().out
+
+
+def test_reconfigure_closes_jsonl_file(tmp_path):
+    telemetry.configure("jsonl", path=tmp_path / "events.jsonl")
+    exporter = telemetry._exporter
+    telemetry.increment("test.count")
+
+    telemetry.configure("none")
+
+    assert exporter._file.closed
+    assert '"test.count"' in (tmp_path / "events.jsonl").read_text(encoding="utf-8")
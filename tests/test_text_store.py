@@ -0,0 +1,68 @@
+"""text_store（書き出し・読み出し・内容ごとのファイル名）"""
+
+import pickle
+
+import pytest
+
+from backend import text_store
+
+PIECES = ["第一章　吾輩は猫である。", "", "第二章\n名前はまだ無い。"]
+
+
+def test_round_trip(tmp_path):
+    with text_store.write(tmp_path, "book", PIECES) as store:
+        assert list(store) == PIECES
+        assert [store.chars(i) for i in range(len(store))] == [len(p) for p in PIECES]
+        assert store.read() == "\n\n".join(PIECES)
+        assert store.char_count == len(store.read())
+        assert store.select([2, 0])[:] == [PIECES[2], PIECES[0]]
+        assert store.head(3) == PIECES[0][:3]
+
+    # テキストファイルはそのまま本文として読める
+    assert store.path.read_text(encoding="utf-8") == "\n\n".join(PIECES)
+    assert list(pickle.loads(pickle.dumps(text_store.load(store.path)))) == PIECES
+
+
+def test_file_name_follows_content(tmp_path):
+    first = text_store.write(tmp_path, "book", PIECES)
+    same = text_store.write(tmp_path, "book", PIECES)
+    other = text_store.write(tmp_path, "book", PIECES[:2])
+    resplit = text_store.write(tmp_path, "book", ["".join(PIECES)], separator="")
+    joined = text_store.write(tmp_path, "book", PIECES, separator="")
+
+    assert first.path == same.path
+    assert first.path.name.startswith("book.")
+    # 内容・区切り方が違うストアは、先に開いたストアのファイルを上書きしない
+    assert len({first.path, other.path, resplit.path, joined.path}) == 4
+    assert list(first) == PIECES
+    assert not list(tmp_path.glob(".*.tmp"))
+
+
+def test_text_and_index_mismatch_is_detected(tmp_path):
+    store = text_store.write(tmp_path, "book", PIECES)
+    store.path.write_text("短い", encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        text_store.load(store.path)[0]
+
+
+def test_remove(tmp_path):
+    store = text_store.write(tmp_path, "book", PIECES)
+    text_store.remove(store.path)
+
+    assert not list(tmp_path.iterdir())
+
+
+def test_prune_removes_old_stores_of_the_same_prefix(tmp_path):
+    old = text_store.write(tmp_path, "book", PIECES[:1])
+    current = text_store.write(tmp_path, "book", PIECES)
+    chunks = text_store.write(tmp_path, "book.chunks", PIECES[:1])
+    other_book = text_store.write(tmp_path, "book.2", PIECES[:1])
+
+    # 最近作られたストアは残す
+    assert text_store.prune(tmp_path, "book", keep=[current.path]) == 0
+    assert old.path.exists()
+
+    assert text_store.prune(tmp_path, "book", keep=[current.path], max_age=0) == 1
+    assert not old.path.exists() and not text_store.index_path(old.path).exists()
+    assert current.path.exists() and chunks.path.exists() and other_book.path.exists()
@@ -0,0 +1,29 @@
+"""utils.atomic_write_text（置き換え後のファイルの権限）"""
+
+import os
+import stat
+
+from backend import utils
+
+
+def _mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_new_file_uses_umask(tmp_path):
+    path = tmp_path / "new.json"
+    utils.save_json(path, {"a": 1})
+
+    assert _mode(path) == 0o666 & ~utils._UMASK
+    assert utils.load_json(path) == {"a": 1}
+
+
+def test_existing_file_keeps_mode(tmp_path):
+    path = tmp_path / "shared.json"
+    path.write_text("{}", encoding="utf-8")
+    os.chmod(path, 0o640)
+
+    utils.atomic_write_text(path, '{"a": 1}')
+
+    assert _mode(path) == 0o640
+    assert path.read_text(encoding="utf-8") == '{"a": 1}'